@@ -0,0 +1,210 @@
+"""
+命令行批处理模块
+不依赖PyQt6，在服务器上对一个或多个文件依次执行 加载、清洗、筛选、排序、统计、保存；
+多个文件在进程池中并行处理，每个文件输出各阶段用时
+
+用法:
+    python batch.py 数据/*.csv --pipeline 流水线.json --output-dir 输出 --analyze
+    python batch.py 日报.xlsx --dedupe --filter 金额 ">" 100 --sort 日期:desc --format csv
+"""
+
+import argparse  # 命令行参数解析
+import glob  # 展开文件通配符(Windows命令行不会自动展开)
+import os  # 路径处理与CPU核数
+import sys  # 退出码
+import time  # 各阶段计时
+from concurrent.futures import ProcessPoolExecutor, as_completed  # 多进程并行
+
+from pipeline import Pipeline  # 可重放的处理流水线
+from column_stats import numeric_summary, streaming_summary, STATS_CHUNK_ROWS  # 数值列基础统计与近似统计
+from data_writer import write_frames, SAVE_CHUNK_ROWS  # 流式写出
+from filter_engine import OPERATORS, LOGICS  # 筛选运算符
+from data_loader import SUPPORTED_EXTENSIONS  # 支持的文件格式
+
+# 输入扩展名对应的默认输出格式
+_DEFAULT_FORMATS = {".csv": "csv", ".xlsx": "xlsx", ".json": "json", ".jsonl": "json", ".ndjson": "json"}
+
+
+def build_pipeline(args):
+    """
+    由命令行参数组装流水线
+
+    先执行 --pipeline 文件中的步骤，再依次追加删除空行、删除重复行、筛选、排序
+
+    参数:
+        args: argparse.Namespace - 解析后的命令行参数
+    返回值: Pipeline - 流水线
+    """
+    pipeline = Pipeline.load(args.pipeline) if args.pipeline else Pipeline()
+    if args.drop_empty:
+        pipeline.append({"op": "drop_empty_rows", "column": None})
+    if args.dedupe:
+        pipeline.append({"op": "drop_duplicates", "column": None})
+    if args.filter:
+        for _, operator, _ in args.filter:
+            if operator not in OPERATORS:
+                raise ValueError(f"不支持的运算符: {operator}")
+        pipeline.append({"op": "filter", "conditions": [list(condition) for condition in args.filter],
+                         "logic": args.logic})
+    if args.sort:
+        keys = []
+        for key in args.sort:
+            name, _, order = key.rpartition(":")
+            if not name or order.lower() not in ("asc", "desc"):
+                name, order = key, "asc"
+            keys.append([name, order.lower() == "asc"])
+        pipeline.append({"op": "sort", "keys": keys, "collation": args.collation})
+    return pipeline
+
+
+def output_path(path, output_dir, file_format, suffix):
+    """返回输入文件对应的输出文件路径"""
+    base = os.path.splitext(os.path.basename(path))[0]
+    directory = output_dir or os.path.dirname(os.path.abspath(path))
+    return os.path.join(directory, f"{base}{suffix}.{file_format}")
+
+
+def process_file(path, pipeline_data, output_dir, file_format, suffix, analyze, approximate=False):
+    """
+    处理单个文件，在子进程中运行
+
+    参数:
+        path: str - 输入文件路径
+        pipeline_data: dict - Pipeline.to_dict 的结果(跨进程传递)
+        output_dir: str - 输出目录，None表示与输入文件相同
+        file_format: str - 输出格式，None表示与输入格式相同
+        suffix: str - 输出文件名后缀
+        analyze: bool - 是否输出数值列统计
+        approximate: bool - 统计时是否用草图估计分位数、不同值个数和高频值
+    返回值: dict - 文件路径、输入/输出行数、各阶段用时(秒)、输出文件，出错时含 error
+    """
+    result = {"path": path, "timings": {}}
+    timings = result["timings"]
+    started = time.perf_counter()
+    try:
+        pipeline = Pipeline.from_dict(pipeline_data)
+
+        stage = time.perf_counter()
+        store, steps = pipeline.load_data(path)
+        timings["加载"] = time.perf_counter() - stage
+        result["rows_in"] = store.total_row_count()
+
+        stage = time.perf_counter()
+        pipeline.apply(store, steps)
+        timings["处理"] = time.perf_counter() - stage
+        result["rows_out"] = store.row_count()
+
+        if file_format is None:
+            file_format = _DEFAULT_FORMATS.get(os.path.splitext(path)[1].lower(), "csv")
+        target = output_path(path, output_dir, file_format, suffix)
+
+        if analyze:
+            stage = time.perf_counter()
+            if approximate:
+                summary = streaming_summary(store.iter_frames(STATS_CHUNK_ROWS), approximate=True)
+            else:
+                summary = numeric_summary(store)
+            stats_path = os.path.splitext(target)[0] + ".stats.csv"
+            summary.to_csv(stats_path, index=False, encoding="utf-8-sig")
+            timings["统计"] = time.perf_counter() - stage
+            result["stats"] = stats_path
+
+        stage = time.perf_counter()
+        write_frames(store.iter_frames(SAVE_CHUNK_ROWS), target, file_format)
+        timings["保存"] = time.perf_counter() - stage
+        result["output"] = target
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    timings["合计"] = time.perf_counter() - started
+    return result
+
+
+def expand_paths(patterns):
+    """展开通配符并去重，保持参数顺序"""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        for path in matches:
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def format_result(result, index, total):
+    """把单个文件的处理结果格式化为一行输出"""
+    name = os.path.basename(result["path"])
+    timings = " ".join(f"{stage} {seconds:.2f}s" for stage, seconds in result["timings"].items())
+    if "error" in result:
+        return f"[{index}/{total}] {name} 失败: {result['error']} | {timings}"
+    return (f"[{index}/{total}] {name} {result['rows_in']:,} -> {result['rows_out']:,} 行 | {timings}"
+            f" -> {result['output']}")
+
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="数据文件批处理：加载、清洗、筛选、排序、统计、保存")
+    parser.add_argument("files", nargs="+", help="输入文件，可以使用通配符")
+    parser.add_argument("--pipeline", help="在界面中保存的流水线文件(JSON)")
+    parser.add_argument("--drop-empty", action="store_true", help="删除所有列都为空的行")
+    parser.add_argument("--dedupe", action="store_true", help="删除重复行")
+    parser.add_argument("--filter", nargs=3, action="append", metavar=("列名", "运算符", "值"),
+                        help=f"筛选条件，可重复，替换流水线中的筛选条件；运算符: {' '.join(OPERATORS)}")
+    parser.add_argument("--logic", choices=LOGICS, default="AND", help="多个筛选条件的组合方式")
+    parser.add_argument("--sort", action="append", metavar="列名[:asc|desc]", help="排序列，可重复，按出现顺序排序")
+    parser.add_argument("--collation", default=None, help="文本排序方式：编码/拼音/笔画")
+    parser.add_argument("--analyze", action="store_true", help="另存数值列统计结果 (*.stats.csv)")
+    parser.add_argument("--approximate", action="store_true",
+                        help="统计时用草图估计分位数、不同值个数和高频值，内存占用与行数无关")
+    parser.add_argument("--output-dir", help="输出目录，默认与输入文件相同")
+    parser.add_argument("--format", choices=("csv", "json", "xlsx"), help="输出格式，默认与输入相同")
+    parser.add_argument("--suffix", default="_processed", help="输出文件名后缀")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="并行进程数，默认为CPU核数")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    命令行入口
+
+    返回值: int - 退出码，有文件处理失败时为1
+    """
+    args = parse_args(argv)
+    try:
+        pipeline = build_pipeline(args)
+    except Exception as e:
+        print(f"流水线无效: {e}", file=sys.stderr)
+        return 2
+    paths = expand_paths(args.files)
+    unsupported = [path for path in paths if not path.lower().endswith(SUPPORTED_EXTENSIONS)]
+    if unsupported:
+        print(f"不支持的文件格式: {', '.join(unsupported)}", file=sys.stderr)
+        return 2
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    started = time.perf_counter()
+    task = (pipeline.to_dict(), args.output_dir, args.format, args.suffix, args.analyze, args.approximate)
+    workers = max(1, min(args.workers or 1, len(paths)))
+    results = []
+    if workers == 1:
+        # 单个进程时直接在当前进程处理，省去进程启动开销
+        for path in paths:
+            results.append(process_file(path, *task))
+            print(format_result(results[-1], len(results), len(paths)), flush=True)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(process_file, path, *task) for path in paths]
+            for future in as_completed(futures):
+                results.append(future.result())
+                print(format_result(results[-1], len(results), len(paths)), flush=True)
+
+    failed = sum("error" in result for result in results)
+    elapsed = time.perf_counter() - started
+    busy = sum(result["timings"]["合计"] for result in results)
+    print(f"完成 {len(results) - failed}/{len(results)} 个文件，{workers} 个进程，"
+          f"总用时 {elapsed:.2f} 秒(各文件用时合计 {busy:.2f} 秒)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
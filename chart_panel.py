@@ -0,0 +1,391 @@
+"""
+图表面板模块
+可停靠的图表面板：图形、坐标轴和画布只创建一次，切换列或图表类型时在同一画布上重绘；
+折线图与散点图在原有图形元素上更新数据，坐标范围不变时只重绘数据(blit)；
+柱状图、饼图、箱线图在子进程中渲染为图像后显示，绘制期间界面不阻塞，多个图表可在多核上并行渲染；
+数据版本与视图版本都没有变化时不重新计算也不重绘
+"""
+
+import os  # CPU核数
+import multiprocessing  # 子进程启动方式
+from concurrent.futures import ProcessPoolExecutor  # 渲染进程池
+from concurrent.futures.process import BrokenProcessPool  # 渲染进程异常退出
+
+import numpy as np  # 数值计算库
+from PyQt6.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QStackedWidget  # PyQt6 GUI组件
+from PyQt6.QtGui import QImage, QPixmap  # 显示子进程渲染的图像
+from PyQt6.QtCore import Qt, QObject, QTimer, pyqtSignal  # 延迟刷新与信号
+from matplotlib.figure import Figure  # 不经过pyplot创建图形，不打开独立窗口
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg  # 嵌入Qt界面的画布
+
+from chart_render import draw_chart, sample_points, share_columns, init_worker, render_chart
+
+CHART_TYPES = ("柱状图", "折线图", "饼图", "箱线图", "散点图")  # 支持的图表类型
+CHART_REFRESH_MS = 200  # 数据变化后等待的毫秒数，连续修改只重绘一次
+# 可以在原有图形元素上更新数据的图表类型
+_IN_PLACE_TYPES = ("折线图", "散点图")
+# 在子进程中渲染的图表类型，绘制耗时较长(箱线图需要seaborn统计整列)
+_REMOTE_TYPES = ("柱状图", "饼图", "箱线图")
+
+
+class ChartRenderer(QObject):
+    """
+    子进程图表渲染器
+
+    进程池在第一次渲染时创建，子进程以spawn方式启动(图形界面进程中fork不安全)并使用Agg后端；
+    列数据写入共享内存，子进程直接读取，渲染结果以RGBA图像返回；
+    任务完成的回调在进程池的线程中执行，经由信号排队回到界面线程处理
+
+    信号:
+        image_ready(object, QImage, int): 渲染完成，参数为任务标识、图像、绘制的点数
+        failed(object, str): 渲染失败，参数为任务标识、错误信息
+    """
+    image_ready = pyqtSignal(object, QImage, int)
+    failed = pyqtSignal(object, str)
+    _finished = pyqtSignal(object, object)  # (任务标识, Future)，从进程池线程发出
+
+    def __init__(self, parent=None):
+        """初始化渲染器，不立即启动子进程"""
+        super().__init__(parent)
+        self._executor = None
+        self._blocks = {}  # Future -> 尚未释放的共享内存
+        self._finished.connect(self._on_finished)
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.shutdown)
+
+    def submit(self, key, column, chart_type, rows, values, width, height):
+        """
+        提交一个渲染任务
+
+        参数:
+            key: object - 任务标识，随结果信号返回
+            column: str - 列名
+            chart_type: str - 图表类型
+            rows: np.ndarray - 行号
+            values: np.ndarray - 数值
+            width: int - 图像宽度(像素)
+            height: int - 图像高度(像素)
+        返回值: 无
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                                 mp_context=multiprocessing.get_context("spawn"),
+                                                 initializer=init_worker)
+        block = share_columns(rows, values)
+        try:
+            future = self._executor.submit(render_chart, block.name, len(values), column, chart_type,
+                                           width, height)
+        except Exception:
+            block.close()
+            block.unlink()
+            raise
+        self._blocks[future] = block
+        future.add_done_callback(lambda done: self._finished.emit(key, done))
+
+    def shutdown(self):
+        """停止进程池，释放未完成任务的共享内存"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        for block in self._blocks.values():
+            block.close()
+            block.unlink()
+        self._blocks.clear()
+
+    def _on_finished(self, key, future):
+        """在界面线程中释放共享内存并转换渲染结果"""
+        block = self._blocks.pop(future, None)
+        if block is not None:
+            block.close()
+            block.unlink()
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            if isinstance(error, BrokenProcessPool):
+                # 子进程异常退出后进程池不可再用，下次渲染时重新创建
+                self._executor = None
+            self.failed.emit(key, str(error) or type(error).__name__)
+            return
+        width, height, pixels, shown = future.result()
+        # QImage不持有字节串，复制一份
+        image = QImage(pixels, width, height, width * 4, QImage.Format.Format_RGBA8888).copy()
+        self.image_ready.emit(key, image, shown)
+
+
+class ChartPanel(QWidget):
+    """
+    图表面板
+
+    信号:
+        rendered(str): 图表更新后发出，参数为绘制点数说明
+
+    属性:
+        store: DataStore - 绘制的数据
+        figure: Figure - 持续使用的图形
+        canvas: FigureCanvasQTAgg - 画布
+        axes: Axes - 持续使用的坐标轴
+        image_label: QLabel - 显示子进程渲染的图像
+        renderer: ChartRenderer - 子进程渲染器
+    """
+    rendered = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        """初始化图表面板"""
+        super().__init__(parent)
+        self.store = None
+        self._key = None  # 已绘制图表的 (数据存储, 数据版本, 视图版本, 列名, 图表类型)
+        self._chart = None  # 已绘制的 (列名, 图表类型)
+        self._artist = None  # 折线图、散点图的数据元素，在其上更新数据
+        self._plotted = None  # 数据元素当前的 (横坐标, 纵坐标)
+        self._background = None  # 不含数据元素的坐标区截图，用于blit
+        self._image = None  # 子进程渲染的图像，面板大小变化时缩放显示
+        self._total = 0  # 正在渲染的图表的数据点数
+
+        # 列与图表类型选择
+        self.column_combo = QComboBox()
+        self.type_combo = QComboBox()
+        self.type_combo.addItems(CHART_TYPES)
+        self.info_label = QLabel()
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("列:"))
+        controls.addWidget(self.column_combo, 1)
+        controls.addWidget(QLabel("图表类型:"))
+        controls.addWidget(self.type_combo)
+        controls.addWidget(self.info_label, 2)
+
+        # 画布
+        self.figure = Figure(figsize=(8, 6))
+        self.canvas = FigureCanvasQTAgg(self.figure)
+        self.axes = self.figure.add_subplot()
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+        # 子进程渲染的图像与画布叠放，按图表类型切换显示
+        self.image_label = QLabel()
+        self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.image_label.setMinimumSize(1, 1)
+        self.stack = QStackedWidget()
+        self.stack.addWidget(self.canvas)
+        self.stack.addWidget(self.image_label)
+        self.renderer = ChartRenderer(self)
+        self.renderer.image_ready.connect(self._on_image_ready)
+        self.renderer.failed.connect(self._on_render_failed)
+
+        layout = QVBoxLayout()
+        layout.addLayout(controls)
+        layout.addWidget(self.stack, 1)
+        self.setLayout(layout)
+
+        # 连续的数据修改合并为一次刷新
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(CHART_REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+        self.column_combo.currentIndexChanged.connect(self.refresh)
+        self.type_combo.currentIndexChanged.connect(self.refresh)
+
+    def set_store(self, store):
+        """切换数据存储"""
+        self.store = store
+        self._key = None
+        self.update_columns()
+
+    def update_columns(self):
+        """数据的列变化后更新列选择框，保留当前选中的列；该列已被删除时不再选中任何列并提示"""
+        names = [str(name) for name in self.store.column_names()] if self.store is not None else []
+        current = self.column_combo.currentText()
+        self.column_combo.blockSignals(True)
+        self.column_combo.clear()
+        self.column_combo.addItems(names)
+        if current in names:
+            self.column_combo.setCurrentText(current)
+        elif current and self._key is not None:
+            self.column_combo.setCurrentIndex(-1)
+            self._key = None
+            self._show_message(f"没有{current}列，请重新选择要绘制的列")
+        self.column_combo.blockSignals(False)
+        self.schedule_refresh()
+
+    def show_column(self, name=None, chart_type=None):
+        """
+        选择要绘制的列与图表类型并立即绘制
+
+        参数:
+            name: str - 列名，None表示保持当前选择
+            chart_type: str - 图表类型，None表示保持当前选择
+        返回值: 无
+        """
+        for combo, text in ((self.column_combo, name), (self.type_combo, chart_type)):
+            if text is not None:
+                combo.blockSignals(True)
+                combo.setCurrentText(str(text))
+                combo.blockSignals(False)
+        self.refresh()
+
+    def schedule_refresh(self):
+        """数据变化后延迟刷新"""
+        self._timer.start()
+
+    def refresh(self):
+        """按当前选择绘制图表；面板不可见或数据、视图、列、图表类型都没有变化时直接返回"""
+        store = self.store
+        column = self.column_combo.currentText()
+        chart_type = self.type_combo.currentText()
+        if store is None or not column or not self.isVisible():
+            return
+        key = (store, store.version, store.view_version, column, chart_type)
+        if key == self._key:
+            return
+        self._key = key
+        if store.read_only:
+            self._show_message("分页浏览模式下不能绘制图表，请使用“打开”完整加载")
+            return
+
+        # 收集列数据，非数值数据跳过
+        names = [str(name) for name in store.column_names()]
+        if column not in names:
+            self._show_message(f"没有{column}列，请重新选择要绘制的列")
+            return
+        series = store.numeric_column(names.index(column))
+        values = series.to_numpy()
+        rows = series.index.to_numpy() + 1  # 使用行号作为横坐标
+        if len(values) == 0:
+            self._show_message(f"{column}列没有可绘制的数值数据")
+            return
+
+        if chart_type in _REMOTE_TYPES:
+            # 结果返回前保留当前显示的图表
+            self._total = len(values)
+            self.renderer.submit(key, column, chart_type, rows, values,
+                                 max(self.stack.width(), 200), max(self.stack.height(), 150))
+            self.info_label.setText("正在渲染...")
+            return
+        if chart_type in _IN_PLACE_TYPES and (column, chart_type) == self._chart:
+            shown = self._update_points(chart_type, rows, values)
+        else:
+            shown = self._draw_chart(column, chart_type, rows, values)
+        self._report(column, chart_type, shown, len(values))
+
+    def _report(self, column, chart_type, shown, total):
+        """显示绘制点数并发出 rendered 信号"""
+        info = f"绘制 {shown:,} / {total:,} 个数据点" + ("，已降采样" if shown < total else "")
+        self.info_label.setText(info)
+        self.rendered.emit(f"已生成{column}列的{chart_type} ({info})")
+
+    def _on_image_ready(self, key, image, shown):
+        """显示子进程渲染的图像，已过期的结果(期间数据或选择又变化)直接丢弃"""
+        if key != self._key:
+            return
+        _, _, _, column, chart_type = key
+        self._image = image
+        self._artist = None
+        self._plotted = None
+        self._chart = (column, chart_type)
+        self._show_image()
+        self.stack.setCurrentWidget(self.image_label)
+        self._report(column, chart_type, shown, self._total)
+
+    def _on_render_failed(self, key, message):
+        """渲染失败时显示错误信息"""
+        if key == self._key:
+            self._show_message(f"图表渲染失败: {message}")
+
+    def _show_image(self):
+        """按显示区域大小缩放图像"""
+        if self._image is not None:
+            self.image_label.setPixmap(QPixmap.fromImage(self._image).scaled(
+                self.image_label.size(), Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation))
+
+    def resizeEvent(self, event):
+        """面板大小变化时缩放已渲染的图像"""
+        super().resizeEvent(event)
+        self._show_image()
+
+    def _draw_chart(self, column, chart_type, rows, values):
+        """
+        在同一坐标轴上重新绘制图表
+
+        参数:
+            column: str - 列名
+            chart_type: str - 图表类型
+            rows: np.ndarray - 行号
+            values: np.ndarray - 数值
+        返回值: int - 绘制的点数
+        """
+        axes = self.axes
+        axes.clear()
+        axes.set_axis_on()
+        axes.set_aspect("auto")
+        # 折线和散点不参与整体重绘，在 _on_draw 中单独绘制，更新数据时可以只重绘它
+        shown, self._artist = draw_chart(axes, column, chart_type, rows, values, animated=True)
+        self._plotted = None
+        if chart_type == "折线图":
+            self._plotted = tuple(np.asarray(data) for data in self._artist.get_data())
+        elif chart_type == "散点图":
+            offsets = np.asarray(self._artist.get_offsets())
+            self._plotted = (offsets[:, 0], offsets[:, 1])
+        self._chart = (column, chart_type)
+        self._image = None
+        self.stack.setCurrentWidget(self.canvas)
+        self.figure.tight_layout()
+        self.canvas.draw_idle()
+        return shown
+
+    def _update_points(self, chart_type, rows, values):
+        """
+        在原有的折线或散点上更新数据
+
+        采样后的点与已绘制的相同时不重绘；新数据在当前坐标范围内时只重绘数据元素，否则整体重绘
+
+        返回值: int - 绘制的点数
+        """
+        x, y = self._sample(chart_type, rows, values)
+        old_x, old_y = self._plotted
+        if np.array_equal(x, old_x) and np.array_equal(y, old_y):
+            return len(x)
+        if chart_type == "折线图":
+            self._artist.set_data(x, y)
+            self._artist.set_marker('o' if len(x) == len(values) else '')
+        else:
+            self._artist.set_offsets(np.column_stack([x, y]))
+        self._plotted = (x, y)
+
+        (left, right), (bottom, top) = self.axes.get_xlim(), self.axes.get_ylim()
+        inside = left <= x.min() and x.max() <= right and bottom <= y.min() and y.max() <= top
+        if inside and self._background is not None:
+            self.canvas.restore_region(self._background)
+            self.axes.draw_artist(self._artist)
+            self.canvas.blit(self.axes.bbox)
+        else:
+            # 坐标范围变化，按新数据重新计算范围后整体重绘
+            self.axes.ignore_existing_data_limits = True
+            self.axes.update_datalim(np.column_stack([x, y]))
+            self.axes.autoscale_view()
+            self.canvas.draw_idle()
+        return len(x)
+
+    def _sample(self, chart_type, rows, values):
+        """按图表类型降采样，返回 (横坐标, 纵坐标)"""
+        return sample_points(chart_type, rows, values)
+
+    def _on_draw(self, event):
+        """整体重绘后保存不含数据元素的背景，再画出数据元素"""
+        self._background = self.canvas.copy_from_bbox(self.axes.bbox)
+        if self._artist is not None:
+            self.axes.draw_artist(self._artist)
+
+    def _show_message(self, text):
+        """在画布中央显示提示文本"""
+        self.axes.clear()
+        self.axes.set_axis_off()
+        self.axes.text(0.5, 0.5, text, ha="center", va="center", transform=self.axes.transAxes)
+        self._artist = None
+        self._plotted = None
+        self._chart = None
+        self._image = None
+        self.stack.setCurrentWidget(self.canvas)
+        self.info_label.setText("")
+        self.canvas.draw_idle()
+        self.rendered.emit(text)
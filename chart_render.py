@@ -0,0 +1,131 @@
+"""
+图表绘制与子进程渲染模块
+draw_chart 在给定坐标轴上绘制一种图表，界面中的图表面板与子进程共用；
+render_chart 在子进程中用Agg后端渲染，列数据通过共享内存传入，不经过管道复制，渲染出的RGBA图像返回界面显示
+"""
+
+import numpy as np  # 数值计算库
+from multiprocessing import shared_memory  # 进程间共享列数据
+
+from chart_sampling import lttb_indices, minmax_indices, bin_values, top_n
+
+CHART_DPI = 100  # 子进程渲染图像的分辨率
+
+
+def draw_chart(axes, column, chart_type, rows, values, animated=False):
+    """
+    在坐标轴上绘制图表，数据点较多时先降采样
+
+    参数:
+        axes: Axes - 空的坐标轴
+        column: str - 列名，用于标题
+        chart_type: str - 图表类型 柱状图/折线图/饼图/箱线图/散点图
+        rows: np.ndarray - 行号，作为横坐标
+        values: np.ndarray - 数值，不含NaN
+        animated: bool - 折线和散点是否不参与整体重绘(由调用方blit)
+    返回值: (int, Artist) - 绘制的点数、折线或散点的数据元素(其他图表为None)
+    """
+    shown = len(values)
+    artist = None
+
+    if chart_type == "柱状图":
+        # 行数较多时每柱为一段连续行的平均值，竖线标出该段的最小值和最大值
+        starts, means, lows, highs = bin_values(values)
+        if len(starts) == len(values):
+            axes.bar(rows, values)
+        else:
+            ends = np.append(starts[1:], len(values)) - 1
+            centers = (rows[starts] + rows[ends]) / 2
+            widths = (rows[ends] - rows[starts] + 1) * 0.8
+            axes.bar(centers, means, width=widths)
+            axes.vlines(centers, lows, highs, colors="black", linewidth=0.8)
+        shown = len(starts)
+        axes.set_xlabel("行号")
+        axes.set_ylabel("数值")
+
+    elif chart_type in ("折线图", "散点图"):
+        x, y = sample_points(chart_type, rows, values)
+        if chart_type == "折线图":
+            artist, = axes.plot(x, y, marker='o' if len(x) == len(values) else '', animated=animated)
+        else:
+            artist = axes.scatter(x, y, animated=animated)
+        shown = len(x)
+        axes.set_xlabel("行号")
+        axes.set_ylabel("数值")
+
+    elif chart_type == "饼图":
+        # 只单独显示最大的若干项
+        sizes, labels = top_n(values, rows)
+        axes.pie(sizes, labels=labels, autopct='%1.1f%%')
+        shown = len(sizes)
+
+    elif chart_type == "箱线图":
+        import seaborn as sns  # 基于matplotlib的高级可视化库，提供更美观的统计图表
+        sns.boxplot(data=values, ax=axes)
+        axes.set_ylabel("数值")
+
+    axes.set_title(f"{column}列{chart_type}")
+    return shown, artist
+
+
+def sample_points(chart_type, rows, values):
+    """折线图按LTTB、散点图按每段最小最大值降采样，返回 (横坐标, 纵坐标)"""
+    selected = lttb_indices(values) if chart_type == "折线图" else minmax_indices(values)
+    return rows[selected], values[selected]
+
+
+def share_columns(rows, values):
+    """
+    把行号与数值复制到新建的共享内存中
+
+    参数:
+        rows: np.ndarray - 行号
+        values: np.ndarray - 数值
+    返回值: SharedMemory - 共享内存，内容为 (2, 行数) 的浮点数组；用完后由调用方 close 并 unlink
+    """
+    count = len(values)
+    block = shared_memory.SharedMemory(create=True, size=max(2 * count * 8, 1))
+    data = np.ndarray((2, count), dtype=np.float64, buffer=block.buf)
+    data[0] = rows
+    data[1] = values
+    del data  # 释放对共享内存的引用，否则无法关闭
+    return block
+
+
+def init_worker():
+    """渲染子进程初始化：使用不依赖界面的Agg后端"""
+    import matplotlib  # 数据可视化库
+    matplotlib.use("Agg")
+
+
+def render_chart(name, count, column, chart_type, width, height, dpi=CHART_DPI):
+    """
+    在子进程中渲染图表
+
+    参数:
+        name: str - share_columns 创建的共享内存名称
+        count: int - 行数
+        column: str - 列名
+        chart_type: str - 图表类型
+        width: int - 图像宽度(像素)
+        height: int - 图像高度(像素)
+        dpi: int - 分辨率
+    返回值: (int, int, bytes, int) - 图像宽度、高度、RGBA像素、绘制的点数
+    """
+    from matplotlib.figure import Figure  # 不经过pyplot创建图形
+    from matplotlib.backends.backend_agg import FigureCanvasAgg  # 渲染到内存的画布
+
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        # 图形元素可能引用传入的数组，先复制出来再关闭共享内存
+        rows, values = np.ndarray((2, count), dtype=np.float64, buffer=block.buf).copy()
+    finally:
+        block.close()
+
+    figure = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    canvas = FigureCanvasAgg(figure)
+    shown, _ = draw_chart(figure.add_subplot(), column, chart_type, rows, values)
+    figure.tight_layout()
+    canvas.draw()
+    image_width, image_height = canvas.get_width_height()
+    return image_width, image_height, bytes(canvas.buffer_rgba()), shown
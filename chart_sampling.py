@@ -0,0 +1,117 @@
+"""
+图表降采样模块
+数据点远多于屏幕像素时，先在numpy中缩减为与像素数相当的点再交给matplotlib：
+折线图用LTTB(最大三角形三桶)采样，散点图每段保留最小值和最大值，柱状图分箱，饼图保留最大的N项；
+全列的最小值和最大值总是保留
+"""
+
+import numpy as np  # 数值计算库
+
+CHART_MAX_POINTS = 2000  # 折线图、散点图最多绘制的点数，约为图表宽度的像素数
+BAR_MAX_BINS = 100  # 柱状图最多绘制的柱数
+PIE_TOP_N = 10  # 饼图最多单独显示的扇区数，其余合并为“其他”
+
+
+def lttb_indices(values, threshold=CHART_MAX_POINTS):
+    """
+    按LTTB算法选出代表折线形状的点
+
+    首尾两点固定，中间的点均分为 threshold-2 段，每段选出与前一个选中点、下一段平均点
+    构成的三角形面积最大的点；最后补上全列的最小值和最大值
+
+    参数:
+        values: np.ndarray - 按行顺序排列的数值，不含NaN
+        threshold: int - 采样后的点数
+    返回值: np.ndarray - 选中点的位置，从小到大
+    """
+    count = len(values)
+    if count <= threshold or threshold < 3:
+        return np.arange(count)
+    y = np.asarray(values, dtype=float)
+    edges = np.linspace(1, count - 1, threshold - 1).astype(np.int64)
+    # 每段的平均点，作为前一段选点时的第三个顶点
+    sizes = np.diff(edges)
+    average_x = (edges[:-1] + edges[1:] - 1) / 2
+    average_y = np.add.reduceat(y[1:count - 1], edges[:-1] - 1) / sizes
+    average_x = np.append(average_x, count - 1)
+    average_y = np.append(average_y, y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, count - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        x = np.arange(start, end)
+        area = np.abs((previous - average_x[bucket + 1]) * (y[start:end] - y[previous])
+                      - (previous - x) * (average_y[bucket + 1] - y[previous]))
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return with_extremes(selected, y)
+
+
+def minmax_indices(values, buckets=CHART_MAX_POINTS // 2):
+    """
+    把数值均分为若干段，每段保留最小值和最大值所在的点
+
+    参数:
+        values: np.ndarray - 按行顺序排列的数值，不含NaN
+        buckets: int - 段数，采样后最多 2*buckets 个点
+    返回值: np.ndarray - 选中点的位置，从小到大
+    """
+    count = len(values)
+    if count <= 2 * buckets:
+        return np.arange(count)
+    y = np.asarray(values, dtype=float)
+    # 补齐为 段数 x 段长 的矩阵，按行求最小值和最大值的位置
+    width = -(-count // buckets)
+    rows = -(-count // width)
+    grid = np.full(rows * width, np.nan)
+    grid[:count] = y
+    grid = grid.reshape(rows, width)
+    padding = np.isnan(grid)
+    starts = np.arange(rows) * width
+    selected = np.concatenate([starts + np.where(padding, np.inf, grid).argmin(axis=1),
+                               starts + np.where(padding, -np.inf, grid).argmax(axis=1)])
+    return with_extremes(selected, y)
+
+
+def with_extremes(indices, values):
+    """把全列最小值和最大值的位置并入选中的位置，返回去重排序后的位置"""
+    return np.unique(np.concatenate([indices, [int(np.argmin(values)), int(np.argmax(values))]]))
+
+
+def bin_values(values, bins=BAR_MAX_BINS):
+    """
+    把按行顺序排列的数值连续分箱
+
+    参数:
+        values: np.ndarray - 数值，不含NaN
+        bins: int - 箱数，数值个数不超过箱数时每个数值一箱
+    返回值: (np.ndarray, np.ndarray, np.ndarray, np.ndarray) - 每箱的起始位置、平均值、最小值、最大值
+    """
+    y = np.asarray(values, dtype=float)
+    edges = np.unique(np.linspace(0, len(y), min(bins, len(y)) + 1).astype(np.int64))
+    starts = edges[:-1]
+    means = np.add.reduceat(y, starts) / np.diff(edges)
+    return starts, means, np.minimum.reduceat(y, starts), np.maximum.reduceat(y, starts)
+
+
+def top_n(values, labels, n=PIE_TOP_N, other="其他"):
+    """
+    保留数值最大的n项，其余合并为一项
+
+    参数:
+        values: np.ndarray - 数值
+        labels: np.ndarray - 与数值对应的标签
+        n: int - 保留的项数
+        other: str - 合并项的标签
+    返回值: (np.ndarray, list) - 按原顺序排列的保留项数值(合并项在末尾)、对应标签
+    """
+    values = np.asarray(values, dtype=float)
+    if len(values) <= n + 1:
+        return values, [str(label) for label in labels]
+    keep = np.sort(np.argpartition(values, len(values) - n)[len(values) - n:])
+    rest = np.ones(len(values), dtype=bool)
+    rest[keep] = False
+    return (np.append(values[keep], values[rest].sum()),
+            [str(labels[i]) for i in keep] + [other])
@@ -0,0 +1,146 @@
+"""
+列索引模块
+为单列建立哈希索引(等值查找、查重)与有序索引(范围、前缀查找)，查找时只需定位行号而不扫描整列
+"""
+
+import numpy as np  # 数值计算库
+import pandas as pd  # 数据处理库
+
+# 文本前缀查找的上界后缀，任何以前缀开头的文本都小于 前缀+该字符
+_MAX_CHAR = "\U0010ffff"
+
+
+def is_indexable(series):
+    """
+    是否可以为该列建立用于条件查找的索引
+
+    数值、日期列按原生值建立索引，文本列按显示文本建立索引；分类列的条件只在类别上计算，无需索引
+    """
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype):
+        return dtype.kind in "iufM" or dtype == object
+    return isinstance(dtype, pd.StringDtype)
+
+
+def is_text_index(series):
+    """索引是否按文本建立"""
+    return series.dtype == object or isinstance(series.dtype, pd.StringDtype)
+
+
+class _Groups:
+    """按编码分组的行号，同一编码的行号连续存放且保持原顺序"""
+
+    def __init__(self, codes, count):
+        """
+        参数:
+            codes: np.ndarray - 每行的编码，0..count-1，-1表示不参与索引
+            count: int - 编码个数
+        """
+        valid = codes >= 0
+        self.positions = np.flatnonzero(valid)[np.argsort(codes[valid], kind="stable")]
+        self.offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes[valid], minlength=count), out=self.offsets[1:])
+
+    def rows(self, start, stop):
+        """返回编码在 [start, stop) 范围内的全部行号"""
+        return self.positions[self.offsets[start]:self.offsets[stop]]
+
+
+class HashIndex:
+    """
+    哈希索引，用于等值查找与查重
+
+    属性:
+        codes: np.ndarray - 每行原始值的编码，值相同的行编码相同，空值也有自己的编码
+        text: bool - 是否按文本(空值为空字符串)查找
+    """
+
+    def __init__(self, series):
+        """为一列建立哈希索引"""
+        self.text = is_text_index(series)
+        codes, uniques = pd.factorize(series, use_na_sentinel=False)
+        self.codes = codes
+        # 查找键与编码一一对应，pandas索引内部用哈希表查找；按文本查找时不同原始值可能显示为相同文本
+        self._keys = pd.Index(_text(pd.Series(uniques, dtype=object)) if self.text else uniques)
+        self._groups = None
+
+    def equal_rows(self, value):
+        """
+        查找等于指定值的行
+
+        参数:
+            value: 与索引建立方式一致的值(文本索引为str，否则为列类型的值)
+        返回值: np.ndarray - 行号
+        """
+        try:
+            location = self._keys.get_loc(value)
+        except (KeyError, TypeError):
+            return np.empty(0, dtype=np.int64)
+        if self._groups is None:
+            self._groups = _Groups(self.codes, len(self._keys))
+        if isinstance(location, (int, np.integer)):
+            return self._groups.rows(location, location + 1)
+        # 多个原始值显示为相同文本时返回切片或布尔掩码
+        codes = np.arange(len(self._keys))[location]
+        return np.concatenate([self._groups.rows(code, code + 1) for code in codes])
+
+
+class SortedIndex:
+    """
+    有序索引，用于范围查找，文本索引还支持前缀查找
+
+    空值不参与数值/日期列的查找；文本索引中空值按空字符串处理，与逐行比较的结果一致
+
+    属性:
+        text: bool - 是否按文本建立
+    """
+
+    def __init__(self, series):
+        """为一列建立有序索引"""
+        self.text = is_text_index(series)
+        values = _text(series) if self.text else series
+        codes, uniques = pd.factorize(values, sort=True)
+        if self.text:
+            self._uniques = np.asarray(uniques, dtype=object)
+        else:
+            self._uniques = uniques
+        self._groups = _Groups(codes, len(uniques))
+
+    def range_rows(self, operator, value):
+        """
+        查找满足大小比较的行
+
+        参数:
+            operator: str - >、<、>=、<=
+            value: 与索引建立方式一致的比较值
+        返回值: np.ndarray - 行号，按值从小到大排列
+        """
+        count = len(self._uniques)
+        if operator == ">":
+            start, stop = self._search(value, "right"), count
+        elif operator == ">=":
+            start, stop = self._search(value, "left"), count
+        elif operator == "<":
+            start, stop = 0, self._search(value, "left")
+        elif operator == "<=":
+            start, stop = 0, self._search(value, "right")
+        else:
+            raise ValueError(f"不支持的运算符: {operator}")
+        return self._groups.rows(start, stop)
+
+    def prefix_rows(self, prefix):
+        """查找以指定文本开头的行，只用于文本索引"""
+        start = self._search(prefix, "left")
+        stop = self._search(prefix + _MAX_CHAR, "left")
+        return self._groups.rows(start, stop)
+
+    def _search(self, value, side):
+        """二分查找值在有序不重复值中的位置"""
+        return int(self._uniques.searchsorted(value, side=side))
+
+
+def _text(series):
+    """把一列转换为文本，空值为空字符串"""
+    if isinstance(series.dtype, pd.StringDtype):
+        return series.fillna("")
+    return series.astype(str).where(series.notna(), "")
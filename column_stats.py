@@ -0,0 +1,284 @@
+"""
+列统计模块
+计算数值列的基础统计量，界面与命令行批处理共用；
+内存中的数据每列只做一次分区和一次求和，分页或分块读取的数据按块累加(可合并的Welford算法)；
+近似统计时另用草图估计分位数、不同值个数和高频值，内存占用与行数无关
+"""
+
+import numpy as np  # 数值计算库
+import pandas as pd  # 数据处理库
+
+from sketches import KllSketch, HyperLogLog, SpaceSaving
+
+# 统计量名称，与结果表的列对应
+STAT_NAMES = ("数据个数", "平均值", "标准差", "最小值", "25%分位数", "中位数", "75%分位数", "最大值")
+QUANTILES = (0.25, 0.5, 0.75)  # 与STAT_NAMES中的分位数对应
+STATS_CHUNK_ROWS = 200_000  # 按块统计时每块的行数
+# 近似统计时结果表增加的列
+APPROX_NAMES = ("不同值个数(约)", "高频值")
+HEAVY_HITTERS = 5  # 结果中列出的高频值个数
+
+# 可以转换为浮点数的文本格式
+_NUMBER_PATTERN = r"[+-]?(\d+\.?\d*|\.\d+)(e[+-]?\d+)?|[+-]?(inf|infinity|nan)"
+
+
+def numeric_values(series):
+    """
+    把一列转换为浮点数组
+
+    数值列直接转换；文本等其他类型的列只转换不同值，再按编码映射回各行
+
+    参数:
+        series: pd.Series - 数据列
+    返回值: np.ndarray - 与该列等长的浮点数组，空值与不能转换为数值的单元格为NaN
+    """
+    if pd.api.types.is_bool_dtype(series.dtype) or pd.api.types.is_numeric_dtype(series.dtype):
+        return series.to_numpy(dtype=float, na_value=np.nan)
+    if pd.api.types.is_datetime64_any_dtype(series.dtype) or pd.api.types.is_timedelta64_dtype(series.dtype):
+        return np.full(len(series), np.nan)
+    codes, uniques = pd.factorize(series)
+    texts = pd.Series(uniques).astype(str).str.strip()
+    # 先用正则筛出形如数值的文本再批量转换，逐个尝试转换失败的文本(如日期)代价很高
+    numeric = texts.str.fullmatch(_NUMBER_PATTERN, case=False).to_numpy(dtype=bool)
+    values = np.full(len(texts), np.nan)
+    values[numeric] = texts.to_numpy(dtype=object)[numeric].astype(float)
+    # 编码-1(空值)取到末尾的NaN
+    return np.append(values, np.nan)[codes]
+
+
+def numeric_summary(store, cancelled=None):
+    """
+    计算每个数值列的基础统计量
+
+    只统计有值且可转换为数值的单元格，没有数值的列不出现在结果中
+
+    参数:
+        store: DataStore - 数据存储，按视图中的行统计
+        cancelled: callable - 返回True时停止统计，可为None
+    返回值: pd.DataFrame - 每列一行，列为 列名 与 STAT_NAMES；被取消时返回None
+    """
+    rows = []
+    for col, name in enumerate(store.column_names()):
+        if cancelled is not None and cancelled():
+            return None
+        data = store.numeric_column(col).to_numpy()
+        if len(data):
+            rows.append([name, *exact_stats(data)])
+    return pd.DataFrame(rows, columns=["列名", *STAT_NAMES])
+
+
+def exact_stats(data):
+    """
+    计算一列有效数值的统计量
+
+    最小值、最大值和各分位数所需的位置一次分区得到，平均值与标准差一次求和得到；
+    分位数按线性插值计算，与 np.percentile 一致
+
+    参数:
+        data: np.ndarray - 不含NaN的浮点数组，不能为空
+    返回值: list - 按STAT_NAMES顺序排列的统计量
+    """
+    count = len(data)
+    positions = [q * (count - 1) for q in QUANTILES]
+    lower = [int(position) for position in positions]
+    kth = sorted({0, count - 1, *lower, *(min(i + 1, count - 1) for i in lower)})
+    part = np.partition(data, kth)
+    quantiles = [part[i] + (part[min(i + 1, count - 1)] - part[i]) * (position - i)
+                 for position, i in zip(positions, lower)]
+    mean = data.sum() / count
+    deviations = data - mean
+    std = np.sqrt(np.dot(deviations, deviations) / count)
+    return [count, mean, std, part[0], *quantiles, part[count - 1]]
+
+
+class RunningStats:
+    """
+    按块累加的数值列统计
+
+    每块先求块内的个数、平均值、偏差平方和、最小值、最大值，再按 Chan 等人的公式
+    与已有结果合并，数值稳定且与分块方式无关；两个结果也可以直接合并(如多进程分别统计)。
+    不保存数据，所以不计算分位数
+
+    属性:
+        names: list - 列名
+        count: np.ndarray - 每列的数值个数
+        mean: np.ndarray - 每列的平均值
+        m2: np.ndarray - 每列的偏差平方和
+        minimum: np.ndarray - 每列的最小值
+        maximum: np.ndarray - 每列的最大值
+    """
+
+    def __init__(self, names):
+        """初始化空的统计"""
+        self.names = list(names)
+        size = len(self.names)
+        self.count = np.zeros(size, dtype=np.int64)
+        self.mean = np.zeros(size)
+        self.m2 = np.zeros(size)
+        self.minimum = np.full(size, np.inf)
+        self.maximum = np.full(size, -np.inf)
+
+    def update(self, matrix):
+        """
+        累加一块数据
+
+        参数:
+            matrix: np.ndarray - 形状为 (行数, 列数) 的浮点数组，NaN表示没有数值
+        返回值: 无
+        """
+        valid = ~np.isnan(matrix)
+        count = valid.sum(axis=0)
+        filled = np.where(valid, matrix, 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(count > 0, filled.sum(axis=0) / count, 0.0)
+        deviations = np.where(valid, matrix - mean, 0.0)
+        chunk = RunningStats(self.names)
+        chunk.count = count
+        chunk.mean = mean
+        chunk.m2 = (deviations * deviations).sum(axis=0)
+        chunk.minimum = np.where(valid, matrix, np.inf).min(axis=0, initial=np.inf)
+        chunk.maximum = np.where(valid, matrix, -np.inf).max(axis=0, initial=-np.inf)
+        self.merge(chunk)
+
+    def merge(self, other):
+        """
+        合并另一份同样列的统计
+
+        参数:
+            other: RunningStats - 另一部分数据的统计
+        返回值: 无
+        """
+        total = self.count + other.count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = other.mean - self.mean
+            weight = np.where(total > 0, other.count / total, 0.0)
+            self.mean = self.mean + delta * weight
+            self.m2 = self.m2 + other.m2 + delta * delta * self.count * weight
+        self.count = total
+        self.minimum = np.minimum(self.minimum, other.minimum)
+        self.maximum = np.maximum(self.maximum, other.maximum)
+
+    def result(self, keep_empty=False):
+        """
+        返回统计结果
+
+        参数:
+            keep_empty: bool - 没有数值的列是否也出现在结果中(统计量为空)
+        返回值: pd.DataFrame - 与 numeric_summary 格式相同，分位数为NaN
+        """
+        rows = []
+        for i, name in enumerate(self.names):
+            count = int(self.count[i])
+            if count == 0:
+                if keep_empty:
+                    rows.append([name, 0, *[np.nan] * (len(STAT_NAMES) - 1)])
+                continue
+            std = np.sqrt(self.m2[i] / count)
+            rows.append([name, count, self.mean[i], std, self.minimum[i],
+                         np.nan, np.nan, np.nan, self.maximum[i]])
+        return pd.DataFrame(rows, columns=["列名", *STAT_NAMES])
+
+
+class ColumnSketches:
+    """
+    每列一组可合并的草图：数值的分位数(KLL)、全部值的不同值个数(HyperLogLog)与高频值(Space-Saving)
+
+    属性:
+        names: list - 列名
+    """
+
+    def __init__(self, names):
+        """初始化空的草图"""
+        self.names = list(names)
+        self.quantiles = [KllSketch() for _ in self.names]
+        self.distinct = [HyperLogLog() for _ in self.names]
+        self.frequent = [SpaceSaving() for _ in self.names]
+
+    def update(self, frame, matrix):
+        """
+        累加一块数据
+
+        参数:
+            frame: pd.DataFrame - 数据块
+            matrix: np.ndarray - 该块转换后的浮点数组，形状为 (行数, 列数)
+        返回值: 无
+        """
+        for col in range(len(self.names)):
+            series = frame.iloc[:, col]
+            self.quantiles[col].update(matrix[:, col])
+            self.distinct[col].update(series)
+            self.frequent[col].update(series)
+
+    def merge(self, other):
+        """合并另一份同样列的草图"""
+        for col in range(len(self.names)):
+            self.quantiles[col].merge(other.quantiles[col])
+            self.distinct[col].merge(other.distinct[col])
+            self.frequent[col].merge(other.frequent[col])
+
+    def nbytes(self):
+        """草图占用的字节数(不含高频值的计数表)"""
+        return sum(sketch.nbytes() for sketch in self.quantiles) + sum(
+            sketch.registers.nbytes for sketch in self.distinct)
+
+    def fill(self, summary):
+        """
+        把草图的估计值填入统计结果
+
+        参数:
+            summary: pd.DataFrame - RunningStats.result(keep_empty=True) 的结果，行与列一一对应
+        返回值: pd.DataFrame - 填入分位数并增加 APPROX_NAMES 各列的结果
+        """
+        summary = summary.copy()
+        quantiles = np.array([sketch.quantiles(QUANTILES) for sketch in self.quantiles]).reshape(-1, len(QUANTILES))
+        summary[list(STAT_NAMES[4:7])] = quantiles
+        summary[APPROX_NAMES[0]] = [sketch.estimate() for sketch in self.distinct]
+        summary[APPROX_NAMES[1]] = [_format_frequent(sketch.top(HEAVY_HITTERS)) for sketch in self.frequent]
+        return summary
+
+
+def _format_frequent(top):
+    """把高频值格式化为 值(次数) 列表，只列出扣除高估量后仍出现多次的值"""
+    items = []
+    for value, count, error in top:
+        if count - error > 1:
+            text = f"{value:.6g}" if isinstance(value, float) else str(value)
+            items.append(f"{text}({count})")
+    return ", ".join(items)
+
+
+def streaming_summary(frames, progress=None, cancelled=None, approximate=False):
+    """
+    逐块统计，内存占用只与块大小有关，用于分页浏览的大文件
+
+    参数:
+        frames: iterable - 依次产出 pd.DataFrame 数据块，列相同
+        progress: callable - 每块统计后以已统计行数调用，可为None
+        cancelled: callable - 返回True时停止统计，可为None
+        approximate: bool - 是否用草图估计分位数、不同值个数和高频值
+    返回值: pd.DataFrame - 与 numeric_summary 格式相同，分位数为NaN；近似统计时分位数为估计值，
+            全部列都出现在结果中并增加 APPROX_NAMES 各列；被取消时返回None
+    """
+    stats = None
+    sketches = None
+    rows = 0
+    for frame in frames:
+        if cancelled is not None and cancelled():
+            return None
+        if stats is None:
+            names = [str(name) for name in frame.columns]
+            stats = RunningStats(names)
+            sketches = ColumnSketches(names) if approximate else None
+        if len(frame) and frame.shape[1]:
+            matrix = np.column_stack([numeric_values(frame.iloc[:, col]) for col in range(frame.shape[1])])
+            stats.update(matrix)
+            if sketches is not None:
+                sketches.update(frame, matrix)
+        rows += len(frame)
+        if progress is not None:
+            progress(rows)
+    if stats is None:
+        return pd.DataFrame(columns=["列名", *STAT_NAMES, *(APPROX_NAMES if approximate else ())])
+    if sketches is None:
+        return stats.result()
+    return sketches.fill(stats.result(keep_empty=True))
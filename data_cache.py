@@ -0,0 +1,195 @@
+"""
+数据缓存模块
+把解析后的数据以列式二进制格式缓存，再次打开同一文件时直接读取缓存
+"""
+
+import hashlib  # 由文件路径生成缓存键
+import os  # 文件路径、大小与修改时间
+
+import numpy as np  # 数值计算库，附属文件以npz格式保存
+import pandas as pd  # 数据处理库
+
+try:
+    import pyarrow  # noqa: F401  Feather格式依赖pyarrow
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "python_data_analysis")
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 缓存目录总大小上限 2GB
+
+
+class FileCache:
+    """
+    数据文件的列式缓存
+
+    缓存键由文件绝对路径、修改时间和大小组成，源文件变化后旧缓存自动失效；
+    优先使用Feather格式，未安装pyarrow或数据无法转换时退回pickle；
+    同一缓存键下还可以保存附属文件(如列索引)，与缓存一起失效；
+    缓存总大小超过上限时按最近使用时间淘汰
+
+    属性:
+        cache_dir: str - 缓存目录
+        max_bytes: int - 缓存总大小上限
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        """初始化缓存"""
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def load(self, path):
+        """
+        读取文件对应的缓存
+
+        参数:
+            path: str - 源数据文件路径
+        返回值: pd.DataFrame - 缓存的数据，没有有效缓存时返回None
+        """
+        key = self._key(path)
+        self._remove_stale(path, key)
+        for entry in self._entries(key):
+            try:
+                if entry.endswith(".feather"):
+                    df = pd.read_feather(entry)
+                else:
+                    df = pd.read_pickle(entry)
+            except Exception:
+                # 缓存损坏时删除，重新解析源文件
+                self._remove(entry)
+                continue
+            # 更新修改时间，作为LRU淘汰依据
+            os.utime(entry)
+            return df
+        return None
+
+    def save(self, path, df):
+        """
+        把解析后的数据写入缓存
+
+        参数:
+            path: str - 源数据文件路径
+            df: pd.DataFrame - 解析后的数据
+        返回值: 无
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        key = self._key(path)
+        base = os.path.join(self.cache_dir, key)
+        df = df.reset_index(drop=True)
+        df.columns = [str(name) for name in df.columns]
+        written = None
+        if HAS_PYARROW:
+            try:
+                df.to_feather(base + ".feather.tmp")
+                written = base + ".feather"
+            except Exception:
+                self._remove(base + ".feather.tmp")
+        if written is None:
+            df.to_pickle(base + ".pkl.tmp")
+            written = base + ".pkl"
+        # 先写临时文件再改名，避免读到写了一半的缓存
+        os.replace(written + ".tmp", written)
+        self._evict()
+
+    def sidecar_base(self, path):
+        """
+        返回源文件当前版本的附属文件路径前缀
+
+        参数:
+            path: str - 源数据文件路径
+        返回值: str - 在其后加上 ".名称.npz" 即为附属文件路径
+        """
+        return os.path.join(self.cache_dir, self._key(path))
+
+    def save_sidecar(self, base, name, arrays):
+        """
+        保存附属文件
+
+        参数:
+            base: str - sidecar_base 返回的路径前缀
+            name: str - 附属文件名称
+            arrays: dict - 要保存的数组
+        返回值: 无
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        target = f"{base}.{name}.npz"
+        # np.savez 会自动补上扩展名，临时文件名以 .npz 结尾
+        temp = f"{base}.{name}.tmp.npz"
+        np.savez(temp, **arrays)
+        os.replace(temp, target)
+        self._evict()
+
+    def load_sidecar(self, base, name):
+        """
+        读取附属文件
+
+        返回值: dict - 保存的数组，不存在或损坏时返回None
+        """
+        target = f"{base}.{name}.npz"
+        if not os.path.exists(target):
+            return None
+        try:
+            with np.load(target) as data:
+                arrays = {key: data[key] for key in data.files}
+        except Exception:
+            self._remove(target)
+            return None
+        os.utime(target)
+        return arrays
+
+    def clear(self):
+        """删除全部缓存"""
+        for entry in self._all_entries():
+            self._remove(entry)
+
+    def _key(self, path):
+        """由绝对路径、修改时间和大小生成缓存键"""
+        stat = os.stat(path)
+        return f"{self._path_hash(path)}-{stat.st_mtime_ns}-{stat.st_size}"
+
+    def _path_hash(self, path):
+        """由绝对路径生成固定长度的前缀"""
+        return hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+
+    def _entries(self, key):
+        """返回某个缓存键对应的缓存文件"""
+        base = os.path.join(self.cache_dir, key)
+        return [base + ext for ext in (".feather", ".pkl") if os.path.exists(base + ext)]
+
+    def _all_entries(self):
+        """返回缓存目录中的全部缓存文件"""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        return [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                if name.endswith((".feather", ".pkl", ".npz"))]
+
+    def _remove_stale(self, path, key):
+        """删除同一源文件旧版本的缓存"""
+        prefix = self._path_hash(path) + "-"
+        for entry in self._all_entries():
+            name = os.path.basename(entry)
+            if name.startswith(prefix) and not name.startswith(key + "."):
+                self._remove(entry)
+
+    def _evict(self):
+        """缓存总大小超过上限时，按最近使用时间从旧到新删除"""
+        entries = []
+        for entry in self._all_entries():
+            try:
+                stat = os.stat(entry)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(entry)
+            total -= size
+
+    def _remove(self, entry):
+        """删除缓存文件，忽略不存在的文件"""
+        try:
+            os.remove(entry)
+        except OSError:
+            pass
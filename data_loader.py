@@ -0,0 +1,568 @@
+"""
+数据读取模块
+按块读取CSV/Excel/JSON/NDJSON文件，供界面线程边读边显示
+"""
+
+import ast  # 解析筛选条件中引用的列名
+import codecs  # 增量解码UTF-8
+import io  # 内存字节流，用于按页解析
+import json  # JSON处理模块
+import mmap  # 内存映射文件
+import os  # 文件路径与大小
+import re  # 替换筛选条件中的反引号列名
+from itertools import islice  # 跳过与截取记录
+
+import numpy as np  # 数值计算库
+import pandas as pd  # 数据处理库
+
+# 第一块较小以便尽快显示，之后逐块翻倍，减少合并次数
+FIRST_CHUNK_ROWS = 10000
+MAX_CHUNK_ROWS = 1000000
+
+# JSON记录在内存中是字典，单块行数上限更低；增量解析时每次读取的字节数
+JSON_MAX_BATCH_ROWS = 100000
+JSON_READ_BLOCK_BYTES = 1024 * 1024
+JSON_LINES_EXTENSIONS = (".jsonl", ".ndjson")
+
+SUPPORTED_EXTENSIONS = (".csv", ".xlsx", ".json") + JSON_LINES_EXTENSIONS
+
+# 加载前预览时采样的行数
+SNIFF_ROWS = 200
+
+
+def iter_chunks(path, first_rows=FIRST_CHUNK_ROWS, max_rows=MAX_CHUNK_ROWS, projection=None):
+    """
+    按块读取数据文件
+
+    参数:
+        path: str - 文件路径，支持 .csv/.xlsx/.json/.jsonl/.ndjson
+        first_rows: int - 第一块的行数
+        max_rows: int - 单块最大行数
+        projection: Projection - 只读取部分列和行，None表示读取全部
+    返回值: 生成器，每次产出 (DataFrame, 已读取字节数)，无法统计字节数时为None
+    """
+    if projection is not None and projection.is_full():
+        projection = None
+    lower = path.lower()
+    if lower.endswith(".csv"):
+        chunks = _iter_csv(path, first_rows, max_rows, projection)
+    elif lower.endswith(".xlsx"):
+        chunks = _iter_excel(path, first_rows, max_rows, projection)
+    elif lower.endswith((".json",) + JSON_LINES_EXTENSIONS):
+        chunks = _iter_json(path, first_rows, max_rows, projection)
+    else:
+        raise ValueError("不支持的文件格式")
+    if projection is None:
+        return chunks
+    return ((projection.apply(chunk), bytes_read) for chunk, bytes_read in chunks)
+
+
+def sniff_schema(path, nrows=SNIFF_ROWS):
+    """
+    读取文件开头的少量行并推断各列类型，用于加载前预览
+
+    参数:
+        path: str - 文件路径
+        nrows: int - 采样行数
+    返回值: pd.DataFrame - 采样数据，各列已转换为推断出的类型
+    """
+    from data_store import compact_frame  # 与完整加载使用相同的类型推断
+
+    chunk = next(iter(iter_chunks(path, first_rows=nrows, max_rows=nrows)), None)
+    if chunk is None:
+        return pd.DataFrame()
+    return compact_frame(chunk[0].head(nrows))
+
+
+class Projection:
+    """
+    加载时的列与行投影
+
+    读取文件时只解析需要的列，跳过起始行之前的数据，读满行数后停止；
+    筛选条件使用 DataFrame.query 语法，逐块应用，不满足条件的行不会进入内存
+
+    属性:
+        columns: list - 保留的列名，None表示全部列
+        skip_rows: int - 跳过的起始数据行数
+        row_limit: int - 最多读取的数据行数，None表示不限
+        predicate: str - 行筛选条件，None表示不筛选
+        read_columns: list - 实际需要读取的列(保留列加上筛选条件引用的列)
+    """
+
+    def __init__(self, columns=None, skip_rows=0, row_limit=None, predicate=None, source_columns=None):
+        """
+        初始化投影
+
+        参数:
+            source_columns: list - 文件中的全部列名，用于找出筛选条件引用的列
+        """
+        self.columns = list(columns) if columns is not None else None
+        self.skip_rows = max(int(skip_rows or 0), 0)
+        self.row_limit = row_limit if row_limit else None
+        self.predicate = predicate.strip() if predicate and predicate.strip() else None
+        self.read_columns = self.columns
+        if self.columns is not None and self.predicate and source_columns is not None:
+            # 按文件中的顺序补上条件中引用的列，条件无法解析时读取全部列，由 query 报告错误
+            keep = set(self.columns)
+            referenced = _predicate_names(self.predicate)
+            self.read_columns = [name for name in source_columns
+                                 if name in keep or referenced is None or str(name) in referenced]
+        if self.read_columns is not None and source_columns is not None \
+                and len(self.read_columns) == len(source_columns):
+            self.read_columns = None
+
+    def is_full(self):
+        """是否读取全部行列"""
+        return (self.read_columns is None and self.columns is None and not self.skip_rows
+                and self.row_limit is None and self.predicate is None)
+
+    def slice_rows(self, df):
+        """按起始行和行数截取整表数据"""
+        stop = None if self.row_limit is None else self.skip_rows + self.row_limit
+        return df.iloc[self.skip_rows:stop]
+
+    def apply(self, df):
+        """
+        对已读取的数据块应用筛选条件并只保留所需列
+
+        参数:
+            df: pd.DataFrame - 数据块
+        返回值: pd.DataFrame - 行号重新从0开始的新数据块
+        """
+        if self.predicate is not None:
+            df = df.query(self.predicate)
+        if self.columns is not None:
+            df = df[[name for name in self.columns if name in df.columns]]
+        return df.reset_index(drop=True)
+
+    def records(self, records):
+        """对逐条产出的 (记录, 已读取字节数) 跳过起始行、截取行数并只保留需要的键"""
+        stop = None if self.row_limit is None else self.skip_rows + self.row_limit
+        records = islice(records, self.skip_rows, stop)
+        if self.read_columns is None:
+            yield from records
+            return
+        for record, bytes_read in records:
+            if isinstance(record, dict):
+                record = {name: record.get(name) for name in self.read_columns}
+            yield record, bytes_read
+
+
+def _predicate_names(predicate):
+    """
+    返回 DataFrame.query 筛选条件中引用的名称
+
+    参数:
+        predicate: str - 筛选条件，列名可以写在反引号中
+    返回值: set - 引用的名称，反引号中的列名按原文返回；@开头的局部变量不计入；无法解析时返回None
+    """
+    quoted = []
+
+    def placeholder(match):
+        quoted.append(match.group(1))
+        return f"__quoted_{len(quoted) - 1}__"
+
+    # 反引号中的列名可以包含空格等字符，先替换为合法的标识符再解析
+    text = re.sub(r"`([^`]*)`", placeholder, predicate)
+    text = re.sub(r"@(?=[A-Za-z_])", "__local_", text)
+    try:
+        tree = ast.parse(text.strip(), mode="eval")
+    except SyntaxError:
+        return None
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and not node.id.startswith("__local_"):
+            match = re.fullmatch(r"__quoted_(\d+)__", node.id)
+            names.add(quoted[int(match.group(1))] if match else node.id)
+    return names
+
+
+def file_size(path):
+    """返回文件字节数"""
+    return os.path.getsize(path)
+
+
+def _chunk_sizes(first_rows, max_rows):
+    """产出逐块翻倍的块大小"""
+    size = first_rows
+    while True:
+        yield size
+        size = min(size * 2, max_rows)
+
+
+def _iter_csv(path, first_rows, max_rows, projection=None):
+    """按块读取CSV，块大小逐步增长；有投影时由解析器直接跳过不需要的列和行"""
+    options = {}
+    if projection is not None:
+        options["usecols"] = projection.read_columns
+        if projection.skip_rows:
+            # 第0行是表头，跳过其后的数据行
+            options["skiprows"] = range(1, projection.skip_rows + 1)
+        options["nrows"] = projection.row_limit
+    with open(path, "rb") as f:
+        reader = pd.read_csv(f, iterator=True, **options)
+        try:
+            for size in _chunk_sizes(first_rows, max_rows):
+                try:
+                    chunk = reader.get_chunk(size)
+                except StopIteration:
+                    break
+                yield chunk, f.tell()
+        finally:
+            reader.close()
+
+
+def _iter_excel(path, first_rows, max_rows, projection=None):
+    """以只读流模式逐行读取Excel第一个工作表"""
+    from openpyxl import load_workbook  # Excel读取库，pandas读取xlsx同样依赖它
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(name) if name is not None else f"Unnamed: {i}" for i, name in enumerate(header)]
+        positions = range(len(columns))
+        if projection is not None:
+            stop = None if projection.row_limit is None else projection.skip_rows + projection.row_limit
+            rows = islice(rows, projection.skip_rows, stop)
+            if projection.read_columns is not None:
+                keep = set(projection.read_columns)
+                positions = [i for i, name in enumerate(columns) if name in keep]
+                columns = [columns[i] for i in positions]
+        sizes = _chunk_sizes(first_rows, max_rows)
+        size = next(sizes)
+        batch = []
+        for row in rows:
+            batch.append([row[i] if i < len(row) else None for i in positions])
+            if len(batch) >= size:
+                yield pd.DataFrame(batch, columns=columns).infer_objects(), None
+                batch = []
+                size = next(sizes)
+        if batch:
+            yield pd.DataFrame(batch, columns=columns).infer_objects(), None
+    finally:
+        workbook.close()
+
+
+def _iter_json(path, first_rows, max_rows, projection=None):
+    """
+    按块读取JSON
+
+    支持三种结构: 每行一条记录的NDJSON、顶层为记录数组的JSON、其他结构(整体读取)；
+    前两种边解析边产出数据块，内存中只保留当前一批记录
+    """
+    max_rows = min(max_rows, JSON_MAX_BATCH_ROWS)
+    lower = path.lower()
+    if lower.endswith(JSON_LINES_EXTENSIONS):
+        return _iter_json_lines(path, first_rows, max_rows, projection)
+
+    first = _first_char(path)
+    if first == "[":
+        return _iter_json_array(path, first_rows, max_rows, projection)
+    if first == "{" and _is_json_lines(path):
+        return _iter_json_lines(path, first_rows, max_rows, projection)
+    return _iter_json_whole(path, first_rows, max_rows, projection)
+
+
+def _first_char(path):
+    """返回文件第一个非空白字符"""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        while True:
+            block = f.read(4096)
+            if not block:
+                return ""
+            stripped = block.lstrip()
+            if stripped:
+                return stripped[0]
+
+
+def _is_json_lines(path):
+    """第一行本身是完整的JSON对象且之后还有其他行时视为NDJSON"""
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                try:
+                    if not isinstance(json.loads(line.decode("utf-8-sig")), dict):
+                        return False
+                except ValueError:
+                    return False
+                break
+        return any(line.strip() for line in f)
+
+
+def _records_to_frames(records, first_rows, max_rows):
+    """
+    把逐条产出的记录按块组装为DataFrame
+
+    参数:
+        records: iterable - 依次产出 (记录, 已读取字节数)
+    返回值: 生成器，每次产出 (DataFrame, 已读取字节数)
+    """
+    sizes = _chunk_sizes(first_rows, max_rows)
+    size = next(sizes)
+    batch = []
+    bytes_read = 0
+    for record, bytes_read in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield pd.DataFrame(batch), bytes_read
+            batch = []
+            size = next(sizes)
+    if batch:
+        yield pd.DataFrame(batch), bytes_read
+
+
+def _iter_json_lines(path, first_rows, max_rows, projection=None):
+    """逐行解析NDJSON"""
+    def records():
+        with open(path, "rb") as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                if number == 1:
+                    line = line.decode("utf-8-sig")
+                try:
+                    yield json.loads(line), f.tell()
+                except ValueError as e:
+                    raise ValueError(f"第{number}行不是有效的JSON: {e}") from None
+
+    if projection is not None:
+        return _records_to_frames(projection.records(records()), first_rows, max_rows)
+    return _records_to_frames(records(), first_rows, max_rows)
+
+
+def _iter_json_array(path, first_rows, max_rows, projection=None):
+    """增量解析顶层为记录数组的JSON，每次只在缓冲区中保留未解析的部分"""
+    def records():
+        decoder = json.JSONDecoder()
+        utf8 = codecs.getincrementaldecoder("utf-8-sig")()
+        with open(path, "rb") as f:
+            buffer = ""
+            pos = 0
+            eof = False
+            started = False
+
+            def fill():
+                """读取下一块并丢弃已解析的部分"""
+                nonlocal buffer, pos, eof
+                block = f.read(JSON_READ_BLOCK_BYTES)
+                eof = not block
+                buffer = buffer[pos:] + utf8.decode(block, final=eof)
+                pos = 0
+
+            while True:
+                # 跳过空白与分隔符
+                while True:
+                    while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                        pos += 1
+                    if pos < len(buffer) or eof:
+                        break
+                    fill()
+                if pos >= len(buffer):
+                    raise ValueError("JSON数组不完整")
+                char = buffer[pos]
+                if not started:
+                    if char != "[":
+                        raise ValueError("JSON顶层不是数组")
+                    started = True
+                    pos += 1
+                    continue
+                if char == "]":
+                    return
+                if char == ",":
+                    pos += 1
+                    continue
+                # 解析一个元素，缓冲区中不完整时继续读取
+                while True:
+                    try:
+                        record, end = decoder.raw_decode(buffer, pos)
+                        break
+                    except ValueError:
+                        if eof:
+                            raise
+                        fill()
+                # 缓冲区末尾的数字可能被截断，确认其后还有字符
+                if end >= len(buffer) and not eof:
+                    fill()
+                    continue
+                pos = end
+                yield record, f.tell()
+
+    if projection is not None:
+        return _records_to_frames(projection.records(records()), first_rows, max_rows)
+    return _records_to_frames(records(), first_rows, max_rows)
+
+
+def _iter_json_whole(path, first_rows, max_rows, projection=None):
+    """整体读取其他结构的JSON(如按列组织的对象)后按块切分"""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        json_data = json.load(f)
+    if isinstance(json_data, dict) and not any(isinstance(v, (dict, list)) for v in json_data.values()):
+        # 只有一条记录的对象
+        json_data = [json_data]
+    data = pd.DataFrame(json_data)
+    if projection is not None:
+        data = projection.slice_rows(data)
+        if projection.read_columns is not None:
+            keep = set(projection.read_columns)
+            data = data[[name for name in data.columns if name in keep]]
+    total = file_size(path)
+    start = 0
+    for size in _chunk_sizes(first_rows, max_rows):
+        if start >= len(data):
+            break
+        stop = start + size
+        yield data.iloc[start:stop].reset_index(drop=True), total * min(stop, len(data)) // max(len(data), 1)
+        start = stop
+
+
+# 分页浏览时每页行数与扫描文件时每次读取的字节数
+PAGE_ROWS = 1000
+SCAN_BLOCK_BYTES = 16 * 1024 * 1024
+ROW_INDEX_SIDECAR = "rowidx"  # 行偏移索引在缓存中的附属文件名称
+
+
+class CsvRowIndex:
+    """
+    CSV行偏移索引
+
+    扫描一遍文件，只记录每页第一行的字节偏移，浏览时按页从内存映射文件中解析数据，
+    内存占用与文件大小无关
+
+    属性:
+        path: str - CSV文件路径
+        columns: list - 列名
+        row_count: int - 数据行数(不含表头)
+        page_rows: int - 每页行数
+        offsets: np.ndarray - 每页起始字节偏移，最后一项为数据结束位置
+    """
+
+    def __init__(self, path, columns, row_count, offsets, page_rows=PAGE_ROWS):
+        """初始化行偏移索引"""
+        self.path = path
+        self.columns = columns
+        self.row_count = row_count
+        self.page_rows = page_rows
+        self.offsets = offsets
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if offsets[-1] else None
+
+    @classmethod
+    def build(cls, path, page_rows=PAGE_ROWS, progress=None, cancelled=None, cache=None):
+        """
+        扫描CSV文件建立行偏移索引，索引同时作为缓存的附属文件保存，下次直接使用
+
+        参数:
+            path: str - CSV文件路径
+            page_rows: int - 每页行数
+            progress: callable - 进度回调，参数为已扫描字节数
+            cancelled: callable - 返回True时中止扫描
+            cache: FileCache - 保存索引的缓存，按文件路径、修改时间和大小区分，None表示不保存
+        返回值: CsvRowIndex - 行偏移索引，被取消时返回None
+        """
+        columns = list(pd.read_csv(path, nrows=0).columns)
+        # 扫描前确定附属文件路径，扫描期间文件被修改时索引不会与新版本对应
+        sidecar = cache.sidecar_base(path) if cache is not None else None
+        cached = _load_row_index(cache, sidecar, page_rows)
+        if cached is not None:
+            offsets, row_count = cached
+            return cls(path, columns, row_count, offsets, page_rows)
+
+        size = os.stat(path).st_size
+        pages = []
+        row_count = 0
+        with open(path, "rb") as f:
+            if size == 0:
+                return cls(path, columns, 0, np.zeros(1, dtype=np.uint64), page_rows)
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                # 表头之后即为第一行数据
+                header_end = _find_row_end(mm, 0, size)
+                if header_end < size:
+                    pages.append(header_end)
+                    row_count = 1
+                in_quote = False
+                for base in range(header_end, size, SCAN_BLOCK_BYTES):
+                    if cancelled is not None and cancelled():
+                        return None
+                    block = np.frombuffer(mm, dtype=np.uint8, count=min(SCAN_BLOCK_BYTES, size - base), offset=base)
+                    newlines = np.flatnonzero(block == 10)
+                    quotes = np.flatnonzero(block == 34)
+                    if len(quotes) or in_quote:
+                        # 引号内的换行属于字段内容，按换行前引号个数的奇偶性过滤
+                        inside = (np.searchsorted(quotes, newlines) + in_quote) % 2 == 1
+                        newlines = newlines[~inside]
+                        in_quote = (len(quotes) + in_quote) % 2 == 1
+                    starts = newlines + base + 1
+                    starts = starts[starts < size]
+                    # 只保留每页第一行的偏移
+                    numbers = np.arange(row_count, row_count + len(starts))
+                    pages.extend(starts[numbers % page_rows == 0].tolist())
+                    row_count += len(starts)
+                    del block
+                    if progress is not None:
+                        progress(min(base + SCAN_BLOCK_BYTES, size))
+            finally:
+                mm.close()
+
+        offsets = np.array(pages + [size], dtype=np.uint64)
+        _save_row_index(cache, sidecar, page_rows, offsets, row_count)
+        return cls(path, columns, row_count, offsets, page_rows)
+
+    def page_count(self):
+        """返回页数"""
+        return len(self.offsets) - 1
+
+    def read_page(self, page, count=1):
+        """
+        解析指定页的数据
+
+        参数:
+            page: int - 页号
+            count: int - 连续解析的页数，超出末尾的部分忽略
+        返回值: pd.DataFrame - 这些页的数据，空行与建立索引时一样计为一行空值
+        """
+        last = min(page + count, self.page_count())
+        start, end = int(self.offsets[page]), int(self.offsets[last])
+        return pd.read_csv(io.BytesIO(self._mmap[start:end]), header=None, names=self.columns,
+                           skip_blank_lines=False)
+
+    def close(self):
+        """关闭内存映射与文件"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+
+def _find_row_end(mm, start, size):
+    """返回从start开始的一行(表头)结束后的位置"""
+    end = mm.find(b"\n", start)
+    return size if end < 0 else end + 1
+
+
+def _load_row_index(cache, base, page_rows):
+    """从缓存读取每页行数相同的行偏移索引，没有缓存、不存在或损坏时返回None"""
+    if cache is None:
+        return None
+    arrays = cache.load_sidecar(base, ROW_INDEX_SIDECAR)
+    try:
+        row_count, saved_page_rows = arrays["meta"].tolist()
+        if saved_page_rows != page_rows:
+            return None
+        return arrays["offsets"], row_count
+    except (TypeError, KeyError, ValueError):
+        return None
+
+
+def _save_row_index(cache, base, page_rows, offsets, row_count):
+    """把行偏移索引保存到缓存，缓存目录不可写时忽略"""
+    if cache is None:
+        return
+    meta = np.array([row_count, page_rows], dtype=np.int64)
+    try:
+        cache.save_sidecar(base, ROW_INDEX_SIDECAR, {"offsets": offsets, "meta": meta})
+    except OSError:
+        pass
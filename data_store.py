@@ -0,0 +1,933 @@
+"""
+数据存储模块
+为数据分析平台提供按列存储的数据后端，表格视图只按需读取可见单元格
+"""
+
+import hashlib  # 由列名生成索引文件名
+import warnings  # 屏蔽日期格式推断提示
+from collections import OrderedDict  # 页缓存的LRU顺序
+from contextlib import contextmanager  # 把多次修改合并为一步撤销
+
+import numpy as np  # 数值计算库
+import pandas as pd  # 数据处理库
+
+from collation import DEFAULT_COLLATION, collation_codes, is_text, range_mask
+from filter_engine import coerce_value, column_mask, empty_mask
+from column_index import HashIndex, SortedIndex, is_indexable, is_text_index
+from ngram_index import NgramIndex
+from column_stats import numeric_values
+from undo_history import UndoHistory, UndoStep, CellEdit, ColumnEdit, RowsEdit, ViewEdit
+
+
+class DataStore:
+    """
+    列式数据存储
+
+    排序和筛选不移动、不删除数据，只计算要显示的后端行号作为视图；对外的行号都是视图中的行号，
+    读写单元格时再换算为后端数据中的行号
+
+    属性:
+        df: pd.DataFrame - 后端数据，每列保持读取时的原生类型
+        version: int - 数据版本号，每次修改数据后递增
+        view_version: int - 视图版本号，排序或筛选后递增；与数据版本号一起判断派生结果(如图表)是否过期
+        read_only: bool - 是否只读
+        sort_conditions: list - 当前视图的排序条件 [(列号, 是否升序), ...]，未排序时为空
+        collation: str - 文本列的排序方式(编码/拼音/笔画)，同时用于文本的大小比较
+        filter: Condition/BoolOp - 当前视图的筛选表达式树，未筛选时为None
+        use_indexes: bool - 是否为筛选与查重建立列索引；同一列再次筛选时建立索引(第一次逐行比较更快)，
+            数据修改后失效
+        history: UndoHistory - 撤销/重做历史，每次修改自动记录；加载新数据时清空
+    """
+    read_only = False
+
+    def __init__(self, df=None):
+        """初始化数据存储"""
+        self.df = df if df is not None else pd.DataFrame()
+        self.version = 0
+        self.view_version = 0
+        self.sort_conditions = []
+        self.collation = DEFAULT_COLLATION
+        self.filter = None
+        self.use_indexes = True
+        self.history = UndoHistory()
+        self._step = None  # 正在记录的合并操作
+        self._last_filter = None  # 上一次筛选的 (数据版本, 排序方式, 表达式树, 掩码)
+        self._sidecar = None  # 与数据一致的缓存 (FileCache, 附属文件路径前缀, 数据版本)
+        self._view = None  # 视图行对应的后端行号，None表示按原始顺序
+        self._cache = {}  # 按数据版本缓存的排序键、排列等计算结果
+        self._cache_version = None
+
+    def close(self):
+        """释放资源，内存数据无需处理"""
+
+    def set_frame(self, df):
+        """
+        替换全部数据
+
+        参数:
+            df: pd.DataFrame - 新的数据
+        返回值: 无
+        """
+        # 统一使用默认的0..n-1行索引，保证按位置访问与按标签访问一致
+        self.df = df.reset_index(drop=True)
+        self.sort_conditions = []
+        self.filter = None
+        self._view = None
+        self.history.clear()
+        self.version += 1
+
+    def append(self, chunk):
+        """
+        在末尾追加一块数据，用于分块加载
+
+        参数:
+            chunk: pd.DataFrame - 与现有数据列相同的数据块
+        返回值: 无
+        """
+        start = len(self.df)
+        self.df = pd.concat([self.df, chunk], ignore_index=True)
+        self.history.clear()
+        if self._view is not None:
+            # 新数据显示在视图末尾
+            self._view = np.concatenate([self._view, np.arange(start, len(self.df))])
+        self.version += 1
+
+    def iter_frames(self, chunk_rows):
+        """
+        按块遍历全部数据，用于流式保存
+
+        参数:
+            chunk_rows: int - 每块行数
+        返回值: 生成器，依次按视图顺序产出数据块(未排序时为切片视图，不复制数据)；没有数据行时产出一个只有表头的空块
+        """
+        df = self.df
+        if self._view is None:
+            for start in range(0, len(df), chunk_rows):
+                yield df.iloc[start:start + chunk_rows]
+        else:
+            for start in range(0, len(self._view), chunk_rows):
+                yield df.take(self._view[start:start + chunk_rows])
+        if self.row_count() == 0:
+            yield df.iloc[:0]
+
+    def row_count(self):
+        """返回视图中的行数"""
+        return len(self.df) if self._view is None else len(self._view)
+
+    def column_count(self):
+        """返回数据列数"""
+        return len(self.df.columns)
+
+    def column_names(self):
+        """返回列名列表"""
+        return [str(name) for name in self.df.columns]
+
+    def value(self, row, col):
+        """返回指定单元格的原始值"""
+        return self.df.iat[self._row(row), col]
+
+    def display(self, row, col):
+        """
+        返回指定单元格的显示文本
+
+        参数:
+            row: int - 行号
+            col: int - 列号
+        返回值: str - 单元格文本，空值显示为空字符串
+        """
+        return _format_value(self.df.iat[self._row(row), col])
+
+    def set_value(self, row, col, text):
+        """
+        按列类型写入单元格
+
+        参数:
+            row: int - 行号
+            col: int - 列号
+            text: str - 输入文本，无法转换为列类型时该列退化为object类型
+        返回值: 无
+        """
+        # 只读取列类型，不持有列对象，避免写入时按写时复制复制整列
+        name = self.df.columns[col]
+        value = coerce_value(self.df.dtypes.iloc[col], text)
+        position = self._row(row)
+        before = self.df.iat[position, col]
+        # 列类型变化时保存原列，原列对象已被替换，不需要复制
+        before_column = self._prepare_column(name, value)
+        self.df.iat[position, col] = value
+        self._record("编辑单元格", CellEdit(position, col, before, value, before_column))
+        self.version += 1
+
+    def _prepare_column(self, name, value):
+        """写入值之前按需转换列类型，使该值可以写入；转换时返回被替换的原列，否则返回None"""
+        series = self.df[name]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # 分类列先补充新类别
+            if pd.isna(value) or value in series.cat.categories:
+                return None
+            self.df[name] = series.cat.add_categories([value])
+        elif isinstance(value, str) and not pd.api.types.is_string_dtype(series.dtype):
+            # 类型不兼容时先把整列转为object再写入
+            self.df[name] = series.astype(object)
+        elif pd.api.types.is_integer_dtype(series.dtype) and isinstance(value, float) and not (
+                pd.isna(value) and _holds_missing(series.dtype)):
+            # 整数列写入小数或空值时转为浮点数，可空整数列写入空值时不转换
+            self.df[name] = series.astype(float)
+        elif pd.api.types.is_bool_dtype(series.dtype) and pd.isna(value) and not _holds_missing(series.dtype):
+            self.df[name] = series.astype(object)
+        else:
+            return None
+        return series
+
+    def fill_empty(self, col, text):
+        """
+        把视图中指定列的空值一次性填充为同一个值
+
+        参数:
+            col: int - 列号
+            text: str - 填充值，按列类型转换
+        返回值: int - 填充的单元格数
+        """
+        rows = np.flatnonzero(self.empty_mask(col))
+        if len(rows) == 0:
+            return 0
+        positions = rows if self._view is None else self._view[rows]
+        name = self.df.columns[col]
+        before = self.df[name]
+        value = coerce_value(before.dtype, text)
+        self._prepare_column(name, value)
+        # 在新列上填充，原列保存到撤销历史
+        column = self.df[name].copy()
+        column.iloc[positions] = value
+        self.df[name] = column
+        self._record("填充空值", ColumnEdit(col, (name, before), (name, column)))
+        self.version += 1
+        return len(rows)
+
+    def convert_column(self, col, target_type):
+        """
+        把整列转换为指定类型，无法转换的值变为空值
+
+        参数:
+            col: int - 列号
+            target_type: str - 整数、浮点数、字符串、布尔值
+        返回值: (int, int) - 转换成功的值个数、原来不为空但无法转换的值个数
+        """
+        name = self.df.columns[col]
+        series = self.df[name]
+        if target_type in ("整数", "浮点数"):
+            if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+                converted = series.astype(float)
+            else:
+                converted = _convert_uniques(
+                    series, lambda values: pd.to_numeric(values.astype(str).str.strip(), errors="coerce"), float)
+            if target_type == "整数":
+                converted = converted.round().astype("Int64")
+        elif target_type == "布尔值":
+            def to_bool(values):
+                text = values.astype(str).str.strip().str.lower()
+                result = pd.Series(pd.NA, index=values.index, dtype="boolean")
+                result[text.isin(["true", "1", "yes"]).to_numpy()] = True
+                result[text.isin(["false", "0", "no"]).to_numpy()] = False
+                return result
+            converted = _convert_uniques(series, to_bool, "boolean")
+        elif target_type == "字符串":
+            converted = _convert_uniques(series, lambda values: values.astype(str), str)
+        else:
+            raise ValueError(f"不支持的类型: {target_type}")
+        failed = int((~empty_mask(series) & np.array(converted.isna(), dtype=bool)).sum())
+        self.df[name] = converted
+        self._record("类型转换", ColumnEdit(col, (name, series), (name, converted)))
+        self.version += 1
+        return int(converted.notna().sum()), failed
+
+    def insert_row(self, row):
+        """
+        在指定位置插入空行
+
+        参数:
+            row: int - 视图中的插入位置，超出范围时追加到末尾
+        返回值: int - 实际插入位置
+        """
+        if row < 0 or row > self.row_count():
+            row = self.row_count()
+        empty = _blank_row(self.df)
+        view_before = self._view
+        dtypes = self.df.dtypes
+        if self._view is None:
+            position = row
+            self.df = pd.concat([self.df.iloc[:row], empty, self.df.iloc[row:]], ignore_index=True)
+        else:
+            # 排序视图中新行追加到后端末尾，只在视图中插入到指定位置
+            self.df = pd.concat([self.df, empty], ignore_index=True)
+            position = len(self.df) - 1
+            self._view = np.insert(self._view, row, position)
+        self._record("插入行", RowsEdit([position], self.df.iloc[[position]], view_before, self._view,
+                                        removed=False, dtypes=dtypes))
+        self.version += 1
+        return row
+
+    def delete_row(self, row):
+        """删除视图中的指定行"""
+        position = self._row(row)
+        removed = self.df.iloc[[position]]
+        view_before = self._view
+        self.df = self.df.drop(index=self.df.index[position]).reset_index(drop=True)
+        if self._view is not None:
+            view = np.delete(self._view, row)
+            view[view > position] -= 1
+            self._view = view
+        self._record("删除行", RowsEdit([position], removed, view_before, self._view))
+        self.version += 1
+
+    def keep_rows(self, mask):
+        """
+        只保留掩码为True的行
+
+        参数:
+            mask: np.ndarray - 布尔掩码，长度等于视图行数
+        返回值: int - 被删除的行数
+        """
+        mask = np.asarray(mask, dtype=bool)
+        removed = int((~mask).sum())
+        if removed:
+            view_before = self._view
+            if self._view is None:
+                dropped = np.flatnonzero(~mask)
+                rows = self.df.take(dropped)
+                self.df = self.df[mask].reset_index(drop=True)
+            else:
+                keep = np.ones(len(self.df), dtype=bool)
+                keep[self._view[~mask]] = False
+                dropped = np.flatnonzero(~keep)
+                rows = self.df.take(dropped)
+                # 保留行在新后端数据中的行号
+                positions = np.cumsum(keep) - 1
+                self.df = self.df[keep].reset_index(drop=True)
+                self._view = positions[self._view[mask]]
+            self._record("删除行", RowsEdit(dropped, rows, view_before, self._view))
+            self.version += 1
+        return removed
+
+    def add_column(self, name):
+        """在末尾添加空列"""
+        column = pd.Series(np.nan, index=self.df.index, dtype=object)
+        self.df[name] = column
+        self._record("添加列", ColumnEdit(self.column_count() - 1, None, (name, column)))
+        self.version += 1
+
+    def remove_column(self, col):
+        """删除指定列，视图中的行保持不变，排序与筛选条件中的列号失效，一并清除"""
+        with self.transaction("删除列"):
+            name = self.df.columns[col]
+            self._record("删除列", ColumnEdit(col, (name, self.df.iloc[:, col]), None))
+            self.df = self.df.drop(columns=name)
+            before = self._view_state()
+            self.sort_conditions = []
+            self.filter = None
+            self._record("删除列", ViewEdit(before, self._view_state()))
+        self.version += 1
+
+    def rename_column(self, col, name):
+        """修改指定列的列名"""
+        columns = list(self.df.columns)
+        series = self.df.iloc[:, col]
+        self._record("修改列名", ColumnEdit(col, (columns[col], series), (name, series)))
+        columns[col] = name
+        self.df.columns = columns
+        self.version += 1
+
+    @contextmanager
+    def transaction(self, label):
+        """
+        把代码块中的全部修改合并为一步撤销，可以嵌套，以最外层为准
+
+        参数:
+            label: str - 操作名称
+        返回值: UndoStep - 记录本次修改的一步操作，嵌套时为None
+        用法:
+            with store.transaction("粘贴"):
+                ...
+        """
+        if self._step is not None:
+            yield None
+            return
+        self._step = UndoStep(label)
+        try:
+            yield self._step
+        finally:
+            step, self._step = self._step, None
+            # 出错时已完成的修改也记录下来，可以撤销
+            if step.edits:
+                self.history.record(step)
+
+    def _record(self, label, edit):
+        """记录一次修改，不在合并操作中时单独作为一步"""
+        if self._step is not None:
+            self._step.edits.append(edit)
+            return
+        step = UndoStep(label)
+        step.edits.append(edit)
+        self.history.record(step)
+
+    def undo(self):
+        """
+        撤销最近一步操作
+
+        返回值: UndoStep - 被撤销的操作，没有可撤销的操作时返回None
+        """
+        step = self.history.pop_undo()
+        if step is None:
+            return None
+        step.undo(self)
+        self.version += 1
+        return step
+
+    def redo(self):
+        """
+        重做最近撤销的一步操作
+
+        返回值: UndoStep - 被重做的操作，没有可重做的操作时返回None
+        """
+        step = self.history.pop_redo()
+        if step is None:
+            return None
+        step.redo(self)
+        self.version += 1
+        return step
+
+    def _view_state(self):
+        """返回当前的排序条件、筛选表达式树、文本排序方式与视图"""
+        return (tuple(self.sort_conditions), self.filter, self.collation, self._view)
+
+    def sort(self, conditions, collation=None):
+        """
+        按原生类型多列稳定排序，只改变视图顺序，不移动数据
+
+        参数:
+            conditions: list - [(列号, 是否升序), ...]，条件个数不限，空值始终排在最后
+            collation: str - 同时修改文本列的排序方式，None表示保持不变
+        返回值: 无
+        """
+        before = self._view_state()
+        if collation is not None:
+            self.collation = collation
+        self.sort_conditions = [(int(col), bool(ascending)) for col, ascending in conditions]
+        self._rebuild_view()
+        self._record("排序", ViewEdit(before, self._view_state()))
+
+    def clear_sort(self):
+        """恢复原始顺序，保留筛选条件"""
+        self.sort(())
+
+    def sort_key(self, col):
+        """
+        返回指定列的排序键
+
+        参数:
+            col: int - 列号
+        返回值: np.ndarray - 与后端行对应的整数编码，大小顺序与列值一致，空值为-1；按数据版本缓存；
+            文本列按当前排序方式编码
+        """
+        series = self.df.iloc[:, col]
+        if self.collation != DEFAULT_COLLATION and is_text(series):
+            return self._collation_codes(col)[0]
+        return self._cached(("sort_key", col), lambda: _sort_codes(series))
+
+    def _collation_codes(self, col):
+        """按当前排序方式计算文本列的编码与有序排序键，每列只计算一次"""
+        return self._cached(("collation", col, self.collation),
+                            lambda: collation_codes(self.df.iloc[:, col], self.collation))
+
+    def _argsort(self, conditions):
+        """计算多列排序后的后端行号排列"""
+        keys = []
+        for col, ascending in conditions:
+            codes = self.sort_key(col)
+            key = codes.astype(np.int64)
+            if not ascending:
+                key = int(codes.max()) - key
+            # 空值不论升降序都排在最后
+            key[codes < 0] = np.iinfo(np.int64).max
+            keys.append(key)
+        if len(keys) == 1:
+            return np.argsort(keys[0], kind="stable")
+        # lexsort以最后一个键为主键，且对相等的键保持原顺序
+        return np.lexsort(keys[::-1])
+
+    def _cached(self, key, compute):
+        """读取按数据版本缓存的计算结果，数据修改后缓存全部失效"""
+        if self._cache_version != self.version:
+            self._cache.clear()
+            self._cache_version = self.version
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def _row(self, row):
+        """把视图行号换算为后端行号"""
+        return row if self._view is None else int(self._view[row])
+
+    def _column(self, col):
+        """按视图顺序取出指定列，行索引为视图行号"""
+        series = self.df.iloc[:, col]
+        if self._view is None:
+            return series
+        return series.take(self._view).reset_index(drop=True)
+
+    def condition_mask(self, col, operator, value):
+        """
+        计算单个筛选条件的布尔掩码
+
+        参数:
+            col: int - 列号
+            operator: str - 运算符(=,>,<,<=,>=,!=,包含,不包含,开头为,结尾为,为空,不为空)
+            value: str - 比较值，数值列会先转换为数值再比较
+        返回值: np.ndarray - 按视图顺序，满足条件的行为True
+        """
+        mask = self.column_mask(col, operator, value)
+        return mask if self._view is None else mask[self._view]
+
+    def column_mask(self, col, operator, value, rows=None):
+        """
+        按后端行顺序计算单个筛选条件的布尔掩码，供筛选表达式树调用
+
+        参数:
+            col: int - 列号
+            operator: str - 运算符
+            value: str - 比较值
+            rows: np.ndarray - 只计算这些后端行，None表示全部行
+        返回值: np.ndarray - 满足条件的行为True，长度等于全部行数或rows的长度
+        """
+        series = self.df.iloc[:, col]
+        if operator in (">", "<", "<=", ">=") and self.collation != DEFAULT_COLLATION and is_text(series):
+            # 文本按拼音/笔画比较大小，使用预先计算的编码
+            codes, sorted_keys = self._collation_codes(col)
+            if rows is not None:
+                codes = codes[rows]
+            return range_mask(codes, sorted_keys, operator, value, self.collation)
+        if rows is None and self.use_indexes and self._seen(col):
+            if operator in ("包含", "不包含") and value and is_text_index(series):
+                # 用N元组索引缩小候选范围
+                index = self.ngram_index(col)
+                mask = index.contains_mask(value) if index is not None else None
+                if mask is not None:
+                    return mask if operator == "包含" else ~mask
+            positions = self._indexed_rows(col, series, operator, value)
+            if positions is not None:
+                mask = np.zeros(len(series), dtype=bool)
+                mask[positions] = True
+                return mask
+        if rows is not None:
+            series = series.take(rows)
+        return column_mask(series, operator, value)
+
+    def _seen(self, col):
+        """记录列被筛选过，返回本数据版本中该列之前是否已被筛选过"""
+        seen = self._cached("filtered_columns", set)
+        if col in seen:
+            return True
+        seen.add(col)
+        return False
+
+    def hash_index(self, col):
+        """返回指定列的哈希索引，第一次使用时建立，按数据版本缓存"""
+        return self._cached(("hash_index", col), lambda: HashIndex(self.df.iloc[:, col]))
+
+    def sorted_index(self, col):
+        """返回指定列的有序索引，第一次使用时建立，按数据版本缓存"""
+        return self._cached(("sorted_index", col), lambda: SortedIndex(self.df.iloc[:, col]))
+
+    def attach_cache(self, cache, base):
+        """
+        关联与当前数据一致的文件缓存，数据未修改时N元组索引保存在缓存目录，下次打开同一文件时直接读取
+
+        参数:
+            cache: FileCache - 文件缓存
+            base: str - FileCache.sidecar_base 返回的路径前缀
+        返回值: 无
+        """
+        self._sidecar = (cache, base, self.version)
+
+    def ngram_index(self, col):
+        """返回文本列的N元组索引，第一次使用时读取或建立，按数据版本缓存；列太大时返回None"""
+        return self._cached(("ngram_index", col), lambda: self._load_ngram_index(col))
+
+    def _load_ngram_index(self, col):
+        """优先读取缓存目录中保存的索引，没有时建立索引并保存"""
+        series = self.df.iloc[:, col]
+        name = "ngram-" + hashlib.sha1(str(self.df.columns[col]).encode("utf-8")).hexdigest()[:12]
+        persisted = self._sidecar is not None and self._sidecar[2] == self.version
+        if persisted:
+            cache, base, _ = self._sidecar
+            arrays = cache.load_sidecar(base, name)
+            if arrays is not None:
+                index = NgramIndex.from_arrays(series, arrays)
+                if index is not None:
+                    return index
+        index = NgramIndex.build(series)
+        if index is not None and persisted:
+            try:
+                cache.save_sidecar(base, name, index.to_arrays())
+            except OSError:
+                pass
+        return index
+
+    def _indexed_rows(self, col, series, operator, value):
+        """
+        用列索引查找满足条件的行
+
+        返回值: np.ndarray - 满足条件的后端行号；条件无法用索引计算时返回None
+        """
+        if operator not in ("=", "!=", ">", "<", ">=", "<=", "开头为") or not is_indexable(series):
+            return None
+        if is_text_index(series):
+            target = value
+        else:
+            # 比较值无法转换为列类型时按文本逐行比较
+            target = coerce_value(series.dtype, value)
+            if isinstance(target, str) or pd.isna(target) or operator == "开头为":
+                return None
+        if operator == "=":
+            return self.hash_index(col).equal_rows(target)
+        if operator == "!=":
+            keep = np.ones(len(series), dtype=bool)
+            keep[self.hash_index(col).equal_rows(target)] = False
+            return np.flatnonzero(keep)
+        if operator == "开头为":
+            return self.sorted_index(col).prefix_rows(target)
+        return self.sorted_index(col).range_rows(operator, target)
+
+    def set_filter(self, expression):
+        """
+        设置筛选条件，只改变视图中显示的行，不删除数据
+
+        参数:
+            expression: Condition/BoolOp - 筛选表达式树，None表示清除筛选
+        返回值: 无
+        """
+        before = self._view_state()
+        self.filter = expression
+        self._rebuild_view()
+        self._record("筛选", ViewEdit(before, self._view_state()))
+
+    def clear_filter(self):
+        """清除筛选，显示全部行"""
+        self.set_filter(None)
+
+    def filter_mask(self):
+        """
+        返回当前筛选条件按后端行顺序的掩码，按数据版本缓存；没有筛选时返回None
+
+        新条件比上一次的条件更严格时(如“包含 ab”之于“包含 a”)，只在上一次保留的行中重新计算
+        """
+        if self.filter is None:
+            return None
+        expression = self.filter
+        mask = self._cached(("filter", self.collation, expression.key()), lambda: self._evaluate_filter(expression))
+        self._last_filter = (self.version, self.collation, expression, mask)
+        return mask
+
+    def _evaluate_filter(self, expression):
+        """计算筛选掩码，可以时在上一次的结果上细化"""
+        last = self._last_filter
+        if last is not None and last[:2] == (self.version, self.collation) and expression.narrows(last[2]):
+            rows = np.flatnonzero(last[3])
+            mask = np.zeros(len(self.df), dtype=bool)
+            mask[rows[expression.evaluate(self, rows)]] = True
+            return mask
+        return expression.evaluate(self)
+
+    def total_row_count(self):
+        """返回不论筛选与否的全部数据行数"""
+        return len(self.df)
+
+    def _rebuild_view(self):
+        """按当前的排序与筛选条件重新计算视图"""
+        view = None
+        if self.sort_conditions:
+            view = self._cached(("order", self.collation, tuple(self.sort_conditions)),
+                                lambda: self._argsort(self.sort_conditions))
+        mask = self.filter_mask()
+        if mask is not None:
+            view = np.flatnonzero(mask) if view is None else view[mask[view]]
+        self._view = view
+        self.view_version += 1
+
+    def memory_report(self):
+        """
+        统计各列内存占用
+
+        返回值: pd.DataFrame - 列名、类型、内存(字节)，按内存从大到小排列
+        """
+        return memory_report(self.df)
+
+    def numeric_column(self, col):
+        """
+        取出指定列中可转换为数值的部分
+
+        参数:
+            col: int - 列号
+        返回值: pd.Series - 浮点数序列，索引为视图行号，空值和非数值已剔除
+        """
+        return pd.Series(numeric_values(self._column(col))).dropna()
+
+    def empty_mask(self, col):
+        """
+        计算指定列的空值掩码
+
+        参数:
+            col: int - 列号
+        返回值: np.ndarray - 按视图顺序，空值或空白字符串处为True
+        """
+        return empty_mask(self._column(col))
+
+    def empty_row_mask(self):
+        """返回按视图顺序，所有列都为空的行为True的掩码"""
+        mask = np.ones(self.row_count(), dtype=bool)
+        for col in range(self.column_count()):
+            mask &= self.empty_mask(col)
+            if not mask.any():
+                break
+        return mask
+
+    def duplicate_mask(self, col=None):
+        """
+        计算重复行掩码
+
+        参数:
+            col: int - 只按该列判断重复，None表示按整行判断
+        返回值: np.ndarray - 按视图顺序，与前面某行重复的行为True
+        """
+        if not self.use_indexes:
+            df = self.df if col is None else self.df.iloc[:, [col]]
+            if self._view is not None:
+                df = df.take(self._view)
+            return df.duplicated().to_numpy()
+        # 用各列哈希索引的编码代替原始值判断重复
+        columns = range(self.column_count()) if col is None else [col]
+        codes = {i: self.hash_index(i).codes for i in columns}
+        if self._view is not None:
+            codes = {i: c[self._view] for i, c in codes.items()}
+        if len(codes) == 1:
+            return pd.Series(next(iter(codes.values()))).duplicated().to_numpy()
+        return pd.DataFrame(codes).duplicated().to_numpy()
+
+
+class PagedCsvStore:
+    """
+    分页只读数据存储
+
+    通过CSV行偏移索引按页解析数据，只缓存最近访问的若干页，用于浏览超出内存的大文件
+
+    属性:
+        index: CsvRowIndex - 行偏移索引
+        version: int - 数据版本号，只读数据始终为0
+        view_version: int - 视图版本号，只读数据始终为0
+        read_only: bool - 始终为True
+    """
+    read_only = True
+
+    def __init__(self, index, cache_pages=64):
+        """初始化分页存储"""
+        self.index = index
+        self.version = 0
+        self.view_version = 0
+        self._cache_pages = cache_pages
+        self._pages = OrderedDict()
+
+    def close(self):
+        """关闭内存映射文件"""
+        self._pages.clear()
+        self.index.close()
+
+    def iter_frames(self, chunk_rows):
+        """
+        按页遍历全部数据，不经过页缓存，用于流式保存与按块统计
+
+        参数:
+            chunk_rows: int - 每块的行数，连续的若干页一次解析，向下取整到整页
+        返回值: 生成器，依次产出每块数据
+        """
+        pages = max(chunk_rows // self.index.page_rows, 1)
+        for page in range(0, self.index.page_count(), pages):
+            yield self.index.read_page(page, pages)
+        if self.index.page_count() == 0:
+            yield pd.DataFrame(columns=self.index.columns)
+
+    def row_count(self):
+        """返回数据行数"""
+        return self.index.row_count
+
+    def column_count(self):
+        """返回数据列数"""
+        return len(self.index.columns)
+
+    def column_names(self):
+        """返回列名列表"""
+        return [str(name) for name in self.index.columns]
+
+    def _page(self, page):
+        """读取指定页，按LRU淘汰旧页"""
+        frame = self._pages.get(page)
+        if frame is None:
+            frame = self.index.read_page(page)
+            self._pages[page] = frame
+            if len(self._pages) > self._cache_pages:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page)
+        return frame
+
+    def value(self, row, col):
+        """返回指定单元格的原始值"""
+        page, offset = divmod(row, self.index.page_rows)
+        frame = self._page(page)
+        if offset >= len(frame) or col >= len(frame.columns):
+            return np.nan
+        return frame.iat[offset, col]
+
+    def display(self, row, col):
+        """返回指定单元格的显示文本"""
+        return _format_value(self.value(row, col))
+
+
+def _sort_codes(series):
+    """把一列转换为保持大小顺序的整数编码，空值为-1；混合类型的列按文本排序"""
+    try:
+        codes, _ = pd.factorize(series, sort=True)
+    except TypeError:
+        codes, _ = pd.factorize(series.astype(str).where(series.notna()), sort=True)
+    return codes
+
+
+def _holds_missing(dtype):
+    """该类型能否直接存放空值，numpy的整数和布尔类型不能"""
+    return not (isinstance(dtype, np.dtype) and dtype.kind in "iub")
+
+
+def _blank_row(df):
+    """
+    构造与df列类型一致的一行空值
+
+    整数和布尔列无法存放空值，改用对应的可空类型（Int64、boolean），仍保持整数或布尔值
+
+    参数:
+        df: pd.DataFrame - 要插入空行的数据
+    返回值: pd.DataFrame - 一行空值，列名与df相同
+    """
+    columns = {}
+    for i, dtype in enumerate(df.dtypes):
+        if not _holds_missing(dtype):
+            dtype = pd.array(np.empty(0, dtype=dtype)).dtype
+        columns[i] = pd.Series([None], dtype=dtype)
+    return pd.DataFrame(columns, index=range(1)).set_axis(df.columns, axis=1)
+
+
+def _format_value(value):
+    """单元格显示文本，空值为空字符串，零点的时间只显示日期"""
+    if pd.isna(value):
+        return ""
+    if isinstance(value, pd.Timestamp) and value == value.normalize():
+        return value.strftime("%Y-%m-%d")
+    return str(value)
+
+
+# 不同值个数不超过行数的该比例时，文本列按字典编码为分类类型
+CATEGORY_RATIO = 0.5
+
+
+def compact_frame(df, category_ratio=CATEGORY_RATIO):
+    """
+    推断文本列的原生类型并压缩存储
+
+    文本列依次尝试转换为数值、日期时间，都不满足时，不同值较少的列转为分类类型(字典编码)
+
+    参数:
+        df: pd.DataFrame - 读取得到的数据
+        category_ratio: float - 转为分类类型的不同值比例上限
+    返回值: pd.DataFrame - 类型推断后的数据，数值列与已有类型的列保持不变
+    """
+    columns = {}
+    for name in df.columns:
+        series = df[name]
+        if series.dtype == object or isinstance(series.dtype, pd.StringDtype):
+            series = _infer_text_column(series, category_ratio)
+        columns[name] = series
+    return pd.DataFrame(columns, index=df.index)
+
+
+def _infer_text_column(series, category_ratio):
+    """推断单个文本列的类型"""
+    non_null = series.notna()
+    count = int(non_null.sum())
+    if count == 0:
+        return series
+
+    # 先用少量样本判断，避免对普通文本做整列解析
+    sample = series[non_null].head(100).astype(str)
+
+    # 全部非空值都能转换为数值时使用数值类型
+    if pd.to_numeric(sample, errors="coerce").notna().all():
+        numeric = pd.to_numeric(series, errors="coerce")
+        if int(numeric.notna().sum()) == count:
+            return numeric
+
+    # 全部非空值都能按统一格式解析为日期时使用日期时间类型
+    if _looks_like_datetime(sample):
+        with warnings.catch_warnings():
+            # 无法推断统一格式时pandas会提示并逐个解析，这里按统一格式解析失败即视为非日期列
+            warnings.simplefilter("ignore", UserWarning)
+            parsed = pd.to_datetime(series, errors="coerce")
+        if int(parsed.notna().sum()) == count:
+            return parsed
+
+    # 不同值较少时按字典编码存储
+    if series.nunique(dropna=True) <= max(count * category_ratio, 1) and count > 1:
+        return series.astype("category")
+    return series
+
+
+def _looks_like_datetime(sample):
+    """样本全部可以按日期解析且包含日期分隔符时视为日期列"""
+    if not sample.str.contains(r"\d[-/年.]\d", regex=True).all():
+        return False
+    try:
+        parsed = pd.to_datetime(sample, errors="coerce", format="mixed")
+    except (ValueError, TypeError):
+        return False
+    return bool(parsed.notna().all())
+
+
+def memory_report(df):
+    """
+    统计DataFrame各列内存占用
+
+    参数:
+        df: pd.DataFrame - 数据
+    返回值: pd.DataFrame - 列名、类型、内存(字节)，按内存从大到小排列
+    """
+    usage = df.memory_usage(index=False, deep=True)
+    report = pd.DataFrame({
+        "列名": [str(name) for name in df.columns],
+        "类型": [str(dtype) for dtype in df.dtypes],
+        "内存(字节)": usage.to_numpy(),
+    })
+    return report.sort_values("内存(字节)", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def _convert_uniques(series, convert, dtype):
+    """
+    只对不同值做类型转换，再按编码映射回每一行
+
+    参数:
+        series: pd.Series - 原始列
+        convert: callable - 参数为不同值组成的 pd.Series，返回转换结果
+        dtype: 结果类型，需要能表示空值
+    返回值: pd.Series - 与原始列等长，原来的空值仍为空值
+    """
+    codes, uniques = pd.factorize(series)
+    values = pd.concat([convert(pd.Series(uniques, dtype=object)).astype(dtype),
+                        pd.Series([None], dtype=dtype)], ignore_index=True)
+    # 编码-1(空值)取到末尾补上的空值
+    return pd.Series(values.take(codes).to_numpy(), index=series.index, dtype=dtype)
@@ -0,0 +1,104 @@
+"""
+数据写出模块
+从后端数据按块写出CSV/JSON/Excel文件，保留各列原生类型，内存占用与数据量无关
+"""
+
+import os  # 临时文件改名
+
+SAVE_CHUNK_ROWS = 50000  # 每次写出的行数
+EXCEL_MAX_ROWS = 1048575  # Excel工作表最大行数(不含表头)
+
+
+def write_frames(frames, path, file_format, progress=None, cancelled=None):
+    """
+    把数据块依次写入文件
+
+    参数:
+        frames: iterable - 依次产出 pd.DataFrame 数据块，各块列相同
+        path: str - 目标文件路径
+        file_format: str - "csv"/"json"/"xlsx"
+        progress: callable - 进度回调，参数为已写出行数
+        cancelled: callable - 返回True时中止写出
+    返回值: (int, bool) - 已写出行数、是否被取消；取消时不会覆盖目标文件
+    """
+    writers = {"csv": _write_csv, "json": _write_json, "xlsx": _write_xlsx}
+    if file_format not in writers:
+        raise ValueError("不支持的文件格式")
+
+    # 先写临时文件，完成后再替换目标文件
+    temp_path = path + ".part"
+    try:
+        rows, stopped = writers[file_format](frames, temp_path, progress, cancelled)
+        if stopped:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        else:
+            os.replace(temp_path, path)
+        return rows, stopped
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _each_chunk(frames, progress, cancelled):
+    """遍历数据块并汇报进度，被取消时停止"""
+    rows = 0
+    for chunk in frames:
+        if cancelled is not None and cancelled():
+            return
+        yield chunk
+        rows += len(chunk)
+        if progress is not None:
+            progress(rows)
+
+
+def _write_csv(frames, path, progress, cancelled):
+    """按块写出CSV，只在第一块写表头"""
+    rows = 0
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        for chunk in _each_chunk(frames, progress, cancelled):
+            chunk.to_csv(f, index=False, header=rows == 0)
+            rows += len(chunk)
+    return rows, cancelled is not None and cancelled()
+
+
+def _write_json(frames, path, progress, cancelled):
+    """按块写出JSON记录数组，每条记录占一行"""
+    rows = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for chunk in _each_chunk(frames, progress, cancelled):
+            if not len(chunk):
+                continue
+            records = chunk.to_json(orient="records", lines=True, force_ascii=False, date_format="iso")
+            if rows:
+                f.write(",\n")
+            f.write(",\n".join(records.strip().split("\n")))
+            rows += len(chunk)
+        f.write("\n]\n")
+    return rows, cancelled is not None and cancelled()
+
+
+def _write_xlsx(frames, path, progress, cancelled):
+    """以只写流模式逐行写出Excel"""
+    from openpyxl import Workbook  # Excel写出库，pandas写xlsx同样依赖它
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    rows = 0
+    for chunk in _each_chunk(frames, progress, cancelled):
+        if rows == 0:
+            sheet.append([str(name) for name in chunk.columns])
+        if rows + len(chunk) > EXCEL_MAX_ROWS:
+            raise ValueError(f"Excel最多只能保存 {EXCEL_MAX_ROWS} 行数据")
+        # 空值写为空单元格，其余转换为Python原生类型
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            sheet.append(list(row))
+        rows += len(chunk)
+    if cancelled is not None and cancelled():
+        return rows, True
+    workbook.save(path)
+    return rows, False
+
@@ -0,0 +1,253 @@
+"""
+筛选引擎模块
+把筛选条件编译为表达式树，按列的原生类型计算NumPy布尔掩码
+"""
+
+import operator as op  # 比较运算函数
+
+import numpy as np  # 数值计算库
+import pandas as pd  # 数据处理库
+
+OPERATORS = ("=", ">", "<", "<=", ">=", "!=", "包含", "不包含", "开头为", "结尾为", "为空", "不为空")
+LOGICS = ("AND", "OR")
+
+# 比较运算符对应的函数
+_COMPARE = {"=": op.eq, ">": op.gt, "<": op.lt, "<=": op.le, ">=": op.ge, "!=": op.ne}
+
+
+class Condition:
+    """
+    单个筛选条件，表达式树的叶子节点
+
+    属性:
+        col: int - 列号
+        operator: str - 运算符，见 OPERATORS
+        value: str - 比较值
+    """
+
+    def __init__(self, col, operator, value=""):
+        """初始化筛选条件"""
+        if operator not in OPERATORS:
+            raise ValueError(f"不支持的运算符: {operator}")
+        self.col = int(col)
+        self.operator = operator
+        self.value = "" if value is None else str(value)
+
+    def key(self):
+        """返回可哈希的键，用于缓存计算结果"""
+        return ("条件", self.col, self.operator, self.value)
+
+    def conditions(self):
+        """返回树中全部叶子条件"""
+        return [self]
+
+    def narrows(self, other):
+        """
+        判断本条件满足的行是否一定也满足另一个条件
+
+        参数:
+            other: Condition/BoolOp - 之前的筛选条件
+        返回值: bool - 为True时只需在之前保留的行中重新计算
+        """
+        if isinstance(other, BoolOp):
+            # 比AND的每个子条件都严格，或比OR的任一子条件严格
+            if other.logic == "AND":
+                return all(self.narrows(child) for child in other.children)
+            return any(self.narrows(child) for child in other.children)
+        if self.key() == other.key():
+            return True
+        if self.col != other.col or self.operator != other.operator:
+            return False
+        if self.operator == "包含":
+            return other.value in self.value
+        if self.operator == "不包含":
+            return self.value in other.value
+        if self.operator == "开头为":
+            return self.value.startswith(other.value)
+        if self.operator == "结尾为":
+            return self.value.endswith(other.value)
+        return False
+
+    def evaluate(self, store, rows=None):
+        """
+        计算掩码
+
+        参数:
+            store: DataStore - 数据存储
+            rows: np.ndarray - 只计算这些后端行，None表示全部行
+        返回值: np.ndarray - 按后端行顺序(或rows的顺序)，满足条件的行为True
+        """
+        return store.column_mask(self.col, self.operator, self.value, rows)
+
+
+class BoolOp:
+    """
+    AND/OR组合节点
+
+    属性:
+        logic: str - "AND" 或 "OR"
+        children: list - 子节点，可以是 Condition 或 BoolOp
+    """
+
+    def __init__(self, logic, children):
+        """初始化组合节点"""
+        if logic not in LOGICS:
+            raise ValueError(f"不支持的逻辑组合: {logic}")
+        self.logic = logic
+        self.children = list(children)
+
+    def key(self):
+        """返回可哈希的键，用于缓存计算结果"""
+        return (self.logic,) + tuple(child.key() for child in self.children)
+
+    def conditions(self):
+        """返回树中全部叶子条件"""
+        return [leaf for child in self.children for leaf in child.conditions()]
+
+    def narrows(self, other):
+        """判断本表达式满足的行是否一定也满足另一个表达式，见 Condition.narrows"""
+        if self.key() == other.key():
+            return True
+        if isinstance(other, BoolOp) and other.logic == "AND":
+            return all(self.narrows(child) for child in other.children)
+        if self.logic == "AND":
+            # AND比它的任一子条件更严格
+            return any(child.narrows(other) for child in self.children)
+        # OR的每个子条件都更严格时整体更严格
+        return all(child.narrows(other) for child in self.children)
+
+    def evaluate(self, store, rows=None):
+        """
+        依次计算子节点并原地合并掩码
+
+        AND结果全为False、OR结果全为True时不再计算剩余子节点
+        """
+        mask = None
+        for child in self.children:
+            child_mask = child.evaluate(store, rows)
+            if mask is None:
+                mask = np.array(child_mask, dtype=bool)
+            elif self.logic == "AND":
+                mask &= child_mask
+            else:
+                mask |= child_mask
+            if (self.logic == "AND" and not mask.any()) or (self.logic == "OR" and mask.all()):
+                break
+        if mask is None:
+            return np.ones(store.total_row_count() if rows is None else len(rows), dtype=bool)
+        return mask
+
+
+def compile_filter(conditions, logic="AND"):
+    """
+    把条件列表编译为表达式树
+
+    参数:
+        conditions: list - [(列号, 运算符, 值), ...]
+        logic: str - 条件之间的组合方式，"AND" 或 "OR"
+    返回值: Condition/BoolOp - 表达式树，没有条件时返回None
+    """
+    nodes = [Condition(*condition) for condition in conditions]
+    if not nodes:
+        return None
+    if len(nodes) == 1:
+        return nodes[0]
+    return BoolOp(logic, nodes)
+
+
+def column_mask(series, operator, value):
+    """
+    按列类型计算单个条件的掩码
+
+    数值、日期列与转换为列类型的比较值直接比较；比较值无法转换时按文本比较；
+    分类列只在类别上计算一次，再按编码映射到每一行；空值按空字符串参与文本比较
+
+    参数:
+        series: pd.Series - 数据列
+        operator: str - 运算符
+        value: str - 比较值
+    返回值: np.ndarray - 满足条件的行为True
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # 末尾补一个空值，编码-1正好取到它的结果
+        categories = pd.Series(series.cat.categories)
+        categories = pd.concat([categories, pd.Series([None], dtype=categories.dtype)], ignore_index=True)
+        category_mask = column_mask(categories, operator, value)
+        return category_mask[series.cat.codes.to_numpy()]
+
+    if operator == "为空":
+        return empty_mask(series)
+    if operator == "不为空":
+        return ~empty_mask(series)
+
+    if operator in _COMPARE:
+        target = coerce_value(series.dtype, value)
+        if not isinstance(target, str) and not pd.isna(target):
+            numpy_dtype = isinstance(series.dtype, np.dtype)
+            if numpy_dtype and series.dtype.kind in "iufb":
+                return _COMPARE[operator](series.to_numpy(), target)
+            if numpy_dtype and series.dtype.kind == "M":
+                values = series.to_numpy()
+                result = _COMPARE[operator](values, np.datetime64(target).astype(values.dtype))
+                # 空值只满足不等于
+                result[np.isnat(values)] = operator == "!="
+                return result
+            return np.asarray(_COMPARE[operator](series, target).fillna(operator == "!="), dtype=bool)
+        return np.asarray(_COMPARE[operator](_text(series), value), dtype=bool)
+
+    text = _text(series)
+    if operator == "包含":
+        mask = text.str.contains(value, regex=False)
+    elif operator == "不包含":
+        mask = ~text.str.contains(value, regex=False)
+    elif operator == "开头为":
+        mask = text.str.startswith(value)
+    elif operator == "结尾为":
+        mask = text.str.endswith(value)
+    else:
+        raise ValueError(f"不支持的运算符: {operator}")
+    return np.asarray(mask, dtype=bool)
+
+
+def coerce_value(dtype, text):
+    """
+    把输入文本转换为与列类型一致的值
+
+    参数:
+        dtype: 目标列的类型
+        text: str - 输入文本
+    返回值: 转换后的值，无法转换时返回原文本
+    """
+    if text is None or str(text).strip() == "":
+        return np.nan
+    text = str(text)
+    try:
+        if pd.api.types.is_bool_dtype(dtype):
+            return text.strip().lower() in ["true", "1", "yes"]
+        if pd.api.types.is_integer_dtype(dtype):
+            try:
+                return int(text)
+            except ValueError:
+                return float(text)
+        if pd.api.types.is_float_dtype(dtype):
+            return float(text)
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            return pd.Timestamp(text)
+    except ValueError:
+        pass
+    return text
+
+
+def empty_mask(series):
+    """空值或空白字符串处为True"""
+    mask = np.array(series.isna(), dtype=bool)
+    if series.dtype == object or isinstance(series.dtype, pd.StringDtype):
+        mask |= series.astype(str).str.strip().eq("").to_numpy()
+    return mask
+
+
+def _text(series):
+    """把一列转换为文本，空值为空字符串"""
+    if isinstance(series.dtype, pd.StringDtype):
+        return series.fillna("")
+    return series.astype(str).where(series.notna(), "")
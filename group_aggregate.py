@@ -0,0 +1,371 @@
+"""
+分组汇总模块
+按一列或多列分组(可再按一列透视)，对汇总列计算求和、平均值、计数、最小值、最大值和不同值个数；
+分组键先用哈希表编码(pd.factorize)为连续的组号，再用 bincount 与 ufunc.at 按组号一次归约，不逐组循环；
+数据按块汇总为可合并的中间结果，多块在线程池中并行计算，内存占用只与分组数有关，分页浏览的大文件也可汇总
+"""
+
+import os  # CPU核数
+from collections import deque  # 等待合并的块
+from concurrent.futures import ThreadPoolExecutor  # 多线程按块汇总
+
+import numpy as np  # 数值计算库
+import pandas as pd  # 数据处理库
+
+from column_stats import numeric_values
+
+AGGREGATIONS = ("求和", "平均值", "计数", "最小值", "最大值", "不同值个数")  # 支持的汇总方式
+GROUP_CHUNK_ROWS = 200_000  # 按块汇总时每块的行数
+ROW_COUNT_NAME = "行数"  # 没有汇总列时每组的行数列名
+
+# 各汇总方式需要的中间结果，以及中间结果合并时的归约方式
+# count为非空单元格个数，numbers为参与求和的数值个数(文本列中不能转换为数值的单元格不计)
+_PARTS = {"求和": ("sum",), "平均值": ("sum", "numbers"), "计数": ("count",),
+          "最小值": ("min",), "最大值": ("max",), "不同值个数": ()}
+_MERGE = {"sum": "sum", "numbers": "sum", "count": "sum", "min": "min", "max": "max"}
+# 日期时间按int64保存，NaT为int64最小值
+_INT_MIN = np.iinfo(np.int64).min
+_INT_MAX = np.iinfo(np.int64).max
+
+
+class GroupAggregator:
+    """
+    可合并的分组汇总
+
+    每组保存行数以及各汇总列的非空个数、数值个数、和、最小值、最大值，不同值个数保存去重后的
+    (分组键哈希值, 分组键与值的哈希值)；
+    两份结果合并时把分组键拼接后重新编码，再按新组号归约，与分块方式无关
+
+    属性:
+        keys: list - 分组列名，透视时最后一列为透视列
+        values: list - 汇总列名
+        aggregations: list - 汇总方式，取自 AGGREGATIONS
+        groups: pd.DataFrame - 每组一行的分组键，还没有数据时为None
+        rows: np.ndarray - 每组的行数
+    """
+
+    def __init__(self, keys, values, aggregations):
+        """初始化空的汇总"""
+        self.keys = list(keys)
+        self.values = list(values)
+        self.aggregations = list(aggregations)
+        if not self.keys:
+            raise ValueError("至少需要一个分组列")
+        if set(self.keys) & set(self.values):
+            raise ValueError("分组列不能同时作为汇总列")
+        unknown = [name for name in self.aggregations if name not in AGGREGATIONS]
+        if unknown:
+            raise ValueError(f"不支持的汇总方式: {'、'.join(unknown)}")
+        self._parts = sorted({part for name in self.aggregations for part in _PARTS[name]})
+        self._distinct = "不同值个数" in self.aggregations
+        self.groups = None
+        self.rows = None
+        self._state = {}  # (列名, 中间结果) -> 每组的数组
+        self._pairs = {}  # 列名 -> 去重后的 (分组键哈希值数组, 分组键与值的哈希值数组)
+        self._datetime = {}  # 日期时间汇总列 -> numpy日期类型，用于还原最小值、最大值
+
+    def partial(self, frame):
+        """
+        汇总一块数据，不修改自身
+
+        参数:
+            frame: pd.DataFrame - 数据块，包含全部分组列与汇总列
+        返回值: GroupAggregator - 该块的汇总结果，可用 merge 合并
+        """
+        chunk = GroupAggregator(self.keys, self.values, self.aggregations)
+        if len(frame) == 0:
+            return chunk
+        codes, size, first = group_codes(frame[self.keys])
+        chunk.groups = frame[self.keys].take(first).reset_index(drop=True)
+        chunk.rows = np.bincount(codes, minlength=size)
+        if self._distinct:
+            key_hashes = _row_hashes(frame[self.keys])
+        for col in self.values:
+            series = frame[col]
+            if "count" in self._parts:
+                chunk._state[(col, "count")] = np.bincount(codes[series.notna().to_numpy()], minlength=size)
+            if {"sum", "min", "max"} & set(self._parts):
+                values, dtype = typed_values(series)
+                if dtype is not None:
+                    if "sum" in self._parts:
+                        raise ValueError(f"{col}列是日期时间类型，不能求和或求平均值")
+                    chunk._datetime[col] = dtype
+                for part in ("sum", "min", "max"):
+                    if part in self._parts:
+                        chunk._state[(col, part)] = reduce_groups(codes, size, values, part)
+                if "numbers" in self._parts:
+                    valid = ~np.isnan(values) if values.dtype.kind == "f" else slice(None)
+                    chunk._state[(col, "numbers")] = np.bincount(codes[valid], minlength=size)
+            if self._distinct:
+                valid = series.notna().to_numpy()
+                pair_hashes = _combine_hashes(key_hashes, _row_hashes(series))
+                chunk._pairs[col] = _unique_pairs(key_hashes[valid], pair_hashes[valid])
+        return chunk
+
+    def update(self, frame):
+        """汇总一块数据并合并到已有结果"""
+        self.merge(self.partial(frame))
+
+    def merge(self, other):
+        """
+        合并另一份同样设置的汇总
+
+        参数:
+            other: GroupAggregator - 另一部分数据的汇总
+        返回值: 无
+        """
+        if other.groups is None:
+            return
+        self._datetime.update(other._datetime)
+        if self.groups is None:
+            self.groups, self.rows = other.groups, other.rows
+            self._state, self._pairs = dict(other._state), dict(other._pairs)
+            return
+        groups = pd.concat([self.groups, other.groups], ignore_index=True)
+        codes, size, first = group_codes(groups)
+        self.groups = groups.take(first).reset_index(drop=True)
+        self.rows = reduce_groups(codes, size, np.concatenate([self.rows, other.rows]), "sum")
+        for (col, part), array in self._state.items():
+            merged = np.concatenate([array, other._state[(col, part)]])
+            self._state[(col, part)] = reduce_groups(codes, size, merged, _MERGE[part])
+        for col, (key_hashes, pair_hashes) in self._pairs.items():
+            other_keys, other_pairs = other._pairs[col]
+            self._pairs[col] = _unique_pairs(np.concatenate([key_hashes, other_keys]),
+                                             np.concatenate([pair_hashes, other_pairs]))
+
+    def result(self, pivot=False):
+        """
+        返回汇总结果
+
+        参数:
+            pivot: bool - 是否把最后一个分组列展开为列(透视表)
+        返回值: pd.DataFrame - 每组一行，先是分组列，再是 列名(汇总方式) 各列；没有汇总列时为行数列；
+                透视时每个透视值一组列，没有的组合为空(计数类为0)
+        """
+        if self.groups is None:
+            names = [ROW_COUNT_NAME] if not self.values else [
+                f"{col}({name})" for col in self.values for name in self.aggregations]
+            return pd.DataFrame(columns=self.keys + names)
+        frame = self.groups.copy()
+        counts = [ROW_COUNT_NAME]
+        if not self.values:
+            frame[ROW_COUNT_NAME] = self.rows
+        for col in self.values:
+            for name in self.aggregations:
+                label = f"{col}({name})"
+                frame[label] = self._aggregate(col, name)
+                if name in ("计数", "不同值个数"):
+                    counts.append(label)
+        try:
+            frame = frame.sort_values(self.keys, na_position="last", kind="stable", ignore_index=True)
+        except TypeError:
+            pass  # 分组键类型混杂时保持出现顺序
+        if pivot:
+            frame = _pivot(frame, self.keys, counts)
+        return frame
+
+    def _aggregate(self, col, name):
+        """计算一个汇总列"""
+        state = self._state
+        if name == "求和":
+            return state[(col, "sum")]
+        if name == "计数":
+            return state[(col, "count")]
+        if name == "平均值":
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return np.where(state[(col, "numbers")] > 0, state[(col, "sum")] / state[(col, "numbers")], np.nan)
+        if name in ("最小值", "最大值"):
+            values = state[(col, "min" if name == "最小值" else "max")]
+            dtype = self._datetime.get(col)
+            return values.view(dtype) if dtype is not None else values
+        # 不同值个数: 按分组键哈希值找到每个不同值所属的组
+        key_hashes, _ = self._pairs[col]
+        positions = pd.Index(_row_hashes(self.groups)).get_indexer(key_hashes)
+        return np.bincount(positions[positions >= 0], minlength=len(self.groups))
+
+
+def group_codes(keys):
+    """
+    按分组键给每行编号
+
+    每个分组列用哈希表编码，多列时把各列编码组合为一个整数再编码一次；空值作为单独的一组
+
+    参数:
+        keys: pd.DataFrame - 分组列
+    返回值: (np.ndarray, int, np.ndarray) - 每行的组号(按首次出现的顺序)、组数、每组第一行的位置
+    """
+    codes = None
+    for col in range(keys.shape[1]):
+        column_codes, uniques = pd.factorize(keys.iloc[:, col], use_na_sentinel=False)
+        if codes is None:
+            codes = column_codes
+        else:
+            # 两个编码都小于行数，组合后不会溢出；再编码一次保持组号连续
+            codes, _ = pd.factorize(codes * len(uniques) + column_codes)
+    codes = np.asarray(codes, dtype=np.int64)
+    size = int(codes.max()) + 1 if len(codes) else 0
+    return codes, size, _first_positions(codes, size)
+
+
+def _first_positions(codes, size):
+    """返回每个编号第一次出现的位置"""
+    first = np.empty(size, dtype=np.int64)
+    # 倒序赋值，相同编号留下的是最早出现的位置
+    first[codes[::-1]] = np.arange(len(codes) - 1, -1, -1)
+    return first
+
+
+def _row_hashes(data):
+    """
+    每行的64位哈希值，与 HyperLogLog 使用的哈希相同
+
+    数值列(布尔列除外)统一按浮点数计算，分块读取时同一列可能时而为整数时而为浮点数，
+    分组键与汇总值的哈希值仍然一致
+
+    参数:
+        data: pd.Series/pd.DataFrame - 一列或多列数据
+    返回值: np.ndarray - uint64数组
+    """
+    if isinstance(data, pd.DataFrame):
+        data = pd.DataFrame({i: _float_numbers(data.iloc[:, i]) for i in range(data.shape[1])}, index=data.index)
+    else:
+        data = _float_numbers(data)
+    return pd.util.hash_pandas_object(data, index=False).to_numpy()
+
+
+def _float_numbers(series):
+    """数值列(布尔列除外)转换为浮点数，其他列不变"""
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        return series.astype(float)
+    return series
+
+
+def _combine_hashes(left, right):
+    """组合两组哈希值，顺序不同结果不同"""
+    return left * np.uint64(0x9E3779B97F4A7C15) ^ right
+
+
+def _unique_pairs(key_hashes, pair_hashes):
+    """按 (分组键, 值) 的哈希值去重，返回 (分组键哈希值, 分组键与值的哈希值)"""
+    codes, uniques = pd.factorize(pair_hashes)
+    first = _first_positions(np.asarray(codes, dtype=np.int64), len(uniques))
+    return key_hashes[first], pair_hashes[first]
+
+
+def typed_values(series):
+    """
+    按列类型取出用于求和与比较大小的数组
+
+    整数与布尔列保持int64以精确求和；日期时间列转换为int64(NaT为int64最小值)；
+    其他列转换为浮点数，文本中的数值也参与汇总
+
+    参数:
+        series: pd.Series - 汇总列
+    返回值: (np.ndarray, np.dtype) - 数组、日期时间列的原始numpy类型(其他列为None)
+    """
+    dtype = series.dtype
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        if getattr(dtype, "tz", None) is not None:
+            series = series.dt.tz_convert(None)
+        values = series.to_numpy()
+        return values.view(np.int64), values.dtype
+    if (pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype)) and not series.hasnans:
+        return series.to_numpy(dtype=np.int64), None
+    return numeric_values(series), None
+
+
+def reduce_groups(codes, size, values, how):
+    """
+    按组号归约
+
+    参数:
+        codes: np.ndarray - 每个值的组号
+        size: int - 组数
+        values: np.ndarray - 浮点数组(NaN为空)或int64数组(int64最小值为空，只出现在日期时间列)
+        how: str - sum/min/max
+    返回值: np.ndarray - 每组的结果；浮点数组中没有值的组，和为0、最小值与最大值为NaN
+    """
+    if values.dtype.kind == "f":
+        if how == "sum":
+            return np.bincount(codes, weights=np.where(np.isnan(values), 0.0, values), minlength=size)
+        out = np.full(size, np.nan)
+        (np.fmin if how == "min" else np.fmax).at(out, codes, values)
+        return out
+    values = values.astype(np.int64, copy=False)
+    if how == "sum":
+        out = np.zeros(size, dtype=np.int64)
+        np.add.at(out, codes, values)
+        return out
+    if how == "max":
+        out = np.full(size, _INT_MIN)
+        np.maximum.at(out, codes, values)
+        return out
+    out = np.full(size, _INT_MAX)
+    np.minimum.at(out, codes, np.where(values == _INT_MIN, _INT_MAX, values))
+    out[out == _INT_MAX] = _INT_MIN
+    return out
+
+
+def _pivot(frame, keys, counts):
+    """把最后一个分组列展开为列；只有一个汇总列时新列名为透视值，否则为 汇总列_透视值"""
+    index, pivot = keys[:-1], keys[-1]
+    names = [name for name in frame.columns if name not in keys]
+    if not index:
+        # 没有其他分组列时只有一行
+        frame = frame.assign(**{"汇总": ""})
+        index = ["汇总"]
+    table = frame.set_index(index + [pivot])[names].unstack(pivot)
+    values = table.columns.get_level_values(1)
+    labels = [("空" if pd.isna(value) else str(value)) if len(names) == 1 else
+              f"{name}_{'空' if pd.isna(value) else value}"
+              for name, value in zip(table.columns.get_level_values(0), values)]
+    for column in table.columns:
+        if column[0] in counts:
+            table[column] = table[column].fillna(0).astype(np.int64)
+    table.columns = labels
+    return table.reset_index()
+
+
+def aggregate_frames(frames, keys, values, aggregations, pivot=False, progress=None, cancelled=None,
+                     workers=None):
+    """
+    按块分组汇总
+
+    各块在线程池中分别汇总(numpy与pandas的编码、归约大多释放GIL)，按顺序合并；
+    同时计算的块数不超过线程数，内存占用与块大小和分组数有关
+
+    参数:
+        frames: iterable - 依次产出 pd.DataFrame 数据块
+        keys: list - 分组列名，透视时最后一列为透视列
+        values: list - 汇总列名
+        aggregations: list - 汇总方式
+        pivot: bool - 是否按最后一个分组列透视
+        progress: callable - 每合并一块后以已汇总行数调用，可为None
+        cancelled: callable - 返回True时停止汇总，可为None
+        workers: int - 线程数，None表示CPU核数
+    返回值: pd.DataFrame - 汇总结果，见 GroupAggregator.result；被取消时返回None
+    """
+    total = GroupAggregator(keys, values, aggregations)
+    workers = workers or os.cpu_count() or 1
+    rows = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for frame in frames:
+            if cancelled is not None and cancelled():
+                for future, _ in pending:
+                    future.cancel()
+                return None
+            pending.append((pool.submit(total.partial, frame), len(frame)))
+            while len(pending) >= workers or (pending and pending[0][0].done()):
+                future, count = pending.popleft()
+                total.merge(future.result())
+                rows += count
+                if progress is not None:
+                    progress(rows)
+        while pending:
+            future, count = pending.popleft()
+            total.merge(future.result())
+            rows += count
+            if progress is not None:
+                progress(rows)
+    return total.result(pivot)
@@ -0,0 +1,182 @@
+"""
+N元组倒排索引模块
+为文本列建立子串索引：汉字按单字和二元组、其他字符按三元组切分，
+查找“包含”时先用索引缩小候选范围，再对候选值做精确匹配
+"""
+
+import numpy as np  # 数值计算库
+import pandas as pd  # 数据处理库
+
+NGRAM_MAX_BYTES = 128 * 1024 * 1024  # 单列倒排表大小上限，超过时不建立索引
+COMMON_GRAM_RATIO = 0.5  # 出现在超过该比例的不同值中的元组几乎不能缩小范围，不保存
+
+
+class NgramIndex:
+    """
+    文本列的N元组倒排索引
+
+    索引建立在列的不同值上，每个不同值只切分一次，再通过编码映射到行；
+    元组编码为整数，汉字单字和二元组、三元组的编码范围互不重叠，倒排表按编码排序存放
+
+    属性:
+        codes: np.ndarray - 每行值的编码，空值为-1
+        uniques: np.ndarray - 不同值的文本
+    """
+
+    def __init__(self, codes, uniques, gram_keys, offsets, ids, common_keys):
+        """
+        参数:
+            gram_keys: np.ndarray - 有序的元组编码
+            offsets: np.ndarray - 每个元组的倒排表在ids中的起止位置，长度为元组数+1
+            ids: np.ndarray - 依次存放的倒排表，元素为不同值的编号
+            common_keys: np.ndarray - 因过于常见而未保存倒排表的元组编码，有序
+        """
+        self.codes = codes
+        self.uniques = uniques
+        self._gram_keys = gram_keys
+        self._offsets = offsets
+        self._ids = ids
+        self._common_keys = common_keys
+
+    @classmethod
+    def build(cls, series, max_bytes=NGRAM_MAX_BYTES):
+        """
+        为一列建立索引
+
+        参数:
+            series: pd.Series - 文本列
+            max_bytes: int - 倒排表大小上限
+        返回值: NgramIndex - 索引，超过大小上限时返回None
+        """
+        codes, uniques = pd.factorize(series)
+        uniques = np.array([str(value) for value in uniques], dtype=object)
+        # 每个字符最多产生两个元组，每个元组连同编号占12字节；预计超过上限时不再切分
+        if sum(len(text) for text in uniques) * 2 * 12 > max_bytes:
+            return None
+        keys, ids = _gram_keys(uniques)
+
+        # 按 (元组, 编号) 排序并去掉同一个值中重复的元组
+        order = np.lexsort((ids, keys))
+        keys, ids = keys[order], ids[order]
+        keep = np.ones(len(keys), dtype=bool)
+        keep[1:] = (keys[1:] != keys[:-1]) | (ids[1:] != ids[:-1])
+        keys, ids = keys[keep], ids[keep].astype(np.int32)
+
+        # 按元组分组，去掉过于常见的元组
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.empty(0, dtype=np.int64)
+        counts = np.diff(np.r_[starts, len(keys)])
+        gram_keys = keys[starts]
+        common = counts > max(len(uniques) * COMMON_GRAM_RATIO, 1)
+        ids = ids[~np.repeat(common, counts)]
+        offsets = np.zeros(int((~common).sum()) + 1, dtype=np.int64)
+        np.cumsum(counts[~common], out=offsets[1:])
+        index = cls(codes, uniques, gram_keys[~common], offsets, ids, gram_keys[common])
+        if index.nbytes() > max_bytes:
+            return None
+        return index
+
+    def nbytes(self):
+        """倒排表占用的字节数"""
+        return self._gram_keys.nbytes + self._offsets.nbytes + self._ids.nbytes + self._common_keys.nbytes
+
+    def contains_mask(self, value):
+        """
+        计算包含指定文本的行
+
+        参数:
+            value: str - 要查找的文本
+        返回值: np.ndarray - 包含该文本的行为True，空值为False；文本太短无法用索引缩小范围时返回None
+        """
+        keys = np.unique(_gram_keys([value])[0])
+        keys = keys[~np.isin(keys, self._common_keys)]
+        if len(keys) == 0:
+            return None
+        positions = np.searchsorted(self._gram_keys, keys)
+        found = positions < len(self._gram_keys)
+        found[found] = self._gram_keys[positions[found]] == keys[found]
+        if not found.all():
+            # 有元组从未出现，没有值包含该文本
+            return np.zeros(len(self.codes), dtype=bool)
+
+        # 从最短的倒排表开始求交集
+        postings = [self._ids[self._offsets[p]:self._offsets[p + 1]] for p in positions]
+        candidates = None
+        for ids in sorted(postings, key=len):
+            candidates = ids if candidates is None else np.intersect1d(candidates, ids, assume_unique=True)
+            if len(candidates) == 0:
+                break
+
+        # 候选值中精确匹配
+        hit = np.zeros(len(self.uniques) + 1, dtype=bool)
+        if len(candidates):
+            texts = pd.Series(self.uniques[candidates], dtype=object)
+            hit[candidates[texts.str.contains(value, regex=False).to_numpy(dtype=bool)]] = True
+        # 编码-1(空值)取到末尾的False
+        return hit[self.codes]
+
+    def to_arrays(self):
+        """转换为可以用 np.savez 保存的数组"""
+        return {
+            "gram_keys": self._gram_keys,
+            "offsets": self._offsets,
+            "ids": self._ids,
+            "common_keys": self._common_keys,
+            "unique_count": np.array([len(self.uniques)]),
+        }
+
+    @classmethod
+    def from_arrays(cls, series, arrays):
+        """
+        由保存的数组恢复索引
+
+        参数:
+            series: pd.Series - 建立索引时的文本列
+            arrays: dict - to_arrays 的结果
+        返回值: NgramIndex - 索引，与数据不一致时返回None
+        """
+        codes, uniques = pd.factorize(series)
+        if len(uniques) != int(arrays["unique_count"][0]):
+            return None
+        uniques = np.array([str(value) for value in uniques], dtype=object)
+        return cls(codes, uniques, arrays["gram_keys"], arrays["offsets"], arrays["ids"], arrays["common_keys"])
+
+
+def _gram_keys(texts):
+    """
+    切分文本并把元组编码为整数
+
+    从每个位置开始取元组：汉字取单字和二元组，其他字符取三元组；元组只由起始字符决定，
+    所以一段文本的元组一定出现在包含它的文本中
+
+    参数:
+        texts: list - 文本
+    返回值: (np.ndarray, np.ndarray) - 元组编码、元组所在文本的编号
+    """
+    lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+    chars = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    owner = np.repeat(np.arange(len(texts)), lengths)
+    count = len(chars)
+
+    cjk = (((chars >= 0x4E00) & (chars <= 0x9FFF)) | ((chars >= 0x3400) & (chars <= 0x4DBF))
+           | ((chars >= 0xF900) & (chars <= 0xFAFF)))
+    # 后一个、后两个字符是否属于同一文本
+    same1 = np.zeros(count, dtype=bool)
+    same1[:-1] = owner[1:] == owner[:-1]
+    same2 = np.zeros(count, dtype=bool)
+    same2[:-2] = same1[:-2] & same1[1:-1]
+    next1 = np.zeros(count, dtype=np.int64)
+    next1[:-1] = chars[1:]
+    next2 = np.zeros(count, dtype=np.int64)
+    next2[:-2] = chars[2:]
+
+    # 单字编码小于2^21，汉字二元组小于2^37，三元组不小于2^42
+    unigrams = np.flatnonzero(cjk)
+    bigrams = np.flatnonzero(cjk & same1)
+    trigrams = np.flatnonzero(~cjk & same2)
+    keys = np.concatenate([
+        chars[unigrams],
+        (chars[bigrams] << 21) | next1[bigrams],
+        (chars[trigrams] << 42) | (next1[trigrams] << 21) | next2[trigrams],
+    ])
+    owners = np.concatenate([owner[unigrams], owner[bigrams], owner[trigrams]])
+    return keys, owners
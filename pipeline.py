@@ -0,0 +1,273 @@
+"""
+数据处理流水线模块
+把排序、筛选、清洗等操作记录为可保存为JSON的步骤，再在其他文件上重放；
+重放前先优化执行计划：被后续步骤覆盖的排序/筛选不再计算，之后不再使用的列不读取
+"""
+
+import json  # 流水线以JSON格式保存
+
+import pandas as pd  # 数据处理库
+
+from data_loader import iter_chunks, sniff_schema, Projection
+from data_store import DataStore, compact_frame
+from filter_engine import compile_filter
+
+PIPELINE_VERSION = 1  # 保存格式版本
+
+# 只改变视图(显示哪些行、按什么顺序)而不修改数据的步骤
+_VIEW_OPS = ("sort", "filter")
+
+# 各步骤的显示名称
+STEP_NAMES = {
+    "sort": "排序",
+    "filter": "筛选",
+    "drop_empty_rows": "删除空行",
+    "fill_empty": "填充空值",
+    "drop_duplicates": "删除重复行",
+    "convert": "类型转换",
+    "remove_column": "删除列",
+}
+
+
+class Pipeline:
+    """
+    可重放的数据处理流水线
+
+    步骤是只含基本类型的字典，列按列名引用，以便在列顺序不同的文件上重放：
+        {"op": "sort", "keys": [[列名, 是否升序], ...], "collation": 文本排序方式}
+        {"op": "filter", "conditions": [[列名, 运算符, 值], ...], "logic": "AND"/"OR"}，条件为空表示清除筛选
+        {"op": "drop_empty_rows", "column": 列名}，列名为None表示所有列都为空的行
+        {"op": "fill_empty", "column": 列名, "value": 填充值}
+        {"op": "drop_duplicates", "column": 列名}，列名为None表示按整行判断
+        {"op": "convert", "column": 列名, "type": 整数/浮点数/字符串/布尔值}
+        {"op": "remove_column", "column": 列名}
+    与界面中的操作一致，排序与筛选只改变视图，清洗只作用于视图中的行
+
+    属性:
+        source: dict - 加载时的投影 {"columns", "skip_rows", "row_limit", "predicate"}，None表示读取全部
+        steps: list - 按执行顺序排列的步骤
+    """
+
+    def __init__(self, steps=None, source=None):
+        """初始化流水线"""
+        self.steps = list(steps) if steps else []
+        self.source = source
+
+    @classmethod
+    def from_projection(cls, projection):
+        """以加载时使用的投影作为数据来源创建空流水线"""
+        if projection is None or projection.is_full():
+            return cls()
+        return cls(source={
+            "columns": [str(name) for name in projection.columns] if projection.columns is not None else None,
+            "skip_rows": projection.skip_rows,
+            "row_limit": projection.row_limit,
+            "predicate": projection.predicate,
+        })
+
+    def append(self, step):
+        """在末尾记录一个步骤"""
+        if step.get("op") not in STEP_NAMES:
+            raise ValueError(f"不支持的步骤: {step.get('op')}")
+        self.steps.append(step)
+
+    def remove(self, step):
+        """移除最后一个与给定步骤为同一对象的步骤，用于撤销"""
+        for i in range(len(self.steps) - 1, -1, -1):
+            if self.steps[i] is step:
+                del self.steps[i]
+                return
+
+    def describe(self):
+        """返回每个步骤的一行说明"""
+        lines = []
+        for step in self.steps:
+            name = STEP_NAMES[step["op"]]
+            detail = {key: value for key, value in step.items() if key != "op"}
+            lines.append(f"{name} {json.dumps(detail, ensure_ascii=False)}")
+        return lines
+
+    def to_dict(self):
+        """转换为可保存为JSON的字典"""
+        return {"version": PIPELINE_VERSION, "source": self.source, "steps": self.steps}
+
+    @classmethod
+    def from_dict(cls, data):
+        """由 to_dict 的结果恢复流水线"""
+        if data.get("version") != PIPELINE_VERSION:
+            raise ValueError(f"不支持的流水线版本: {data.get('version')}")
+        pipeline = cls(source=data.get("source"))
+        for step in data.get("steps", []):
+            pipeline.append(step)
+        return pipeline
+
+    def save(self, path):
+        """保存为JSON文件"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        """从JSON文件读取"""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def optimize(self, source_columns):
+        """
+        生成优化后的执行计划
+
+        1. 连续的排序/筛选步骤中，后一次筛选替换前一次筛选、后一次排序替换前一次排序，
+           被替换的只记录不计算，连续多次筛选合并为一次；被替换的排序修改的文本排序方式保留到后一次排序
+        2. 被删除且删除前没有被任何步骤使用的列不读取，对应的删除列步骤一并去掉；
+           删除列会清除当前的排序与筛选条件，之前有排序或筛选步骤时保留该步骤
+
+        参数:
+            source_columns: list - 文件中的全部列名
+        返回值: (Projection, list) - 加载时的投影、要执行的步骤
+        """
+        steps = []
+        for step in self.steps:
+            if step["op"] in _VIEW_OPS:
+                for i in range(len(steps) - 1, -1, -1):
+                    if steps[i]["op"] not in _VIEW_OPS:
+                        break
+                    if steps[i]["op"] == step["op"]:
+                        # 排序方式为None表示沿用之前的方式，被替换的排序修改过排序方式时保留下来
+                        if step["op"] == "sort" and step.get("collation") is None \
+                                and steps[i].get("collation") is not None:
+                            step = dict(step, collation=steps[i]["collation"])
+                        del steps[i]
+                        break
+            steps.append(step)
+
+        source = self.source or {}
+        names = {str(name): name for name in source_columns}
+        if source.get("columns") is not None:
+            loaded = [str(name) for name in source["columns"] if str(name) in names]
+        else:
+            loaded = list(names)
+
+        # 找出删除前从未被使用的列
+        alive = list(loaded)
+        used = set()
+        unused = set()
+        viewed = False
+        for step in steps:
+            if step["op"] == "remove_column":
+                if step["column"] not in used and not viewed:
+                    unused.add(step["column"])
+                if step["column"] in alive:
+                    alive.remove(step["column"])
+            else:
+                referenced = step_columns(step)
+                used.update(alive if referenced is None else referenced)
+                viewed = viewed or step["op"] in _VIEW_OPS
+        steps = [step for step in steps if not (step["op"] == "remove_column" and step["column"] in unused)]
+
+        columns = [names[name] for name in loaded if name not in unused]
+        if len(columns) == len(names):
+            # 读取全部列，不投影时可以使用文件缓存
+            columns = None
+        projection = Projection(
+            columns=columns,
+            skip_rows=source.get("skip_rows", 0),
+            row_limit=source.get("row_limit"),
+            predicate=source.get("predicate"),
+            source_columns=list(source_columns),
+        )
+        return projection, steps
+
+    def apply(self, store, steps=None):
+        """
+        在数据存储上依次执行步骤
+
+        参数:
+            store: DataStore - 已加载数据的存储
+            steps: list - 要执行的步骤，None表示全部步骤(不优化)
+        返回值: 无
+        """
+        for step in self.steps if steps is None else steps:
+            apply_step(store, step)
+
+    def load_data(self, path):
+        """
+        按优化后的执行计划读取文件，不依赖界面
+
+        参数:
+            path: str - 数据文件路径
+        返回值: (DataStore, list) - 只含所需列的数据、要执行的步骤
+        """
+        projection, steps = self.optimize(list(sniff_schema(path, 1).columns))
+        chunks = [chunk for chunk, _ in iter_chunks(path, projection=projection)]
+        store = DataStore()
+        # 重放结果不需要撤销
+        store.history.max_bytes = 0
+        if chunks:
+            store.set_frame(compact_frame(pd.concat(chunks, ignore_index=True)))
+        return store, steps
+
+    def execute(self, path):
+        """
+        在文件上重放流水线，不依赖界面
+
+        参数:
+            path: str - 数据文件路径
+        返回值: DataStore - 执行结果，视图即为处理后的数据
+        """
+        store, steps = self.load_data(path)
+        self.apply(store, steps)
+        return store
+
+
+def apply_step(store, step):
+    """
+    在数据存储上执行一个步骤，界面中的操作也通过该函数执行，保证重放结果与操作时一致
+
+    参数:
+        store: DataStore - 数据存储
+        step: dict - 步骤
+    返回值: 删除行的步骤返回删除的行数，填充空值返回填充个数，类型转换返回 (转换个数, 失败个数)，其余为None
+    """
+    op = step["op"]
+    if op == "sort":
+        store.sort([(column_index(store, name), ascending) for name, ascending in step["keys"]],
+                   step.get("collation"))
+    elif op == "filter":
+        conditions = [(column_index(store, name), operator, value) for name, operator, value in step["conditions"]]
+        store.set_filter(compile_filter(conditions, step.get("logic", "AND")))
+    elif op == "drop_empty_rows":
+        if step.get("column") is None:
+            return store.keep_rows(~store.empty_row_mask())
+        return store.keep_rows(~store.empty_mask(column_index(store, step["column"])))
+    elif op == "fill_empty":
+        return store.fill_empty(column_index(store, step["column"]), step["value"])
+    elif op == "drop_duplicates":
+        col = None if step.get("column") is None else column_index(store, step["column"])
+        return store.keep_rows(~store.duplicate_mask(col))
+    elif op == "convert":
+        return store.convert_column(column_index(store, step["column"]), step["type"])
+    elif op == "remove_column":
+        store.remove_column(column_index(store, step["column"]))
+    else:
+        raise ValueError(f"不支持的步骤: {op}")
+    return None
+
+
+def step_columns(step):
+    """返回步骤用到的列名集合，用到全部列时返回None"""
+    op = step["op"]
+    if op == "sort":
+        return {name for name, _ in step["keys"]}
+    if op == "filter":
+        return {name for name, _, _ in step["conditions"]}
+    if step.get("column") is None:
+        return None
+    return {step["column"]}
+
+
+def column_index(store, name):
+    """按列名查找列号，找不到时报错"""
+    names = store.column_names()
+    if name not in names:
+        raise KeyError(f"文件中没有列: {name}")
+    return names.index(name)
@@ -5,20 +5,347 @@ Python数据分析平台
  
 # 导入模块
 import sys  # 系统相关功能
+import time  # 计时，用于统计加载速度与启动耗时
+_STARTED_AT = time.perf_counter()  # 程序开始运行的时刻，用于启动耗时报告
 from PyQt6.QtWidgets import (  # PyQt6 GUI组件
     QApplication, QMainWindow, QLabel, QStatusBar, 
-    QToolBar, QTableWidget, QTableWidgetItem, QMenu, QFileDialog,
-    QInputDialog, QMessageBox
+    QToolBar, QTableView, QMenu, QFileDialog,
+    QInputDialog, QMessageBox, QPushButton, QTabWidget, QTabBar
 )
-from PyQt6.QtGui import QAction  # 动作类
-from PyQt6.QtCore import Qt  # Qt核心功能
-import pandas as pd  # 数据处理库，用于CSV/Excel文件读取
-import json  # JSON处理模块，用于JSON文件读取
-import numpy as np  # 数值计算库
-import matplotlib.pyplot as plt  # 数据可视化库，用于创建静态图表
-import seaborn as sns  # 基于matplotlib的高级可视化库，提供更美观的统计图表
-from sklearn import linear_model, preprocessing  # 机器学习库
-import statsmodels.api as sm  # 统计分析库
+from PyQt6.QtGui import QAction, QKeySequence  # 动作类与标准快捷键
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QThread, QTimer, pyqtSignal  # Qt核心功能
+_QT_IMPORTED_AT = time.perf_counter()  # PyQt6导入完成的时刻
+# pandas、numpy 与依赖它们的数据处理模块在主窗口显示后才导入(见 finish_startup)，
+# matplotlib/seaborn 在首次可视化时由图表模块导入
+ 
+ 
+class DataFrameModel(QAbstractTableModel):
+    """
+    基于DataStore的表格模型
+     
+    只在视图请求时读取可见单元格，不为每个单元格创建QTableWidgetItem
+     
+    属性:
+        store: DataStore - 后端列式数据
+        locked: bool - 后台线程正在读取数据(保存、统计、汇总)时为True，期间不能编辑
+    """
+    locked = False
+     
+    def __init__(self, store, parent=None):
+        """初始化表格模型"""
+        super().__init__(parent)
+        self.store = store
+         
+    def rowCount(self, parent=QModelIndex()):
+        """返回行数，数据模块尚未就绪(store为None)时为0"""
+        return 0 if parent.isValid() or self.store is None else self.store.row_count()
+         
+    def columnCount(self, parent=QModelIndex()):
+        """返回列数，数据模块尚未就绪(store为None)时为0"""
+        return 0 if parent.isValid() or self.store is None else self.store.column_count()
+         
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        """返回单元格显示文本"""
+        if not index.isValid():
+            return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return self.store.display(index.row(), index.column())
+        return None
+         
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        """编辑单元格，按列类型写回后端数据"""
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole or self.store.read_only or self.locked:
+            return False
+        self.store.set_value(index.row(), index.column(), value)
+        self.dataChanged.emit(index, index, [role])
+        return True
+         
+    def flags(self, index):
+        """单元格可选中，非只读且未被后台线程读取的数据可编辑"""
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        if self.store.read_only or self.locked:
+            return super().flags(index)
+        return super().flags(index) | Qt.ItemFlag.ItemIsEditable
+         
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        """返回表头文本"""
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            names = self.store.column_names()
+            return names[section] if section < len(names) else None
+        return str(section + 1)
+         
+    def refresh(self):
+        """后端数据整体变化后通知视图刷新"""
+        self.beginResetModel()
+        self.endResetModel()
+         
+    def set_store(self, store):
+        """切换后端数据存储"""
+        self.beginResetModel()
+        self.store = store
+        self.endResetModel()
+ 
+ 
+class FileLoadWorker(QThread):
+    """
+    后台文件读取线程
+     
+    按块读取文件并通过信号交给界面线程，可随时取消；
+    有有效缓存时直接读取缓存，完整读取源文件后推断列类型并写入缓存；
+    只读取部分列或行时不写入缓存
+     
+    信号:
+        chunk_loaded(DataFrame): 读取到一块数据
+        frame_ready(DataFrame): 完整读取并推断类型后的全部数据
+        progress(int, object): 已读取行数、已读取字节数(未知时为None)
+        finished_loading(int, bool, bool): 读取结束，参数为总行数、是否被取消、是否来自缓存
+        failed(str): 读取出错
+    """
+    chunk_loaded = pyqtSignal(object)
+    frame_ready = pyqtSignal(object)
+    progress = pyqtSignal(int, object)
+    finished_loading = pyqtSignal(int, bool, bool)
+    failed = pyqtSignal(str)
+     
+    def __init__(self, path, cache=None, parent=None, projection=None):
+        """初始化读取线程"""
+        super().__init__(parent)
+        self.path = path
+        self.cache = cache
+        self.projection = projection if projection is not None and not projection.is_full() else None
+        self._cancelled = False
+         
+    def cancel(self):
+        """请求取消读取，在下一块读取前生效"""
+        self._cancelled = True
+         
+    def run(self):
+        """在后台线程中逐块读取文件"""
+        import pandas as pd  # 数据处理库
+        from data_store import compact_frame  # 压缩列类型
+        from data_loader import iter_chunks  # 分块读取
+        rows = 0
+        try:
+            # 优先读取缓存
+            if self.cache is not None:
+                cached = self.cache.load(self.path)
+                if cached is not None:
+                    if self.projection is not None:
+                        cached = self.projection.apply(self.projection.slice_rows(cached))
+                    self.chunk_loaded.emit(cached)
+                    self.progress.emit(len(cached), None)
+                    self.finished_loading.emit(len(cached), False, True)
+                    return
+                     
+            chunks = []
+            for chunk, bytes_read in iter_chunks(self.path, projection=self.projection):
+                if self._cancelled:
+                    break
+                rows += len(chunk)
+                chunks.append(chunk)
+                self.chunk_loaded.emit(chunk)
+                self.progress.emit(rows, bytes_read)
+                 
+            if chunks and not self._cancelled:
+                # 完整读取后统一推断列类型并压缩存储，替换界面中逐块读取的数据
+                frame = compact_frame(pd.concat(chunks, ignore_index=True))
+                chunks.clear()
+                self.frame_ready.emit(frame)
+                 
+                # 写入缓存，缓存失败不影响加载结果
+                if self.cache is not None and self.projection is None:
+                    try:
+                        self.cache.save(self.path, frame)
+                    except Exception:
+                        pass
+            self.finished_loading.emit(rows, self._cancelled, False)
+        except Exception as e:
+            self.failed.emit(str(e))
+ 
+ 
+class RowIndexWorker(QThread):
+    """
+    后台建立CSV行偏移索引的线程
+     
+    信号:
+        progress(int, object): 已扫描行数(扫描中为0)、已扫描字节数
+        index_ready(object): 索引建立完成，参数为CsvRowIndex，被取消时为None
+        failed(str): 建立索引出错
+    """
+    progress = pyqtSignal(int, object)
+    index_ready = pyqtSignal(object)
+    failed = pyqtSignal(str)
+     
+    def __init__(self, path, parent=None, cache=None):
+        """初始化索引线程，cache为保存索引的FileCache"""
+        super().__init__(parent)
+        self.path = path
+        self.cache = cache
+        self._cancelled = False
+         
+    def cancel(self):
+        """请求取消扫描"""
+        self._cancelled = True
+         
+    def run(self):
+        """在后台线程中扫描文件"""
+        from data_loader import CsvRowIndex  # 行偏移索引
+        try:
+            index = CsvRowIndex.build(
+                self.path,
+                progress=lambda bytes_read: self.progress.emit(0, bytes_read),
+                cancelled=lambda: self._cancelled,
+                cache=self.cache
+            )
+            self.index_ready.emit(index)
+        except Exception as e:
+            self.failed.emit(str(e))
+ 
+ 
+class SaveWorker(QThread):
+    """
+    后台保存线程
+     
+    从后端数据按块写出文件，可随时取消，取消时不覆盖目标文件
+     
+    信号:
+        progress(int): 已写出行数
+        finished_saving(int, bool): 保存结束，参数为写出行数和是否被取消
+        failed(str): 保存出错
+    """
+    progress = pyqtSignal(int)
+    finished_saving = pyqtSignal(int, bool)
+    failed = pyqtSignal(str)
+     
+    def __init__(self, store, path, file_format, parent=None):
+        """初始化保存线程"""
+        super().__init__(parent)
+        self.store = store
+        self.path = path
+        self.file_format = file_format
+        self._cancelled = False
+         
+    def cancel(self):
+        """请求取消保存"""
+        self._cancelled = True
+         
+    def run(self):
+        """在后台线程中按块写出数据"""
+        from data_writer import write_frames, SAVE_CHUNK_ROWS  # 流式写出
+        try:
+            rows, cancelled = write_frames(
+                self.store.iter_frames(SAVE_CHUNK_ROWS),
+                self.path,
+                self.file_format,
+                progress=self.progress.emit,
+                cancelled=lambda: self._cancelled
+            )
+            self.finished_saving.emit(rows, cancelled)
+        except Exception as e:
+            self.failed.emit(str(e))
+ 
+ 
+class StatsWorker(QThread):
+    """
+    后台统计线程
+     
+    内存中的数据一次计算全部统计量；分页浏览的数据按块累加，不计算分位数；
+    近似统计时按块累加并用草图估计分位数、不同值个数和高频值
+     
+    信号:
+        progress(int): 已统计的列数(内存精确统计)或行数(按块统计)
+        stats_ready(object, str): 统计完成，参数为结果表和统计方式说明，被取消时结果为None
+        failed(str): 统计出错
+    """
+    progress = pyqtSignal(int)
+    stats_ready = pyqtSignal(object, str)
+    failed = pyqtSignal(str)
+     
+    def __init__(self, store, approximate=False, parent=None):
+        """初始化统计线程"""
+        super().__init__(parent)
+        self.store = store
+        self.approximate = approximate
+        self._cancelled = False
+         
+    def cancel(self):
+        """请求取消统计"""
+        self._cancelled = True
+         
+    def run(self):
+        """在后台线程中计算统计量"""
+        from column_stats import numeric_summary, streaming_summary, STATS_CHUNK_ROWS  # 数值列基础统计与近似统计
+        try:
+            cancelled = lambda: self._cancelled
+            if self.approximate:
+                summary = streaming_summary(self.store.iter_frames(STATS_CHUNK_ROWS), progress=self.progress.emit,
+                                            cancelled=cancelled, approximate=True)
+                mode = "近似统计"
+            elif self.store.read_only:
+                summary = streaming_summary(self.store.iter_frames(STATS_CHUNK_ROWS),
+                                            progress=self.progress.emit, cancelled=cancelled)
+                mode = "按块统计，未计算分位数"
+            else:
+                summary = numeric_summary(self.store, cancelled=cancelled)
+                mode = "精确统计"
+            self.stats_ready.emit(summary, mode)
+        except Exception as e:
+            self.failed.emit(str(e))
+ 
+ 
+class GroupWorker(QThread):
+    """
+    后台分组汇总线程
+     
+    按块遍历视图中的数据，各块在线程池中汇总后合并；内存数据与分页浏览的大文件都可以汇总
+     
+    信号:
+        progress(int): 已汇总的行数
+        result_ready(object, str): 汇总完成，参数为结果表(被取消时为None)和结果标签页标题
+        failed(str): 汇总出错
+    """
+    progress = pyqtSignal(int)
+    result_ready = pyqtSignal(object, str)
+    failed = pyqtSignal(str)
+     
+    def __init__(self, store, keys, values, aggregations, pivot=False, title="", parent=None):
+        """初始化汇总线程"""
+        super().__init__(parent)
+        self.store = store
+        self.keys = keys
+        self.values = values
+        self.aggregations = aggregations
+        self.pivot = pivot
+        self.title = title
+        self._cancelled = False
+         
+    def cancel(self):
+        """请求取消汇总"""
+        self._cancelled = True
+         
+    def run(self):
+        """在后台线程中分组汇总"""
+        from group_aggregate import aggregate_frames, GROUP_CHUNK_ROWS  # 分组汇总
+        try:
+            # 按显示的列名取列，与对话框中的选择一致
+            names = self.store.column_names()
+            frames = (frame.set_axis(names, axis=1) for frame in self.store.iter_frames(GROUP_CHUNK_ROWS))
+            result = aggregate_frames(frames, self.keys, self.values, self.aggregations, self.pivot,
+                                      progress=self.progress.emit, cancelled=lambda: self._cancelled)
+            self.result_ready.emit(result, self.title)
+        except Exception as e:
+            self.failed.emit(str(e))
+ 
+ 
+# 筛选栏停止输入后等待的毫秒数
+FILTER_DELAY_MS = 250
+STARTUP_BUDGET_MS = 300  # 冷启动到主窗口显示的目标耗时(毫秒)
+# 主窗口显示后依次导入的模块，分别计时；先导入的模块的耗时不计入后面的模块
+BACKEND_MODULES = ("numpy", "pandas", "data_store", "data_loader", "data_cache",
+                   "data_writer", "pipeline", "column_stats")
  
  
 class DataAnalysisPlatform(QMainWindow):
@@ -26,7 +353,11 @@ class DataAnalysisPlatform(QMainWindow):
     数据分析平台主窗口类
      
     属性:
-        table_widget: QTableWidget - 中央数据表格显示区
+        store: DataStore - 后端列式数据
+        model: DataFrameModel - 表格模型
+        cache: FileCache - 已打开文件的列式缓存
+        tabs: QTabWidget - 中央标签页，第一页为数据表格，其余为分组汇总结果
+        table_widget: QTableView - 数据表格显示区
         status_bar: QStatusBar - 底部状态栏
         toolbar: QToolBar - 主工具栏
     """
@@ -43,22 +374,49 @@ class DataAnalysisPlatform(QMainWindow):
         self._init_ui()
          
     def _init_ui(self):
-        """初始化用户界面"""
-        # 创建中央表格部件
-        self.table_widget = QTableWidget()
-        self.setCentralWidget(self.table_widget)
+        """初始化用户界面，后端数据在 finish_startup 中创建"""
+        # 创建表格模型，数据模块导入后再设置后端数据
+        self.store = None
+        self.model = DataFrameModel(None, self)
+        self.startup_times = []  # 启动各阶段的 (名称, 毫秒)
+        self._pending_pipeline = None  # 文件加载完成后要重放的 (流水线, 执行步骤)
+        self.stats_dock = None  # 统计结果面板，首次分析时创建
+        self.chart_dock = None  # 图表面板，首次可视化时创建
+         
+        # 创建中央表格部件，只渲染可见单元格
+        self.table_widget = QTableView()
+        self.table_widget.setModel(self.model)
+         
+        # 数据表格为第一个标签页(不可关闭)，分组汇总结果在新标签页中显示
+        self.tabs = QTabWidget()
+        self.tabs.setTabsClosable(True)
+        self.tabs.addTab(self.table_widget, "数据")
+        for side in (QTabBar.ButtonPosition.LeftSide, QTabBar.ButtonPosition.RightSide):
+            self.tabs.tabBar().setTabButton(0, side, None)
+        self.tabs.tabCloseRequested.connect(self._close_tab)
+        self.setCentralWidget(self.tabs)
          
         # 创建状态栏
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("就绪")
          
+        # 状态栏中的取消加载按钮，仅在后台加载时显示
+        self._loader = None
+        self.cancel_load_button = QPushButton("取消加载")
+        self.cancel_load_button.clicked.connect(self._cancel_loading)
+        self.cancel_load_button.hide()
+        self.status_bar.addPermanentWidget(self.cancel_load_button)
+         
         # 创建菜单栏
         self._create_menus()
          
         # 创建工具栏
         self._create_toolbar()
          
+        # 创建即时筛选栏
+        self._create_filter_bar()
+         
         # 设置表格右键菜单
         self.table_widget.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.table_widget.customContextMenuRequested.connect(self._show_context_menu)
@@ -73,6 +431,16 @@ class DataAnalysisPlatform(QMainWindow):
         open_action.triggered.connect(self._open_file)
         file_menu.addAction(open_action)
          
+        # 预览后按需加载动作
+        open_preview_action = QAction("打开(预览并选择列)", self)
+        open_preview_action.triggered.connect(self._open_file_with_preview)
+        file_menu.addAction(open_preview_action)
+         
+        # 分页浏览大文件动作
+        open_paged_action = QAction("打开大文件(分页浏览)", self)
+        open_paged_action.triggered.connect(self._open_large_csv)
+        file_menu.addAction(open_paged_action)
+         
         # 保存动作
         save_action = QAction("保存", self)
         save_action.triggered.connect(self._save_file)
@@ -81,24 +449,191 @@ class DataAnalysisPlatform(QMainWindow):
         # 编辑菜单
         edit_menu = self.menuBar().addMenu("编辑")
          
+        # 撤销与重做动作
+        undo_action = QAction("撤销", self)
+        undo_action.setShortcut(QKeySequence.StandardKey.Undo)
+        undo_action.triggered.connect(self._undo)
+        edit_menu.addAction(undo_action)
+         
+        redo_action = QAction("重做", self)
+        redo_action.setShortcut(QKeySequence.StandardKey.Redo)
+        redo_action.triggered.connect(self._redo)
+        edit_menu.addAction(redo_action)
+         
+        # 撤销历史大小上限动作
+        undo_limit_action = QAction("撤销历史内存上限", self)
+        undo_limit_action.triggered.connect(self._set_undo_limit)
+        edit_menu.addAction(undo_limit_action)
+         
+        edit_menu.addSeparator()
+         
         # 排序动作
         sort_action = QAction("排序", self)
         sort_action.triggered.connect(self._sort_data)
         edit_menu.addAction(sort_action)
          
+        # 恢复原始顺序动作
+        clear_sort_action = QAction("取消排序", self)
+        clear_sort_action.triggered.connect(self._clear_sort)
+        edit_menu.addAction(clear_sort_action)
+         
         # 筛选动作
         filter_action = QAction("筛选", self)
         filter_action.triggered.connect(self._filter_data)
         edit_menu.addAction(filter_action)
          
+        # 清除筛选动作
+        clear_filter_action = QAction("清除筛选", self)
+        clear_filter_action.triggered.connect(self._clear_filter)
+        edit_menu.addAction(clear_filter_action)
+         
+        # 数据清洗动作
+        clean_action = QAction("数据清洗", self)
+        clean_action.triggered.connect(self._clean_data)
+        edit_menu.addAction(clean_action)
+         
+        # 按列清洗动作
+        column_clean_action = QAction("按列清洗", self)
+        column_clean_action.triggered.connect(self._data_cleaning)
+        edit_menu.addAction(column_clean_action)
+         
+        # 列索引开关
+        index_action = QAction("使用列索引加速筛选", self)
+        index_action.setCheckable(True)
+        index_action.setChecked(True)
+        index_action.toggled.connect(self._toggle_indexes)
+        edit_menu.addAction(index_action)
+        self.index_action = index_action
+         
+        # 近似统计开关
+        approx_action = QAction("分析时使用近似统计(适用于大数据)", self)
+        approx_action.setCheckable(True)
+        edit_menu.addAction(approx_action)
+        self.approx_action = approx_action
+         
+        # 列内存占用动作
+        memory_action = QAction("列内存占用", self)
+        memory_action.triggered.connect(self._show_memory_usage)
+        edit_menu.addAction(memory_action)
+         
+        # 流水线菜单
+        pipeline_menu = self.menuBar().addMenu("流水线")
+         
+        # 查看记录的步骤动作
+        show_pipeline_action = QAction("查看记录的步骤", self)
+        show_pipeline_action.triggered.connect(self._show_pipeline)
+        pipeline_menu.addAction(show_pipeline_action)
+         
+        # 保存流水线动作
+        save_pipeline_action = QAction("保存流水线", self)
+        save_pipeline_action.triggered.connect(self._save_pipeline)
+        pipeline_menu.addAction(save_pipeline_action)
+         
+        # 重放流水线动作
+        replay_pipeline_action = QAction("在文件上重放流水线", self)
+        replay_pipeline_action.triggered.connect(self._replay_pipeline)
+        pipeline_menu.addAction(replay_pipeline_action)
+         
+        # 清空记录动作
+        clear_pipeline_action = QAction("清空记录", self)
+        clear_pipeline_action.triggered.connect(self._clear_pipeline)
+        pipeline_menu.addAction(clear_pipeline_action)
+         
         # 帮助菜单
         help_menu = self.menuBar().addMenu("帮助")
          
+        # 启动耗时动作
+        startup_action = QAction("启动耗时", self)
+        startup_action.triggered.connect(self._show_startup_report)
+        help_menu.addAction(startup_action)
+         
         # 关于动作
         about_action = QAction("关于", self)
         about_action.triggered.connect(self._show_about)
         help_menu.addAction(about_action)
          
+    def _create_filter_bar(self):
+        """
+        创建即时筛选栏
+         
+        输入停止一段时间后自动筛选，新条件比当前条件更严格时只在当前保留的行中重新计算
+        """
+        from PyQt6.QtWidgets import QComboBox, QLineEdit
+         
+        self.addToolBarBreak()
+        self.filter_bar = QToolBar("筛选栏")
+        self.addToolBar(self.filter_bar)
+        self.filter_bar.addWidget(QLabel("快速筛选: "))
+         
+        # 列、运算符与值
+        self.filter_bar_column = QComboBox()
+        self.filter_bar_column.setMinimumWidth(120)
+        self.filter_bar.addWidget(self.filter_bar_column)
+        self.filter_bar_operator = QComboBox()  # 运算符在 finish_startup 中填入
+        self.filter_bar.addWidget(self.filter_bar_operator)
+        self.filter_bar_value = QLineEdit()
+        self.filter_bar_value.setPlaceholderText("输入筛选值")
+        self.filter_bar_value.setClearButtonEnabled(True)
+        self.filter_bar.addWidget(self.filter_bar_value)
+         
+        # 输入停止后再筛选，避免每个按键都计算一次
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(FILTER_DELAY_MS)
+        self._filter_timer.timeout.connect(self._apply_filter_bar)
+        self.filter_bar_value.textChanged.connect(self._filter_timer.start)
+        self.filter_bar_column.currentIndexChanged.connect(self._filter_timer.start)
+        self.filter_bar_operator.currentIndexChanged.connect(self._filter_timer.start)
+         
+        # 列变化时更新列下拉框
+        self.model.modelReset.connect(self._update_filter_bar_columns)
+        self.model.headerDataChanged.connect(self._update_filter_bar_columns)
+        self.model.columnsInserted.connect(self._update_filter_bar_columns)
+        self.model.columnsRemoved.connect(self._update_filter_bar_columns)
+         
+    def _update_filter_bar_columns(self, *args):
+        """列名变化时更新筛选栏的列下拉框，尽量保留当前选择"""
+        names = self.store.column_names()
+        combo = self.filter_bar_column
+        if names == [combo.itemText(i) for i in range(combo.count())]:
+            return
+        current = combo.currentText()
+        combo.blockSignals(True)
+        combo.clear()
+        combo.addItems(names)
+        if current in names:
+            combo.setCurrentText(current)
+        combo.blockSignals(False)
+         
+    def _apply_filter_bar(self):
+        """按筛选栏的条件筛选，值为空时清除筛选"""
+        from filter_engine import Condition  # 筛选条件
+        if self._loader is not None or self.store.read_only:
+            return
+        col = self.filter_bar_column.currentIndex()
+        operator = self.filter_bar_operator.currentText()
+        value = self.filter_bar_value.text()
+        if col < 0:
+            return
+        if value == "" and operator not in ("为空", "不为空"):
+            if self.store.filter is None:
+                return
+            conditions = []
+        else:
+            conditions = [(col, operator, value)]
+        expression = Condition(*conditions[0]) if conditions else None
+         
+        started = time.perf_counter()
+        self._run_step(self._filter_step(conditions, "AND"))
+        self.model.refresh()
+        elapsed = (time.perf_counter() - started) * 1000
+        if expression is None:
+            self.status_bar.showMessage(f"已清除筛选，共{self.store.row_count()}条记录")
+        else:
+            self.status_bar.showMessage(
+                f"已筛选出{self.store.row_count()}条记录 (共{self.store.total_row_count()}条) | 用时 {elapsed:.0f} 毫秒"
+            )
+         
     def _create_toolbar(self):
         """创建工具栏"""
         self.toolbar = QToolBar("主工具栏")
@@ -123,12 +658,20 @@ class DataAnalysisPlatform(QMainWindow):
         filter_action.triggered.connect(self._filter_data)
         self.toolbar.addAction(filter_action)
          
+        clear_filter_action = QAction("清除筛选", self)
+        clear_filter_action.triggered.connect(self._clear_filter)
+        self.toolbar.addAction(clear_filter_action)
+         
         self.toolbar.addSeparator()
          
         analyze_action = QAction("分析", self)
         analyze_action.triggered.connect(self._data_analysis)
         self.toolbar.addAction(analyze_action)
          
+        group_action = QAction("分组汇总", self)
+        group_action.triggered.connect(self._group_summary)
+        self.toolbar.addAction(group_action)
+         
         # 可视化按钮并连接信号槽
         visualize_action = QAction("可视化", self)
         visualize_action.triggered.connect(self._visualize_data)
@@ -136,20 +679,21 @@ class DataAnalysisPlatform(QMainWindow):
          
     def _copy_data(self):
         """复制选中单元格数据到剪贴板"""
-        selected_items = self.table_widget.selectedItems()
-        if not selected_items:
+        selected_indexes = sorted(self.table_widget.selectionModel().selectedIndexes(),
+                                  key=lambda index: (index.row(), index.column()))
+        if not selected_indexes:
             self.status_bar.showMessage("没有选中要复制的数据")
             return
-             
+         
         # 获取选中单元格的文本内容
         data = []
         current_row = -1
          
-        for item in selected_items:
-            if item.row() != current_row:
+        for index in selected_indexes:
+            if index.row() != current_row:
                 data.append([])
-                current_row = item.row()
-            data[-1].append(item.text())
+                current_row = index.row()
+            data[-1].append(self.store.display(index.row(), index.column()))
          
         # 将数据转换为制表符分隔的字符串
         text = "\n".join("\t".join(row) for row in data)
@@ -157,42 +701,42 @@ class DataAnalysisPlatform(QMainWindow):
         # 复制到剪贴板
         clipboard = QApplication.clipboard()
         clipboard.setText(text)
-        self.status_bar.showMessage(f"已复制 {len(selected_items)} 个单元格数据")
+        self.status_bar.showMessage(f"已复制 {len(selected_indexes)} 个单元格数据")
          
     def _paste_data(self):
         """从剪贴板粘贴数据到表格"""
+        if not self._check_in_memory():
+            return
         clipboard = QApplication.clipboard()
         text = clipboard.text()
          
         if not text:
             self.status_bar.showMessage("剪贴板中没有数据")
             return
-             
+         
         try:
             # 解析剪贴板数据（制表符分隔的行，换行符分隔的列）
             data = [row.split("\t") for row in text.split("\n") if row]
              
             # 获取当前选中单元格位置
-            selected_items = self.table_widget.selectedItems()
-            start_row = selected_items[0].row() if selected_items else 0
-            start_col = selected_items[0].column() if selected_items else 0
+            current = self.table_widget.currentIndex()
+            start_row = current.row() if current.isValid() else 0
+            start_col = current.column() if current.isValid() else 0
              
-            # 将数据粘贴到表格中
-            for row_idx, row_data in enumerate(data):
-                for col_idx, cell_data in enumerate(row_data):
-                    target_row = start_row + row_idx
-                    target_col = start_col + col_idx
-                     
-                    # 确保表格有足够的行和列
-                    if target_row >= self.table_widget.rowCount():
-                        self.table_widget.insertRow(target_row)
-                    if target_col >= self.table_widget.columnCount():
-                        self.table_widget.insertColumn(target_col)
-                     
-                    # 设置单元格数据
-                    item = QTableWidgetItem(cell_data)
-                    self.table_widget.setItem(target_row, target_col, item)
+            # 整次粘贴作为一步撤销
+            with self.store.transaction("粘贴"):
+                # 确保表格有足够的行和列
+                while start_col + max(len(row) for row in data) > self.store.column_count():
+                    self.store.add_column(f"列{self.store.column_count()+1}")
+                while start_row + len(data) > self.store.row_count():
+                    self.store.insert_row(self.store.row_count())
+                 
+                # 将数据按列类型写入后端
+                for row_idx, row_data in enumerate(data):
+                    for col_idx, cell_data in enumerate(row_data):
+                        self.store.set_value(start_row + row_idx, start_col + col_idx, cell_data)
              
+            self.model.refresh()
             self.status_bar.showMessage(f"已粘贴 {len(data)} 行数据")
         except Exception as e:
             self.status_bar.showMessage(f"粘贴失败: {str(e)}")
@@ -209,6 +753,11 @@ class DataAnalysisPlatform(QMainWindow):
         copy_action = menu.addAction("复制")
         copy_action.triggered.connect(self._copy_data)
          
+        # 分页浏览模式只读，只提供复制
+        if self.store.read_only:
+            menu.exec(self.table_widget.viewport().mapToGlobal(position))
+            return
+             
         paste_action = menu.addAction("粘贴")
         paste_action.triggered.connect(self._paste_data)
          
@@ -239,9 +788,11 @@ class DataAnalysisPlatform(QMainWindow):
     def _edit_column_name(self, col):
         """编辑指定列的列名"""
         from PyQt6.QtWidgets import QInputDialog
+        if not self._check_in_memory():
+            return
          
         # 获取当前列名
-        current_name = self.table_widget.horizontalHeaderItem(col).text()
+        current_name = self.store.column_names()[col]
          
         # 弹出输入对话框
         new_name, ok = QInputDialog.getText(
@@ -253,116 +804,384 @@ class DataAnalysisPlatform(QMainWindow):
          
         if ok and new_name:
             # 更新列名
-            self.table_widget.setHorizontalHeaderItem(col, QTableWidgetItem(new_name))
+            self.store.rename_column(col, new_name)
+            self.model.headerDataChanged.emit(Qt.Orientation.Horizontal, col, col)
             self.status_bar.showMessage(f"已更新列名: {current_name} -> {new_name}")
  
     def _add_column(self):
         """在表格末尾添加新列"""
-        col = self.table_widget.columnCount()
-        self.table_widget.insertColumn(col)
-        self.table_widget.setHorizontalHeaderItem(col, QTableWidgetItem(f"列{col+1}"))
+        if not self._check_in_memory():
+            return
+        col = self.store.column_count()
+        self.model.beginInsertColumns(QModelIndex(), col, col)
+        self.store.add_column(f"列{col+1}")
+        self.model.endInsertColumns()
         self.status_bar.showMessage(f"已添加第{col+1}列")
          
     def _remove_column(self):
         """删除当前选中列"""
-        col = self.table_widget.currentColumn()
+        if not self._check_in_memory():
+            return
+        col = self.table_widget.currentIndex().column()
         if col >= 0:
-            self.table_widget.removeColumn(col)
+            self.model.beginRemoveColumns(QModelIndex(), col, col)
+            self._run_step({"op": "remove_column", "column": self.store.column_names()[col]})
+            self.model.endRemoveColumns()
             self.status_bar.showMessage(f"已删除第{col+1}列")
         else:
             self.status_bar.showMessage("请先选择要删除的列")
          
     def _insert_row(self, row):
         """在指定位置插入新行"""
-        self.table_widget.insertRow(row)
-        # 初始化新行的单元格
-        for col in range(self.table_widget.columnCount()):
-            self.table_widget.setItem(row, col, QTableWidgetItem(""))
+        if not self._check_in_memory():
+            return
+        if row < 0:
+            row = self.store.row_count()
+        self.model.beginInsertRows(QModelIndex(), row, row)
+        self.store.insert_row(row)
+        self.model.endInsertRows()
          
     def _delete_row(self, row):
         """删除指定行"""
+        if not self._check_in_memory():
+            return
         if row >= 0:
-            self.table_widget.removeRow(row)
+            self.model.beginRemoveRows(QModelIndex(), row, row)
+            self.store.delete_row(row)
+            self.model.endRemoveRows()
          
     def _open_file(self):
         """
         打开数据文件并加载到表格中
          
-        支持格式: CSV/Excel/JSON
-        功能: 通过文件对话框选择文件，读取数据并显示在表格中
+        支持格式: CSV/Excel/JSON/NDJSON
+        功能: 通过文件对话框选择文件，在后台线程中分块读取，第一块读完即显示在表格中
+        """
+        if self._is_loading():
+            return
+         
+        file_path = self._choose_data_file("打开数据文件")
+        if file_path:
+            self._start_loading(file_path)
+         
+    def _open_file_with_preview(self):
         """
+        预览文件结构后只加载需要的列和行
+         
+        功能: 读取文件开头少量行并推断列类型，让用户勾选保留的列、设置起始行与行数、
+        填写筛选条件，读取时解析器直接跳过不需要的列和行
+        """
+        from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QListWidget,
+                                  QListWidgetItem, QSpinBox, QLineEdit, QDialogButtonBox)
+        from data_store import DataStore  # 列式数据存储
+        from data_loader import sniff_schema, Projection  # 文件结构预览与列/行投影
+         
+        if self._is_loading():
+            return
+         
+        file_path = self._choose_data_file("打开数据文件(预览)")
+        if not file_path:
+            return
+         
+        try:
+            sample = sniff_schema(file_path)
+        except Exception as e:
+            self.status_bar.showMessage(f"读取文件结构失败: {str(e)}")
+            return
+        columns = [str(name) for name in sample.columns]
+        sample.columns = columns
+         
+        # 创建预览对话框
+        dialog = QDialog(self)
+        dialog.setWindowTitle(f"预览 - {file_path}")
+        dialog.resize(900, 600)
+        layout = QVBoxLayout()
+         
+        # 采样数据预览
+        layout.addWidget(QLabel(f"前 {len(sample)} 行预览:"))
+        preview_store = DataStore()
+        preview_store.set_frame(sample)
+        preview = QTableView()
+        preview.setModel(DataFrameModel(preview_store, preview))
+        preview.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        layout.addWidget(preview)
+         
+        body = QHBoxLayout()
+         
+        # 列选择，显示推断出的类型
+        column_list = QListWidget()
+        for name in columns:
+            item = QListWidgetItem(f"{name} ({sample[name].dtype})")
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Checked)
+            column_list.addItem(item)
+        body.addWidget(column_list)
+         
+        # 行范围与筛选条件
+        form = QFormLayout()
+        skip_spin = QSpinBox()
+        skip_spin.setRange(0, 2 ** 31 - 1)
+        form.addRow("跳过前几行:", skip_spin)
+        limit_spin = QSpinBox()
+        limit_spin.setRange(0, 2 ** 31 - 1)
+        limit_spin.setSpecialValueText("全部")
+        form.addRow("最多读取行数:", limit_spin)
+        predicate_edit = QLineEdit()
+        predicate_edit.setPlaceholderText('例如: 金额 > 100 and 城市 == "北京"')
+        form.addRow("筛选条件:", predicate_edit)
+        body.addLayout(form)
+        layout.addLayout(body)
+         
+        # 添加确定/取消按钮
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok |
+                                 QDialogButtonBox.StandardButton.Cancel)
+        buttons.rejected.connect(dialog.reject)
+        layout.addWidget(buttons)
+        dialog.setLayout(layout)
+         
+        def build_projection():
+            """根据对话框中的选择生成投影"""
+            selected = [name for i, name in enumerate(columns)
+                        if column_list.item(i).checkState() == Qt.CheckState.Checked]
+            return Projection(selected, skip_spin.value(), limit_spin.value(),
+                              predicate_edit.text(), source_columns=columns)
+         
+        def accept():
+            """检查选择是否有效，筛选条件先在采样数据上试运行"""
+            projection = build_projection()
+            if not projection.columns:
+                QMessageBox.warning(dialog, "提示", "请至少选择一列")
+                return
+            try:
+                projection.apply(sample)
+            except Exception as e:
+                QMessageBox.warning(dialog, "提示", f"筛选条件无效: {str(e)}")
+                return
+            dialog.accept()
+         
+        buttons.accepted.connect(accept)
+         
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self._start_loading(file_path, build_projection())
+         
+    def _choose_data_file(self, title):
+        """弹出文件选择对话框，返回支持格式的文件路径，未选择时返回None"""
         from PyQt6.QtWidgets import QFileDialog  # 文件对话框组件
-        import pandas as pd  # 数据处理库
-        import json  # JSON处理模块
+        from data_loader import SUPPORTED_EXTENSIONS  # 支持的文件格式
          
         # 设置文件过滤器，支持多种格式
-        file_filter = "数据文件 (*.csv *.xlsx *.json);;CSV文件 (*.csv);;Excel文件 (*.xlsx);;JSON文件 (*.json)"
+        file_filter = ("数据文件 (*.csv *.xlsx *.json *.jsonl *.ndjson);;CSV文件 (*.csv);;Excel文件 (*.xlsx);;"
+                       "JSON文件 (*.json);;NDJSON文件 (*.jsonl *.ndjson)")
          
         # 弹出文件选择对话框
         file_path, _ = QFileDialog.getOpenFileName(
             self, 
-            "打开数据文件",  # 对话框标题
+            title,  # 对话框标题
             "",  # 初始目录
             file_filter  # 文件过滤器
         )
          
-        # 如果用户选择了文件
+        if not file_path:
+            return None
+        if not file_path.lower().endswith(SUPPORTED_EXTENSIONS):
+            self.status_bar.showMessage("加载文件失败: 不支持的文件格式")
+            return None
+        return file_path
+         
+    def _start_loading(self, file_path, projection=None):
+        """启动后台读取线程，projection 指定只读取部分列和行"""
+        from pipeline import Pipeline  # 可重放的处理流水线
+        self._load_path = file_path
+        self._load_started = time.perf_counter()
+        self._load_first_chunk = True
+        self._load_version = None
+        self._load_projection = projection
+        # 新文件重新开始记录流水线，加载时的投影作为流水线的数据来源
+        self.pipeline = Pipeline.from_projection(projection)
+        self._pending_pipeline = None
+        self._loader = FileLoadWorker(file_path, self.cache, self, projection)
+        self._loader.chunk_loaded.connect(self._on_chunk_loaded)
+        self._loader.frame_ready.connect(self._on_frame_ready)
+        self._loader.progress.connect(self._on_load_progress)
+        self._loader.finished_loading.connect(self._on_load_finished)
+        self._loader.failed.connect(self._on_load_failed)
+        self._loader.finished.connect(self._loader.deleteLater)
+        self.cancel_load_button.show()
+        self.status_bar.showMessage(f"正在加载文件: {file_path}")
+        self._loader.start()
+         
+    def _on_chunk_loaded(self, chunk):
+        """把后台线程读到的数据块追加到表格"""
+        from data_store import DataStore  # 列式数据存储
+        if self._load_first_chunk:
+            # 第一块替换现有数据，立即可浏览
+            self._load_first_chunk = False
+            if self.store.read_only:
+                self._set_store(DataStore())
+            self.store.set_frame(chunk)
+            self.model.refresh()
+        elif len(chunk) == 0:
+            # 筛选条件可能使整块数据都被过滤掉
+            return
+        elif list(chunk.columns) != list(self.store.df.columns):
+            # JSON记录可能出现新的字段，列变化时整体刷新
+            self.store.append(chunk)
+            self.model.refresh()
+        else:
+            start = self.store.row_count()
+            self.model.beginInsertRows(QModelIndex(), start, start + len(chunk) - 1)
+            self.store.append(chunk)
+            self.model.endInsertRows()
+        self._load_version = self.store.version
+         
+    def _on_frame_ready(self, frame):
+        """用推断类型后的数据替换逐块读取的数据，加载期间编辑过单元格时保留原数据"""
+        if self.store.version != self._load_version or len(frame) != self.store.row_count():
+            return
+        self.store.set_frame(frame)
+        self._load_version = self.store.version
+        self.model.dataChanged.emit(
+            self.model.index(0, 0),
+            self.model.index(self.store.row_count() - 1, self.store.column_count() - 1)
+        )
+             
+    def _on_load_progress(self, rows, bytes_read):
+        """在状态栏显示已加载行数与速度"""
+        from data_loader import file_size  # 文件大小，用于显示读取进度
+        elapsed = max(time.perf_counter() - self._load_started, 1e-6)
+        message = f"正在加载: 已读取 {rows:,} 行 | {rows / elapsed:,.0f} 行/秒"
+        if bytes_read is not None:
+            total = max(file_size(self._load_path), 1)
+            message += f" | {bytes_read / elapsed / 1024 / 1024:.1f} MB/秒 | {min(bytes_read / total, 1):.0%}"
+        self.status_bar.showMessage(message)
+         
+    def _on_load_finished(self, rows, cancelled, from_cache):
+        """后台读取结束"""
+        from data_store import DataStore  # 列式数据存储
+        self._loader = None
+        self.cancel_load_button.hide()
+        elapsed = time.perf_counter() - self._load_started
+        if cancelled:
+            self.status_bar.showMessage(f"已取消加载，保留已读取的 {rows:,} 行")
+        else:
+            if self._load_first_chunk:
+                # 文件没有数据行
+                self._set_store(DataStore())
+            elif self._load_projection is None and self.store.version == self._load_version:
+                # 数据与缓存一致，列索引可以保存到缓存目录
+                try:
+                    self.store.attach_cache(self.cache, self.cache.sidecar_base(self._load_path))
+                except OSError:
+                    pass
+            source = ", 来自缓存" if from_cache else ""
+            memory = self.store.memory_report()["内存(字节)"].sum() / 1024 / 1024
+            self.status_bar.showMessage(
+                f"成功加载文件: {self._load_path} ({rows:,} 行, 内存 {memory:.1f} MB, 用时 {elapsed:.2f} 秒{source})"
+            )
+            if self._pending_pipeline is not None:
+                self._run_pending_pipeline(elapsed)
+        self._pending_pipeline = None
+         
+    def _on_load_failed(self, message):
+        """后台读取出错"""
+        self._loader = None
+        self._pending_pipeline = None
+        self.cancel_load_button.hide()
+        # 显示错误消息
+        self.status_bar.showMessage(f"加载文件失败: {message}")
+         
+    def _cancel_loading(self):
+        """取消正在进行的后台加载、保存、统计或汇总"""
+        if self._loader is not None:
+            self._loader.cancel()
+            self.status_bar.showMessage("正在取消...")
+             
+    def _is_loading(self):
+        """后台加载、保存、统计或汇总期间提示用户等待，返回是否有后台任务"""
+        if self._loader is not None:
+            self.status_bar.showMessage("正在后台加载/保存/统计/汇总数据，请等待完成或取消")
+            return True
+        return False
+         
+    def _open_large_csv(self):
+        """
+        以分页浏览模式打开大CSV文件
+         
+        功能: 后台扫描一遍文件建立行偏移索引，之后按滚动位置从内存映射文件中按页解析，
+              内存占用与文件大小无关，数据只读
+        """
+        from PyQt6.QtWidgets import QFileDialog  # 文件对话框组件
+        from pipeline import Pipeline  # 可重放的处理流水线
+         
+        if self._is_loading():
+            return
+         
+        file_path, _ = QFileDialog.getOpenFileName(self, "分页浏览CSV文件", "", "CSV文件 (*.csv)")
         if file_path:
-            try:
-                # 根据文件扩展名选择不同的读取方式
-                if file_path.endswith('.csv'):
-                    # 读取CSV文件
-                    data = pd.read_csv(file_path)  # 使用pandas读取CSV
-                elif file_path.endswith('.xlsx'):
-                    # 读取Excel文件
-                    data = pd.read_excel(file_path)  # 使用pandas读取Excel
-                elif file_path.endswith('.json'):
-                    # 读取JSON文件
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        json_data = json.load(f)  # 加载JSON数据
-                    data = pd.DataFrame(json_data)  # 转换为DataFrame
-                else:
-                    raise ValueError("不支持的文件格式")
-                 
-                # 清空现有表格
-                self.table_widget.clear()
-                 
-                # 设置表格行列数
-                self.table_widget.setRowCount(data.shape[0])  # 行数为数据行数
-                self.table_widget.setColumnCount(data.shape[1])  # 列数为数据列数
-                 
-                # 设置表头
-                self.table_widget.setHorizontalHeaderLabels(data.columns.tolist())
-                 
-                # 填充表格数据
-                for i in range(data.shape[0]):  # 遍历每一行
-                    for j in range(data.shape[1]):  # 遍历每一列
-                        # 获取单元格值，处理NaN值为空字符串
-                        value = str(data.iloc[i, j]) if not pd.isna(data.iloc[i, j]) else ""
-                        # 创建表格项并设置值
-                        item = QTableWidgetItem(value)
-                        self.table_widget.setItem(i, j, item)
-                 
-                # 显示成功消息
-                self.status_bar.showMessage(f"成功加载文件: {file_path}")
-                 
-            except Exception as e:
-                # 显示错误消息
-                self.status_bar.showMessage(f"加载文件失败: {str(e)}")
+            self._load_path = file_path
+            self._load_started = time.perf_counter()
+            self.pipeline = Pipeline()
+            self._pending_pipeline = None
+            self._loader = RowIndexWorker(file_path, self, self.cache)
+            self._loader.progress.connect(self._on_load_progress)
+            self._loader.index_ready.connect(self._on_index_ready)
+            self._loader.failed.connect(self._on_load_failed)
+            self._loader.finished.connect(self._loader.deleteLater)
+            self.cancel_load_button.show()
+            self.status_bar.showMessage(f"正在建立行索引: {file_path}")
+            self._loader.start()
+             
+    def _on_index_ready(self, index):
+        """行偏移索引建立完成，切换到分页存储"""
+        from data_store import PagedCsvStore  # 分页只读存储
+        self._loader = None
+        self.cancel_load_button.hide()
+        if index is None:
+            self.status_bar.showMessage("已取消建立行索引")
+            return
+        self._set_store(PagedCsvStore(index))
+        elapsed = time.perf_counter() - self._load_started
+        self.status_bar.showMessage(
+            f"分页浏览: {self._load_path} ({index.row_count:,} 行, 索引用时 {elapsed:.2f} 秒, 只读)"
+        )
+         
+    def _set_store(self, store):
+        """替换后端数据存储并释放旧存储"""
+        old_store = self.store
+        self.store = store
+        if not store.read_only:
+            store.use_indexes = self.index_action.isChecked()
+            store.history.max_bytes = self.undo_max_bytes
+        if self.chart_dock is not None:
+            self.chart_panel.set_store(store)
+        self.model.set_store(store)
+        old_store.close()
+         
+    def _check_in_memory(self):
+        """需要完整内存数据的操作前检查，返回是否可以继续"""
+        if self._is_loading():
+            return False
+        if self.store.read_only:
+            self.status_bar.showMessage("分页浏览模式下数据只读，请使用“打开”完整加载后再操作")
+            return False
+        return True
          
     def _save_file(self):
         """
         保存表格数据到文件
          
         支持格式: CSV/Excel/JSON
-        功能: 通过文件对话框选择保存路径和格式，将表格数据保存到指定文件
+        功能: 通过文件对话框选择保存路径和格式，在后台线程中直接从后端数据按块写出，
+              保留各列原生类型，分页浏览模式下同样可以保存
         """
         from PyQt6.QtWidgets import QFileDialog  # 文件对话框组件
-        import pandas as pd  # 数据处理库
-        import json  # JSON处理模块
+         
+        # 后台任务进行中不保存
+        if self._is_loading():
+            return
          
         # 检查表格是否有数据
-        if self.table_widget.rowCount() == 0 or self.table_widget.columnCount() == 0:
+        if self.store.row_count() == 0 or self.store.column_count() == 0:
             self.status_bar.showMessage("表格中没有数据可保存")
             return
          
@@ -379,85 +1198,131 @@ class DataAnalysisPlatform(QMainWindow):
          
         # 如果用户选择了保存路径
         if file_path:
-            try:
-                # 从表格中提取数据
-                data = []
-                headers = []
-                 
-                # 获取表头
-                for col in range(self.table_widget.columnCount()):
-                    header = self.table_widget.horizontalHeaderItem(col)
-                    headers.append(header.text() if header else f"Column{col+1}")
-                 
-                # 获取表格数据
-                for row in range(self.table_widget.rowCount()):
-                    row_data = []
-                    for col in range(self.table_widget.columnCount()):
-                        item = self.table_widget.item(row, col)
-                        row_data.append(item.text() if item else "")
-                    data.append(row_data)
-                 
-                # 创建DataFrame
-                df = pd.DataFrame(data, columns=headers)
-                 
-                # 根据选择的文件格式保存数据
-                if selected_filter == "CSV文件 (*.csv)" or file_path.endswith('.csv'):
-                    # 保存为CSV文件
-                    df.to_csv(file_path, index=False, encoding='utf-8-sig')
-                elif selected_filter == "Excel文件 (*.xlsx)" or file_path.endswith('.xlsx'):
-                    # 保存为Excel文件
-                    df.to_excel(file_path, index=False)
-                elif selected_filter == "JSON文件 (*.json)" or file_path.endswith('.json'):
-                    # 保存为JSON文件
-                    df.to_json(file_path, orient='records', force_ascii=False, indent=4)
-                else:
-                    raise ValueError("不支持的文件格式")
-                 
-                # 显示成功消息
-                self.status_bar.showMessage(f"数据已成功保存到: {file_path}")
-                 
-            except Exception as e:
-                # 显示错误消息
-                self.status_bar.showMessage(f"保存文件失败: {str(e)}")
+            # 根据选择的文件格式确定写出方式
+            if selected_filter == "CSV文件 (*.csv)" or file_path.endswith('.csv'):
+                file_format = "csv"
+            elif selected_filter == "Excel文件 (*.xlsx)" or file_path.endswith('.xlsx'):
+                file_format = "xlsx"
+            elif selected_filter == "JSON文件 (*.json)" or file_path.endswith('.json'):
+                file_format = "json"
+            else:
+                self.status_bar.showMessage("保存文件失败: 不支持的文件格式")
+                return
+             
+            # 启动后台写出线程
+            self._save_path = file_path
+            self._load_started = time.perf_counter()
+            self._loader = SaveWorker(self.store, file_path, file_format, self)
+            self.model.locked = True
+            self._loader.progress.connect(self._on_save_progress)
+            self._loader.finished_saving.connect(self._on_save_finished)
+            self._loader.failed.connect(self._on_save_failed)
+            self._loader.finished.connect(self._loader.deleteLater)
+            self.cancel_load_button.setText("取消保存")
+            self.cancel_load_button.show()
+            self.status_bar.showMessage(f"正在保存: {file_path}")
+            self._loader.start()
+             
+    def _on_save_progress(self, rows):
+        """在状态栏显示保存进度"""
+        elapsed = max(time.perf_counter() - self._load_started, 1e-6)
+        total = max(self.store.row_count(), 1)
+        self.status_bar.showMessage(
+            f"正在保存: 已写出 {rows:,} 行 ({min(rows / total, 1):.0%}) | {rows / elapsed:,.0f} 行/秒"
+        )
+         
+    def _on_save_finished(self, rows, cancelled):
+        """后台保存结束"""
+        self._loader = None
+        self.model.locked = False
+        self.cancel_load_button.hide()
+        self.cancel_load_button.setText("取消加载")
+        if cancelled:
+            self.status_bar.showMessage("已取消保存，目标文件未修改")
+        else:
+            # 显示成功消息
+            elapsed = time.perf_counter() - self._load_started
+            self.status_bar.showMessage(f"数据已成功保存到: {self._save_path} ({rows:,} 行, 用时 {elapsed:.2f} 秒)")
+             
+    def _on_save_failed(self, message):
+        """后台保存出错"""
+        self._loader = None
+        self.model.locked = False
+        self.cancel_load_button.hide()
+        self.cancel_load_button.setText("取消加载")
+        # 显示错误消息
+        self.status_bar.showMessage(f"保存文件失败: {message}")
          
     def _sort_data(self):
         """
         对表格数据进行多列排序
          
-        功能: 弹出对话框让用户选择最多3列进行组合排序，支持升序/降序
+        功能: 弹出对话框让用户选择任意多列进行组合排序，支持升序/降序；
+        排序按列的原生类型比较，只改变显示顺序，可通过“取消排序”恢复
         """
-        from PyQt6.QtWidgets import (QInputDialog, QDialog, QVBoxLayout, 
-                                  QLabel, QComboBox, QDialogButtonBox, QHBoxLayout)
+        from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QLabel, QComboBox,
+                                  QDialogButtonBox, QHBoxLayout, QPushButton)
+        from collation import available_collations  # 拼音/笔画排序
+         
+        # 加载期间或分页浏览模式下不修改数据
+        if not self._check_in_memory():
+            return
          
         # 检查表格是否有数据
-        if self.table_widget.rowCount() == 0 or self.table_widget.columnCount() == 0:
+        if self.store.row_count() == 0 or self.store.column_count() == 0:
             self.status_bar.showMessage("表格中没有数据可排序")
             return
-             
+         
         # 创建排序对话框
         dialog = QDialog(self)
         dialog.setWindowTitle("多列排序")
         layout = QVBoxLayout()
+        conditions_layout = QVBoxLayout()
+        layout.addLayout(conditions_layout)
+        combos = []
          
-        # 添加最多3个排序条件
-        for i in range(3):
+        def add_condition(col=None, ascending=True):
+            """添加一行排序条件，第一行之后的条件可以选择不使用"""
+            i = len(combos)
             row_layout = QHBoxLayout()
             row_layout.addWidget(QLabel(f"排序条件 {i+1}:"))
              
             # 列选择下拉框
             col_combo = QComboBox()
-            col_combo.setObjectName(f"col_combo_{i}")
-            col_combo.addItems([self.table_widget.horizontalHeaderItem(j).text() 
-                              for j in range(self.table_widget.columnCount())])
+            if i > 0:
+                col_combo.addItem("(不使用)")
+            col_combo.addItems(self.store.column_names())
+            if col is not None:
+                col_combo.setCurrentIndex(col + (1 if i > 0 else 0))
             row_layout.addWidget(col_combo)
              
             # 排序方式下拉框
             order_combo = QComboBox()
-            order_combo.setObjectName(f"order_combo_{i}")
             order_combo.addItems(["升序", "降序"])
+            order_combo.setCurrentIndex(0 if ascending else 1)
             row_layout.addWidget(order_combo)
              
-            layout.addLayout(row_layout)
+            conditions_layout.addLayout(row_layout)
+            combos.append((col_combo, order_combo))
+         
+        # 默认显示当前的排序条件，至少3行
+        for col, ascending in self.store.sort_conditions:
+            add_condition(col, ascending)
+        while len(combos) < 3:
+            add_condition()
+         
+        add_button = QPushButton("添加排序条件")
+        add_button.clicked.connect(lambda: add_condition())
+        layout.addWidget(add_button)
+         
+        # 文本列的排序方式，也用于筛选时比较文本大小
+        collation_layout = QHBoxLayout()
+        collation_layout.addWidget(QLabel("文本排序方式:"))
+        collation_combo = QComboBox()
+        collation_combo.addItems(available_collations())
+        collation_combo.setCurrentText(self.store.collation)
+        collation_layout.addWidget(collation_combo)
+        layout.addLayout(collation_layout)
          
         # 添加确定/取消按钮
         buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | 
@@ -472,49 +1337,215 @@ class DataAnalysisPlatform(QMainWindow):
             # 获取排序条件并执行排序
             self.status_bar.showMessage("正在排序数据...")
              
-            # 获取当前表格数据
-            data = []
-            for row in range(self.table_widget.rowCount()):
-                row_data = []
-                for col in range(self.table_widget.columnCount()):
-                    item = self.table_widget.item(row, col)
-                    row_data.append(item.text() if item else "")
-                data.append(row_data)
-             
-            # 转换为DataFrame以便排序
-            headers = [self.table_widget.horizontalHeaderItem(col).text() 
-                      for col in range(self.table_widget.columnCount())]
-            df = pd.DataFrame(data, columns=headers)
-             
-            # 获取排序条件
+            # 获取排序条件，同一列只按第一次出现的条件排序
             sort_conditions = []
-            for i in range(3):
-                col_combo = dialog.findChild(QComboBox, f"col_combo_{i}")
-                order_combo = dialog.findChild(QComboBox, f"order_combo_{i}")
-                 
-                if col_combo and col_combo.currentText():
-                    ascending = order_combo.currentText() == "升序"
-                    sort_conditions.append((col_combo.currentText(), ascending))
+            used = set()
+            for i, (col_combo, order_combo) in enumerate(combos):
+                col = col_combo.currentIndex() - (1 if i > 0 else 0)
+                if col < 0 or col in used:
+                    continue
+                used.add(col)
+                sort_conditions.append((col, order_combo.currentText() == "升序"))
              
-            # 执行多列排序
-            if sort_conditions:
-                df = df.sort_values(
-                    by=[col for col, _ in sort_conditions],
-                    ascending=[asc for _, asc in sort_conditions]
-                )
-                 
-                # 更新表格数据
-                self.table_widget.setRowCount(len(df))
-                for row in range(len(df)):
-                    for col in range(len(df.columns)):
-                        self.table_widget.setItem(row, col, 
-                            QTableWidgetItem(str(df.iloc[row, col])))
-                 
-            self.status_bar.showMessage(f"已按{len(sort_conditions)}列排序完成")
+            # 按原生类型计算行号排列，表格通过视图显示排序结果
+            started = time.perf_counter()
+            names = self.store.column_names()
+            self._run_step({
+                "op": "sort",
+                "keys": [[names[col], ascending] for col, ascending in sort_conditions],
+                "collation": collation_combo.currentText(),
+            })
+            self.model.refresh()
+             
+            self.status_bar.showMessage(
+                f"已按{len(sort_conditions)}列排序完成，用时 {time.perf_counter() - started:.2f} 秒"
+            )
         else:
             self.status_bar.showMessage("排序已取消")
          
- 
+    def _undo(self):
+        """撤销最近一步修改"""
+        if not self._check_in_memory():
+            return
+        step = self.store.undo()
+        if step is None:
+            self.status_bar.showMessage("没有可撤销的操作")
+            return
+        # 撤销的操作同时从流水线记录中移除
+        for pipeline_step in step.tag or []:
+            self.pipeline.remove(pipeline_step)
+        self.model.refresh()
+        self.status_bar.showMessage(f"已撤销: {step.label}")
+         
+    def _redo(self):
+        """重做最近撤销的修改"""
+        if not self._check_in_memory():
+            return
+        step = self.store.redo()
+        if step is None:
+            self.status_bar.showMessage("没有可重做的操作")
+            return
+        for pipeline_step in step.tag or []:
+            self.pipeline.append(pipeline_step)
+        self.model.refresh()
+        self.status_bar.showMessage(f"已重做: {step.label}")
+         
+    def _set_undo_limit(self):
+        """设置撤销历史的内存上限，超过时丢弃最早的操作"""
+        from PyQt6.QtWidgets import QInputDialog
+         
+        if self.store.read_only:
+            self.status_bar.showMessage("分页浏览模式下数据只读，没有撤销历史")
+            return
+        used = self.store.history.nbytes() / 1024 / 1024
+        limit, ok = QInputDialog.getInt(
+            self,
+            "撤销历史内存上限",
+            f"撤销历史当前占用 {used:.1f} MB，请输入上限(MB):",
+            self.undo_max_bytes // (1024 * 1024),
+            1,
+            64 * 1024,
+            64
+        )
+        if not ok:
+            return
+        self.undo_max_bytes = limit * 1024 * 1024
+        self.store.history.max_bytes = self.undo_max_bytes
+        evicted = self.store.history.evict()
+        self.status_bar.showMessage(f"撤销历史内存上限已设为 {limit} MB，丢弃了 {evicted} 步最早的操作")
+         
+    def _toggle_indexes(self, checked):
+        """开启或关闭列索引"""
+        self.store.use_indexes = checked
+        self.status_bar.showMessage("已开启列索引" if checked else "已关闭列索引")
+         
+    def _clear_filter(self):
+        """清除筛选，显示全部数据"""
+        if not self._check_in_memory():
+            return
+        self._run_step(self._filter_step([], "AND"))
+        self.model.refresh()
+        self.filter_bar_value.blockSignals(True)
+        self.filter_bar_value.clear()
+        self.filter_bar_value.blockSignals(False)
+        self.status_bar.showMessage(f"已清除筛选，共{self.store.row_count()}条记录")
+         
+    def _clear_sort(self):
+        """恢复数据的原始顺序"""
+        if not self._check_in_memory():
+            return
+        self._run_step({"op": "sort", "keys": [], "collation": None})
+        self.model.refresh()
+        self.status_bar.showMessage("已恢复原始顺序")
+         
+    def _run_step(self, step):
+        """
+        在当前数据上执行一个流水线步骤并记录到流水线，撤销该操作时一并从记录中移除
+         
+        参数:
+            step: dict - 流水线步骤，见 Pipeline
+        返回值: apply_step 的返回值
+        """
+        from pipeline import apply_step, STEP_NAMES  # 可重放的处理流水线
+        with self.store.transaction(STEP_NAMES[step["op"]]) as undo_step:
+            result = apply_step(self.store, step)
+        self.pipeline.append(step)
+        if undo_step is not None and undo_step.edits:
+            undo_step.tag = [step]
+        return result
+         
+    def _filter_step(self, conditions, logic):
+        """把 [(列号, 运算符, 值), ...] 转换为按列名记录的筛选步骤，条件为空表示清除筛选"""
+        names = self.store.column_names()
+        return {
+            "op": "filter",
+            "conditions": [[names[col], operator, value] for col, operator, value in conditions],
+            "logic": logic,
+        }
+         
+    def _show_pipeline(self):
+        """显示当前记录的流水线步骤"""
+        from PyQt6.QtWidgets import QMessageBox
+         
+        lines = self.pipeline.describe()
+        if not lines:
+            QMessageBox.information(self, "流水线", "还没有记录任何步骤")
+            return
+        text = "\n".join(f"{i}. {line}" for i, line in enumerate(lines, 1))
+        QMessageBox.information(self, "流水线", text)
+         
+    def _save_pipeline(self):
+        """把记录的流水线保存为JSON文件"""
+        from PyQt6.QtWidgets import QFileDialog
+         
+        if not self.pipeline.steps:
+            self.status_bar.showMessage("还没有记录任何步骤")
+            return
+        file_path, _ = QFileDialog.getSaveFileName(self, "保存流水线", "", "流水线文件 (*.json)")
+        if not file_path:
+            return
+        if not file_path.lower().endswith(".json"):
+            file_path += ".json"
+        try:
+            self.pipeline.save(file_path)
+            self.status_bar.showMessage(f"已保存流水线 ({len(self.pipeline.steps)} 个步骤): {file_path}")
+        except Exception as e:
+            self.status_bar.showMessage(f"保存流水线失败: {str(e)}")
+         
+    def _replay_pipeline(self):
+        """
+        选择流水线文件与数据文件，加载数据后重放流水线
+         
+        只读取流水线用到的列，加载完成后执行优化后的步骤
+        """
+        from PyQt6.QtWidgets import QFileDialog
+        from data_loader import sniff_schema  # 文件结构预览
+        from pipeline import Pipeline  # 可重放的处理流水线
+         
+        if self._is_loading():
+            return
+        pipeline_path, _ = QFileDialog.getOpenFileName(self, "选择流水线文件", "", "流水线文件 (*.json)")
+        if not pipeline_path:
+            return
+        file_path = self._choose_data_file("选择要处理的数据文件")
+        if file_path is None:
+            return
+        try:
+            pipeline = Pipeline.load(pipeline_path)
+            projection, steps = pipeline.optimize(list(sniff_schema(file_path, 1).columns))
+        except Exception as e:
+            self.status_bar.showMessage(f"读取流水线失败: {str(e)}")
+            return
+        self._start_loading(file_path, None if projection.is_full() else projection)
+        self._pending_pipeline = (pipeline, steps)
+         
+    def _run_pending_pipeline(self, load_elapsed):
+        """在加载完成的数据上执行待重放的流水线"""
+        from pipeline import Pipeline  # 可重放的处理流水线
+        pipeline, steps = self._pending_pipeline
+        started = time.perf_counter()
+        try:
+            with self.store.transaction("重放流水线") as undo_step:
+                pipeline.apply(self.store, steps)
+        except Exception as e:
+            self.model.refresh()
+            self.status_bar.showMessage(f"重放流水线失败: {str(e)}")
+            return
+        # 重放的流水线作为当前记录，可以继续追加步骤；撤销重放时一并清空
+        self.pipeline = Pipeline(pipeline.steps, pipeline.source)
+        if undo_step is not None and undo_step.edits:
+            undo_step.tag = list(self.pipeline.steps)
+        self.model.refresh()
+        self.status_bar.showMessage(
+            f"已重放流水线: 执行 {len(steps)}/{len(pipeline.steps)} 个步骤，结果 {self.store.row_count():,} 行 | "
+            f"加载 {load_elapsed:.2f} 秒，处理 {time.perf_counter() - started:.2f} 秒"
+        )
+         
+    def _clear_pipeline(self):
+        """清空记录的流水线步骤，保留数据来源"""
+        from pipeline import Pipeline  # 可重放的处理流水线
+        self.pipeline = Pipeline(source=self.pipeline.source)
+        self.status_bar.showMessage("已清空流水线记录")
          
     def _clean_data(self):
         """
@@ -526,8 +1557,12 @@ class DataAnalysisPlatform(QMainWindow):
         """
         from PyQt6.QtWidgets import QInputDialog, QMessageBox  # 输入对话框和消息框组件
          
+        # 加载期间或分页浏览模式下不修改数据
+        if not self._check_in_memory():
+            return
+         
         # 检查表格是否有数据
-        if self.table_widget.rowCount() == 0 or self.table_widget.columnCount() == 0:
+        if self.store.row_count() == 0 or self.store.column_count() == 0:
             self.status_bar.showMessage("表格中没有数据可清洗")
             return
              
@@ -549,23 +1584,12 @@ class DataAnalysisPlatform(QMainWindow):
         # 根据用户选择执行不同的清洗操作
         try:
             if option == "删除空行":
-                # 删除所有空行
-                rows_to_remove = []
-                for row in range(self.table_widget.rowCount()):
-                    is_empty = True
-                    for col in range(self.table_widget.columnCount()):
-                        item = self.table_widget.item(row, col)
-                        if item and item.text().strip():
-                            is_empty = False
-                            break
-                    if is_empty:
-                        rows_to_remove.append(row)
-                 
-                # 从后往前删除行，避免索引错乱
-                for row in sorted(rows_to_remove, reverse=True):
-                    self.table_widget.removeRow(row)
+                # 删除所有列都为空的行
+                started = time.perf_counter()
+                removed = self._run_step({"op": "drop_empty_rows", "column": None})
+                self.model.refresh()
                  
-                self.status_bar.showMessage(f"已删除 {len(rows_to_remove)} 个空行")
+                self.status_bar.showMessage(f"已删除 {removed} 个空行，用时 {time.perf_counter() - started:.2f} 秒")
                  
             elif option == "填充空值":
                 # 填充空值
@@ -575,7 +1599,7 @@ class DataAnalysisPlatform(QMainWindow):
                     "请输入要填充空值的列号(从1开始):",
                     1,  # 默认值
                     1,  # 最小值
-                    self.table_widget.columnCount(),  # 最大值
+                    self.store.column_count(),  # 最大值
                     1  # 步长
                 )
                  
@@ -593,38 +1617,20 @@ class DataAnalysisPlatform(QMainWindow):
                     return
                      
                 # 填充空值
-                col_index = col - 1
-                filled_count = 0
-                for row in range(self.table_widget.rowCount()):
-                    item = self.table_widget.item(row, col_index)
-                    if not item or not item.text().strip():
-                        self.table_widget.setItem(row, col_index, QTableWidgetItem(value))
-                        filled_count += 1
+                started = time.perf_counter()
+                filled_count = self._run_step(
+                    {"op": "fill_empty", "column": self.store.column_names()[col - 1], "value": value})
+                self.model.refresh()
                  
-                self.status_bar.showMessage(f"已填充 {filled_count} 个空值")
+                self.status_bar.showMessage(f"已填充 {filled_count} 个空值，用时 {time.perf_counter() - started:.2f} 秒")
                  
             elif option == "删除重复行":
                 # 删除重复行
-                rows_to_remove = []
-                seen_rows = set()
-                 
-                for row in range(self.table_widget.rowCount()):
-                    row_data = []
-                    for col in range(self.table_widget.columnCount()):
-                        item = self.table_widget.item(row, col)
-                        row_data.append(item.text() if item else "")
-                     
-                    row_tuple = tuple(row_data)
-                    if row_tuple in seen_rows:
-                        rows_to_remove.append(row)
-                    else:
-                        seen_rows.add(row_tuple)
-                 
-                # 从后往前删除行
-                for row in sorted(rows_to_remove, reverse=True):
-                    self.table_widget.removeRow(row)
+                started = time.perf_counter()
+                removed = self._run_step({"op": "drop_duplicates", "column": None})
+                self.model.refresh()
                  
-                self.status_bar.showMessage(f"已删除 {len(rows_to_remove)} 个重复行")
+                self.status_bar.showMessage(f"已删除 {removed} 个重复行，用时 {time.perf_counter() - started:.2f} 秒")
                  
             elif option == "数据类型转换":
                 # 数据类型转换
@@ -634,7 +1640,7 @@ class DataAnalysisPlatform(QMainWindow):
                     "请输入要转换数据类型的列号(从1开始):",
                     1,
                     1,
-                    self.table_widget.columnCount(),
+                    self.store.column_count(),
                     1
                 )
                  
@@ -655,29 +1661,16 @@ class DataAnalysisPlatform(QMainWindow):
                 if not ok:
                     return
                      
-                # 执行转换
-                col_index = col - 1
-                converted_count = 0
-                for row in range(self.table_widget.rowCount()):
-                    item = self.table_widget.item(row, col_index)
-                    if item and item.text().strip():
-                        try:
-                            text = item.text()
-                            if target_type == "整数":
-                                value = int(text)
-                            elif target_type == "浮点数":
-                                value = float(text)
-                            elif target_type == "布尔值":
-                                value = True if text.lower() in ["true", "1", "yes"] else False
-                            else:  # 字符串
-                                value = str(text)
-                             
-                            self.table_widget.setItem(row, col_index, QTableWidgetItem(str(value)))
-                            converted_count += 1
-                        except ValueError:
-                            pass
+                # 执行转换，无法转换的值变为空值
+                started = time.perf_counter()
+                converted_count, failed_count = self._run_step(
+                    {"op": "convert", "column": self.store.column_names()[col - 1], "type": target_type})
+                self.model.refresh()
                  
-                self.status_bar.showMessage(f"已转换 {converted_count} 个值为 {target_type}")
+                self.status_bar.showMessage(
+                    f"已转换 {converted_count} 个值为 {target_type}，{failed_count} 个值无法转换已置为空，"
+                    f"用时 {time.perf_counter() - started:.2f} 秒"
+                )
                  
         except Exception as e:
             self.status_bar.showMessage(f"数据清洗失败: {str(e)}")
@@ -687,15 +1680,20 @@ class DataAnalysisPlatform(QMainWindow):
         对表格数据进行高级筛选
          
         功能: 弹出对话框让用户设置多条件筛选，支持运算符(=,>,<等)和逻辑组合(AND/OR)
-        改进: 支持多条件组合筛选，简化操作流程
+        改进: 条件编译为表达式树，按列类型计算掩码；筛选结果是视图，原数据保留，可随时清除
         """
         from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                                   QComboBox, QLineEdit, QDialogButtonBox, QPushButton,
                                   QScrollArea, QWidget, QGroupBox)
         from PyQt6.QtCore import Qt
+        from filter_engine import OPERATORS, LOGICS  # 筛选运算符与逻辑组合
+         
+        # 加载期间或分页浏览模式下不修改数据
+        if not self._check_in_memory():
+            return
          
         # 检查表格是否有数据
-        if self.table_widget.rowCount() == 0 or self.table_widget.columnCount() == 0:
+        if self.store.row_count() == 0 or self.store.column_count() == 0:
             self.status_bar.showMessage("表格中没有数据可筛选")
             return
              
@@ -718,25 +1716,30 @@ class DataAnalysisPlatform(QMainWindow):
         # 初始条件
         condition_widgets = []
          
-        def add_condition():
+        def add_condition(condition=None):
             condition_widget = QWidget()
             condition_layout = QHBoxLayout()
              
             # 列选择下拉框
             col_combo = QComboBox()
-            col_combo.addItems([self.table_widget.horizontalHeaderItem(j).text() 
-                              for j in range(self.table_widget.columnCount())])
+            col_combo.addItems(self.store.column_names())
             condition_layout.addWidget(col_combo)
              
             # 运算符下拉框
             operator_combo = QComboBox()
-            operator_combo.addItems(["=", ">", "<", "<=", ">=", "!=", "包含", "不包含", "开头为", "结尾为", "为空", "不为空"])
+            operator_combo.addItems(OPERATORS)
             condition_layout.addWidget(operator_combo)
              
             # 值输入框
             value_edit = QLineEdit()
             condition_layout.addWidget(value_edit)
              
+            # 显示当前已生效的条件
+            if condition is not None:
+                col_combo.setCurrentIndex(condition.col)
+                operator_combo.setCurrentText(condition.operator)
+                value_edit.setText(condition.value)
+             
             # 删除按钮
             delete_btn = QPushButton("删除")
             delete_btn.clicked.connect(lambda: remove_condition(condition_widget))
@@ -756,12 +1759,14 @@ class DataAnalysisPlatform(QMainWindow):
             widget.deleteLater()
             condition_widgets[:] = [cw for cw in condition_widgets if cw["widget"] != widget]
          
-        # 添加初始条件
-        add_condition()
+        # 添加初始条件，已有筛选时显示当前条件
+        current = self.store.filter
+        for condition in (current.conditions() if current is not None else [None]):
+            add_condition(condition)
          
         # 添加条件按钮
         add_btn = QPushButton("添加条件")
-        add_btn.clicked.connect(add_condition)
+        add_btn.clicked.connect(lambda: add_condition())
         condition_group_layout.addWidget(add_btn)
          
         condition_group.setLayout(condition_group_layout)
@@ -771,7 +1776,8 @@ class DataAnalysisPlatform(QMainWindow):
         logic_group = QGroupBox("逻辑组合")
         logic_layout = QVBoxLayout()
         logic_combo = QComboBox()
-        logic_combo.addItems(["AND", "OR"])
+        logic_combo.addItems(LOGICS)
+        logic_combo.setCurrentText(getattr(current, "logic", "AND"))
         logic_layout.addWidget(logic_combo)
         logic_group.setLayout(logic_layout)
         scroll_layout.addWidget(logic_group)
@@ -792,80 +1798,23 @@ class DataAnalysisPlatform(QMainWindow):
             # 获取筛选条件并执行筛选
             self.status_bar.showMessage("正在筛选数据...")
              
-            # 获取当前表格数据
-            data = []
-            for row in range(self.table_widget.rowCount()):
-                row_data = []
-                for col in range(self.table_widget.columnCount()):
-                    item = self.table_widget.item(row, col)
-                    row_data.append(item.text() if item else "")
-                data.append(row_data)
-             
-            # 转换为DataFrame以便筛选
-            headers = [self.table_widget.horizontalHeaderItem(col).text() 
-                      for col in range(self.table_widget.columnCount())]
-            df = pd.DataFrame(data, columns=headers)
-             
             # 获取筛选条件
-            masks = []
             logic = logic_combo.currentText()
-             
+            conditions = []
             for condition in condition_widgets:
-                col_name = condition["col_combo"].currentText()
+                col = condition["col_combo"].currentIndex()
                 operator = condition["operator_combo"].currentText()
                 value = condition["value_edit"].text()
-                 
-                # 构建筛选条件
-                if operator == "=":
-                    mask = df[col_name] == value
-                elif operator == ">":
-                    mask = df[col_name] > value
-                elif operator == "<":
-                    mask = df[col_name] < value
-                elif operator == "<=":
-                    mask = df[col_name] <= value
-                elif operator == ">=":
-                    mask = df[col_name] >= value
-                elif operator == "!=":
-                    mask = df[col_name] != value
-                elif operator == "包含":
-                    mask = df[col_name].str.contains(value, na=False)
-                elif operator == "不包含":
-                    mask = ~df[col_name].str.contains(value, na=False)
-                elif operator == "开头为":
-                    mask = df[col_name].str.startswith(value, na=False)
-                elif operator == "结尾为":
-                    mask = df[col_name].str.endswith(value, na=False)
-                elif operator == "为空":
-                    mask = df[col_name].isna() | (df[col_name] == "")
-                elif operator == "不为空":
-                    mask = ~df[col_name].isna() & (df[col_name] != "")
-                 
-                masks.append(mask)
-             
-            # 组合筛选条件
-            if masks:
-                combined_mask = masks[0]
-                for mask in masks[1:]:
-                    if logic == "AND":
-                        combined_mask &= mask
-                    else:
-                        combined_mask |= mask
-                 
-                filtered_df = df[combined_mask]
-            else:
-                filtered_df = df.copy()
+                conditions.append((col, operator, value))
              
-            # 更新表格显示
-            self.table_widget.setRowCount(len(filtered_df))
-            for row in range(len(filtered_df)):
-                for col in range(len(filtered_df.columns)):
-                    self.table_widget.setItem(row, col, 
-                        QTableWidgetItem(str(filtered_df.iloc[row, col])))
+            # 编译为表达式树，在后端数据上按列类型计算掩码，表格只显示满足条件的行
+            started = time.perf_counter()
+            self._run_step(self._filter_step(conditions, logic))
+            self.model.refresh()
              
             self.status_bar.showMessage(
-                f"已筛选出{len(filtered_df)}条记录 (共{len(df)}条)" +
-                f" | 使用{len(condition_widgets)}个条件{logic}组合"
+                f"已筛选出{self.store.row_count()}条记录 (共{self.store.total_row_count()}条)" +
+                f" | 使用{len(conditions)}个条件{logic}组合 | 用时 {time.perf_counter() - started:.2f} 秒"
             )
         else:
             self.status_bar.showMessage("筛选已取消")
@@ -882,16 +1831,17 @@ class DataAnalysisPlatform(QMainWindow):
         """
         from PyQt6.QtWidgets import QInputDialog  # 输入对话框组件
          
+        # 加载期间或分页浏览模式下不修改数据
+        if not self._check_in_memory():
+            return
+         
         # 检查表格是否有数据
-        if self.table_widget.rowCount() == 0 or self.table_widget.columnCount() == 0:
+        if self.store.row_count() == 0 or self.store.column_count() == 0:
             self.status_bar.showMessage("表格中没有数据可清洗")
             return
              
         # 获取所有列名作为选项
-        columns = []
-        for col in range(self.table_widget.columnCount()):
-            header = self.table_widget.horizontalHeaderItem(col)
-            columns.append(header.text() if header else f"Column{col+1}")
+        columns = self.store.column_names()
              
         # 弹出对话框让用户选择清洗列
         column, ok = QInputDialog.getItem(
@@ -907,9 +1857,6 @@ class DataAnalysisPlatform(QMainWindow):
         if not ok:
             return
              
-        # 获取列索引
-        col_index = columns.index(column)
-         
         # 弹出对话框让用户选择清洗方式
         methods = ["删除空值行", "填充默认值", "删除重复行"]
         method, ok = QInputDialog.getItem(
@@ -929,25 +1876,11 @@ class DataAnalysisPlatform(QMainWindow):
         try:
             if method == "删除空值行":
                 # 删除空值行逻辑
-                rows_to_keep = []
-                for row in range(self.table_widget.rowCount()):
-                    item = self.table_widget.item(row, col_index)
-                    if item and item.text().strip():  # 检查单元格是否有值
-                        rows_to_keep.append(row)
-                 
-                # 创建新表格数据
-                new_data = []
-                for row in rows_to_keep:
-                    row_data = []
-                    for col in range(self.table_widget.columnCount()):
-                        item = self.table_widget.item(row, col)
-                        row_data.append(item.text() if item else "")
-                    new_data.append(row_data)
+                started = time.perf_counter()
+                removed = self._run_step({"op": "drop_empty_rows", "column": column})
+                self.model.refresh()
                  
-                # 更新表格
-                self._update_table_with_data(new_data)
-                 
-                self.status_bar.showMessage(f"已删除{self.table_widget.rowCount() - len(rows_to_keep)}条空值行")
+                self.status_bar.showMessage(f"已删除{removed}条空值行，用时 {time.perf_counter() - started:.2f} 秒")
                  
             elif method == "填充默认值":
                 # 填充默认值逻辑
@@ -958,243 +1891,429 @@ class DataAnalysisPlatform(QMainWindow):
                 )
                  
                 if ok:
-                    for row in range(self.table_widget.rowCount()):
-                        item = self.table_widget.item(row, col_index)
-                        if not item or not item.text().strip():
-                            self.table_widget.setItem(row, col_index, QTableWidgetItem(default_value))
+                    filled = self._run_step({"op": "fill_empty", "column": column, "value": default_value})
+                    self.model.refresh()
                      
-                    self.status_bar.showMessage(f"已将{column}列的空值填充为: {default_value}")
+                    self.status_bar.showMessage(f"已将{column}列的{filled}个空值填充为: {default_value}")
                  
             elif method == "删除重复行":
                 # 删除重复行逻辑
-                unique_values = set()
-                rows_to_keep = []
-                 
-                for row in range(self.table_widget.rowCount()):
-                    item = self.table_widget.item(row, col_index)
-                    value = item.text() if item else ""
-                    if value not in unique_values:
-                        unique_values.add(value)
-                        rows_to_keep.append(row)
-                 
-                # 创建新表格数据
-                new_data = []
-                for row in rows_to_keep:
-                    row_data = []
-                    for col in range(self.table_widget.columnCount()):
-                        item = self.table_widget.item(row, col)
-                        row_data.append(item.text() if item else "")
-                    new_data.append(row_data)
+                started = time.perf_counter()
+                removed = self._run_step({"op": "drop_duplicates", "column": column})
+                self.model.refresh()
                  
-                # 更新表格
-                self._update_table_with_data(new_data)
-                 
-                self.status_bar.showMessage(f"已删除{self.table_widget.rowCount() - len(rows_to_keep)}条重复行")
+                self.status_bar.showMessage(f"已删除{removed}条重复行，用时 {time.perf_counter() - started:.2f} 秒")
                  
         except Exception as e:
             self.status_bar.showMessage(f"数据清洗失败: {str(e)}")
              
-    def _update_table_with_data(self, data):
+    def _visualize_data(self):
         """
-        用新数据更新表格
+        数据可视化功能
          
-        参数:
-            data: list - 二维列表，包含表格数据
+        功能: 打开可停靠的图表面板并绘制当前选中列，在面板中切换列和图表类型；
+              画布与图形持续使用，数据修改、排序或筛选后自动更新，没有变化时不重绘；
+              数据点较多时先降采样再绘制，保留全列的最小值和最大值，并显示绘制点数与实际点数
+        参数: 无
         返回值: 无
         """
-        # 清空表格内容
-        self.table_widget.clearContents()
+        from PyQt6.QtWidgets import QDockWidget  # 可停靠面板
+        from chart_panel import ChartPanel  # 图表面板，首次可视化时才导入matplotlib
          
-        # 设置新行数
-        self.table_widget.setRowCount(len(data))
+        # 加载期间或分页浏览模式下不可用
+        if not self._check_in_memory():
+            return
          
-        # 填充新数据
-        for row in range(len(data)):
-            for col in range(len(data[row])):
-                item = QTableWidgetItem(data[row][col])
-                self.table_widget.setItem(row, col, item)
-                 
-    def _visualize_data(self):
+        # 检查表格是否有数据
+        if self.store.row_count() == 0 or self.store.column_count() == 0:
+            self.status_bar.showMessage("表格中没有数据可可视化")
+            return
+             
+        if self.chart_dock is None:
+            self.chart_dock = QDockWidget("图表", self)
+            self.chart_dock.setObjectName("chart_dock")
+            self.chart_panel = ChartPanel(self.chart_dock)
+            self.chart_panel.set_store(self.store)
+            self.chart_panel.rendered.connect(self.status_bar.showMessage)
+            self.chart_dock.setWidget(self.chart_panel)
+            self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.chart_dock)
+            # 数据或列变化后刷新图表，面板重新显示时补上隐藏期间的变化
+            self.model.modelReset.connect(self.chart_panel.update_columns)
+            self.model.headerDataChanged.connect(self.chart_panel.update_columns)
+            self.model.dataChanged.connect(self.chart_panel.schedule_refresh)
+            self.model.rowsInserted.connect(self.chart_panel.schedule_refresh)
+            self.model.rowsRemoved.connect(self.chart_panel.schedule_refresh)
+            self.model.columnsInserted.connect(self.chart_panel.update_columns)
+            self.model.columnsRemoved.connect(self.chart_panel.update_columns)
+            self.chart_dock.visibilityChanged.connect(self.chart_panel.schedule_refresh)
+             
+        # 默认绘制表格中当前选中的列
+        self.chart_dock.show()
+        self.chart_dock.raise_()
+        col = self.table_widget.currentIndex().column()
+        self.chart_panel.show_column(self.store.column_names()[col] if col >= 0 else None)
+         
+    def _data_analysis(self):
         """
-        数据可视化功能
+        数据分析功能
          
-        功能: 对表格数据进行可视化展示，支持多种图表类型
+        功能: 在后台线程中计算各数值列的个数、平均值、标准差、最小值、分位数和最大值，
+              结果显示在可停靠的统计面板中；分页浏览模式下按块统计，不计算分位数；
+              开启近似统计时用草图估计分位数、不同值个数和高频值，内存占用与行数无关
         参数: 无
         返回值: 无
         """
-        from PyQt6.QtWidgets import QInputDialog, QMessageBox  # 输入对话框和消息框组件
+        # 后台任务进行中不统计
+        if self._is_loading():
+            return
          
         # 检查表格是否有数据
-        if self.table_widget.rowCount() == 0 or self.table_widget.columnCount() == 0:
-            self.status_bar.showMessage("表格中没有数据可可视化")
+        if self.store.row_count() == 0 or self.store.column_count() == 0:
+            self.status_bar.showMessage("表格中没有数据可分析")
             return
              
-        # 获取所有列名作为选项
-        columns = []
-        for col in range(self.table_widget.columnCount()):
-            header = self.table_widget.horizontalHeaderItem(col)
-            columns.append(header.text() if header else f"Column{col+1}")
-             
-        # 弹出对话框让用户选择可视化列
-        column, ok = QInputDialog.getItem(
-            self,
-            "选择可视化列",  # 对话框标题
-            "请选择要可视化的列:",  # 提示文本
-            columns,  # 选项列表
-            0,  # 默认选中第一项
-            False  # 不允许编辑
+        # 启动后台统计线程，统计期间与保存一样不能修改数据
+        self._load_started = time.perf_counter()
+        self._loader = StatsWorker(self.store, self.approx_action.isChecked(), self)
+        self.model.locked = True
+        self._loader.progress.connect(self._on_stats_progress)
+        self._loader.stats_ready.connect(self._on_stats_ready)
+        self._loader.failed.connect(self._on_stats_failed)
+        self._loader.finished.connect(self._loader.deleteLater)
+        self.cancel_load_button.setText("取消统计")
+        self.cancel_load_button.show()
+        self.status_bar.showMessage("正在统计...")
+        self._loader.start()
+         
+    def _on_stats_progress(self, done):
+        """在状态栏显示统计进度"""
+        if self.store.read_only or self.approx_action.isChecked():
+            total = max(self.store.row_count(), 1)
+            self.status_bar.showMessage(f"正在按块统计: 已统计 {done:,} 行 ({min(done / total, 1):.0%})")
+        else:
+            self.status_bar.showMessage(f"正在统计: 第 {done} / {self.store.column_count()} 列")
+         
+    def _on_stats_ready(self, summary, mode):
+        """后台统计结束，在统计面板中显示结果"""
+        self._loader = None
+        self.model.locked = False
+        self.cancel_load_button.hide()
+        self.cancel_load_button.setText("取消加载")
+        if summary is None:
+            self.status_bar.showMessage("已取消统计")
+            return
+        if summary.empty:
+            self.status_bar.showMessage("没有找到可分析的数值数据")
+            return
+        self._show_stats(summary, mode)
+        elapsed = time.perf_counter() - self._load_started
+        self.status_bar.showMessage(
+            f"已完成基础统计分析 ({len(summary)} 列, {self.store.row_count():,} 行, {mode}, 用时 {elapsed:.2f} 秒)"
         )
          
-        # 如果用户取消了选择
-        if not ok:
-            return
-             
-        # 获取列索引
-        col_index = columns.index(column)
+    def _on_stats_failed(self, message):
+        """后台统计出错"""
+        self._loader = None
+        self.model.locked = False
+        self.cancel_load_button.hide()
+        self.cancel_load_button.setText("取消加载")
+        self.status_bar.showMessage(f"数据分析失败: {message}")
          
-        # 弹出对话框让用户选择图表类型
-        chart_types = ["柱状图", "折线图", "饼图", "箱线图", "散点图"]
-        chart_type, ok = QInputDialog.getItem(
-            self,
-            "选择图表类型",
-            "请选择图表类型:",
-            chart_types,
-            0,
-            False
-        )
+    def _show_stats(self, summary, mode):
+        """
+        在可停靠的统计面板中显示统计结果，面板首次使用时创建
          
-        # 如果用户取消了选择
-        if not ok:
-            return
-             
-        # 收集列数据
-        numeric_data = []
-        labels = []
-        for row in range(self.table_widget.rowCount()):
-            item = self.table_widget.item(row, col_index)
-            if item and item.text().strip():  # 只处理有值的单元格
-                try:
-                    # 尝试转换为数值
-                    value = float(item.text())
-                    numeric_data.append(value)
-                    labels.append(str(row+1))  # 使用行号作为标签
-                except ValueError:
-                    # 非数值数据跳过
-                    pass
+        参数:
+            summary: pd.DataFrame - 每列一行的统计结果
+            mode: str - 统计方式说明，显示在面板标题中
+        返回值: 无
+        """
+        from PyQt6.QtWidgets import QDockWidget  # 可停靠面板
+        from data_store import DataStore  # 列式数据存储
+         
+        if self.stats_dock is None:
+            self.stats_dock = QDockWidget("基础统计结果", self)
+            self.stats_dock.setObjectName("stats_dock")
+            self.stats_table = QTableView(self.stats_dock)
+            self.stats_table.setModel(DataFrameModel(DataStore(), self.stats_table))
+            self.stats_table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+            self.stats_dock.setWidget(self.stats_table)
+            self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.stats_dock)
+         
+        store = DataStore()
+        store.set_frame(summary.round(4))
+        self.stats_table.model().set_store(store)
+        self.stats_table.resizeColumnsToContents()
+        self.stats_dock.setWindowTitle(f"基础统计结果 ({mode})")
+        self.stats_dock.show()
+        self.stats_dock.raise_()
          
-        # 如果没有有效数据
-        if not numeric_data:
-            self.status_bar.showMessage(f"{column}列没有可可视化的数值数据")
-            return
-             
-        # 执行可视化
-        try:
-            plt.figure(figsize=(8, 6))  # 设置图表大小
-             
-            if chart_type == "柱状图":
-                # 创建柱状图
-                plt.bar(labels, numeric_data)
-                plt.title(f"{column}列柱状图")  # 设置标题
-                plt.xlabel("行号")  # X轴标签
-                plt.ylabel("数值")  # Y轴标签
-                 
-            elif chart_type == "折线图":
-                # 创建折线图
-                plt.plot(labels, numeric_data, marker='o')
-                plt.title(f"{column}列折线图")
-                plt.xlabel("行号")
-                plt.ylabel("数值")
-                 
-            elif chart_type == "饼图":
-                # 创建饼图
-                plt.pie(numeric_data, labels=labels, autopct='%1.1f%%')
-                plt.title(f"{column}列饼图")
-                 
-            elif chart_type == "箱线图":
-                # 创建箱线图
-                sns.boxplot(data=numeric_data)
-                plt.title(f"{column}列箱线图")
-                plt.ylabel("数值")
-                 
-            elif chart_type == "散点图":
-                # 创建散点图
-                plt.scatter(range(len(numeric_data)), numeric_data)
-                plt.title(f"{column}列散点图")
-                plt.xlabel("索引")
-                plt.ylabel("数值")
-                 
-            plt.tight_layout()  # 自动调整子图参数
-            plt.show()  # 显示图表
-             
-            self.status_bar.showMessage(f"已生成{column}列的{chart_type}")
-             
-        except Exception as e:
-            self.status_bar.showMessage(f"数据可视化失败: {str(e)}")
-             
-    def _data_analysis(self):
+    # except Exception as e:
+    #     self.status_bar.showMessage(f"数据分析失败: {str(e)}")
+     
+    def _group_summary(self):
         """
-        数据分析功能
+        分组汇总功能
          
-        功能: 对表格数据进行基础统计分析
+        功能: 选择分组列、透视列、汇总列与汇总方式(求和/平均值/计数/最小值/最大值/不同值个数)，
+              在后台线程中按块做哈希分组汇总，结果显示在新的标签页中；按当前视图(排序、筛选后)的行汇总，
+              分页浏览的大文件也可以汇总
         参数: 无
         返回值: 无
         """
-        from PyQt6.QtWidgets import QMessageBox  # 消息框组件
-        import numpy as np  # 数值计算库
+        from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem,
+                                  QComboBox, QCheckBox, QGroupBox, QDialogButtonBox)
+        from group_aggregate import AGGREGATIONS  # 汇总方式
+         
+        if self._is_loading():
+            return
          
         # 检查表格是否有数据
-        if self.table_widget.rowCount() == 0 or self.table_widget.columnCount() == 0:
-            self.status_bar.showMessage("表格中没有数据可分析")
+        if self.store.row_count() == 0 or self.store.column_count() == 0:
+            self.status_bar.showMessage("表格中没有数据可汇总")
             return
              
-        # 基础统计分析
-        try:
-            stats = []
-            for col in range(self.table_widget.columnCount()):
-                data = []
-                for row in range(self.table_widget.rowCount()):
-                    item = self.table_widget.item(row, col)
-                    if item and item.text().strip():  # 只处理有值的单元格
-                        try:
-                            value = float(item.text())
-                            data.append(value)
-                        except ValueError:
-                            pass
-                 
-                if data:
-                    header = self.table_widget.horizontalHeaderItem(col)
-                    col_name = header.text() if header else f"Column{col+1}"
-                     
-                    # 计算统计量
-                    stats.append(f"{col_name}列统计结果:")
-                    stats.append(f"-----------------")
-                    stats.append(f"数据个数: {len(data)}")
-                    stats.append(f"平均值: {np.mean(data):.2f}")
-                    stats.append(f"标准差: {np.std(data):.2f}")
-                    stats.append(f"最小值: {min(data):.2f}")
-                    stats.append(f"25%分位数: {np.percentile(data, 25):.2f}")
-                    stats.append(f"中位数: {np.median(data):.2f}")
-                    stats.append(f"75%分位数: {np.percentile(data, 75):.2f}")
-                    stats.append(f"最大值: {max(data):.2f}")
-                    stats.append("")
+        columns = self.store.column_names()
+        df = getattr(self.store, "df", None)  # 分页浏览模式下没有完整数据，不显示类型
+        labels = [f"{name} ({df.iloc[:, i].dtype})" if df is not None else name
+                  for i, name in enumerate(columns)]
+         
+        # 创建汇总对话框
+        dialog = QDialog(self)
+        dialog.setWindowTitle("分组汇总")
+        dialog.resize(700, 500)
+        layout = QVBoxLayout()
+        body = QHBoxLayout()
+         
+        def column_group(title, checked_col=None):
+            """创建可勾选的列列表"""
+            group = QGroupBox(title)
+            group_layout = QVBoxLayout()
+            column_list = QListWidget()
+            for i, label in enumerate(labels):
+                item = QListWidgetItem(label)
+                item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+                item.setCheckState(Qt.CheckState.Checked if i == checked_col else Qt.CheckState.Unchecked)
+                column_list.addItem(item)
+            group_layout.addWidget(column_list)
+            group.setLayout(group_layout)
+            body.addWidget(group)
+            return column_list
+         
+        # 分组列默认为当前选中的列
+        current = self.table_widget.currentIndex().column()
+        key_list = column_group("分组列", current if current >= 0 else 0)
+        value_list = column_group("汇总列")
+         
+        # 透视列与汇总方式
+        options = QVBoxLayout()
+        options.addWidget(QLabel("透视列(展开为列):"))
+        pivot_combo = QComboBox()
+        pivot_combo.addItem("(不透视)")
+        pivot_combo.addItems(columns)
+        options.addWidget(pivot_combo)
+        aggregation_group = QGroupBox("汇总方式")
+        aggregation_layout = QVBoxLayout()
+        aggregation_checks = []
+        for name in AGGREGATIONS:
+            check = QCheckBox(name)
+            check.setChecked(name == "求和")
+            aggregation_layout.addWidget(check)
+            aggregation_checks.append(check)
+        aggregation_group.setLayout(aggregation_layout)
+        options.addWidget(aggregation_group)
+        options.addWidget(QLabel("不选汇总列时统计每组的行数"))
+        options.addStretch()
+        body.addLayout(options)
+        layout.addLayout(body)
+         
+        # 添加确定/取消按钮
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok |
+                                 QDialogButtonBox.StandardButton.Cancel)
+        buttons.rejected.connect(dialog.reject)
+        layout.addWidget(buttons)
+        dialog.setLayout(layout)
+         
+        def checked(column_list):
+            """返回勾选的列名"""
+            return [name for i, name in enumerate(columns)
+                    if column_list.item(i).checkState() == Qt.CheckState.Checked]
+         
+        def accept():
+            """检查选择是否有效"""
+            keys, values = checked(key_list), checked(value_list)
+            pivot = pivot_combo.currentIndex() - 1
+            if not keys and pivot < 0:
+                QMessageBox.warning(dialog, "提示", "请至少选择一个分组列或透视列")
+                return
+            if set(keys) & set(values) or (pivot >= 0 and columns[pivot] in keys + values):
+                QMessageBox.warning(dialog, "提示", "同一列不能同时作为分组列、透视列或汇总列")
+                return
+            if values and not any(check.isChecked() for check in aggregation_checks):
+                QMessageBox.warning(dialog, "提示", "请至少选择一种汇总方式")
+                return
+            dialog.accept()
+         
+        buttons.accepted.connect(accept)
+         
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        keys, values = checked(key_list), checked(value_list)
+        pivot = pivot_combo.currentIndex() - 1
+        if pivot >= 0:
+            keys.append(columns[pivot])
+        aggregations = [check.text() for check in aggregation_checks if check.isChecked()] if values else []
+         
+        # 启动后台汇总线程，汇总期间与统计一样不能修改数据
+        title = "按" + "、".join(keys[:-1] if pivot >= 0 else keys) + "汇总"
+        if pivot >= 0:
+            title = (title if len(keys) > 1 else "汇总") + f" × {columns[pivot]}"
+        self._load_started = time.perf_counter()
+        self._loader = GroupWorker(self.store, keys, values, aggregations, pivot >= 0, title, self)
+        self.model.locked = True
+        self._loader.progress.connect(self._on_group_progress)
+        self._loader.result_ready.connect(self._on_group_ready)
+        self._loader.failed.connect(self._on_group_failed)
+        self._loader.finished.connect(self._loader.deleteLater)
+        self.cancel_load_button.setText("取消汇总")
+        self.cancel_load_button.show()
+        self.status_bar.showMessage("正在分组汇总...")
+        self._loader.start()
+         
+    def _on_group_progress(self, done):
+        """在状态栏显示汇总进度"""
+        total = max(self.store.row_count(), 1)
+        self.status_bar.showMessage(f"正在分组汇总: 已汇总 {done:,} 行 ({min(done / total, 1):.0%})")
+         
+    def _on_group_ready(self, result, title):
+        """后台汇总结束，在标题为title的新标签页中显示结果"""
+        self._loader = None
+        self.model.locked = False
+        self.cancel_load_button.hide()
+        self.cancel_load_button.setText("取消加载")
+        if result is None:
+            self.status_bar.showMessage("已取消分组汇总")
+            return
+        self._show_group_result(result, title)
+        elapsed = time.perf_counter() - self._load_started
+        self.status_bar.showMessage(
+            f"已完成分组汇总 ({len(result):,} 组, {self.store.row_count():,} 行, 用时 {elapsed:.2f} 秒)"
+        )
+         
+    def _on_group_failed(self, message):
+        """后台汇总出错"""
+        self._loader = None
+        self.model.locked = False
+        self.cancel_load_button.hide()
+        self.cancel_load_button.setText("取消加载")
+        self.status_bar.showMessage(f"分组汇总失败: {message}")
+         
+    def _show_group_result(self, result, title):
+        """
+        在新的标签页中显示汇总结果
+         
+        参数:
+            result: pd.DataFrame - 汇总结果
+            title: str - 标签页标题
+        返回值: 无
+        """
+        from data_store import DataStore  # 列式数据存储
+         
+        store = DataStore()
+        store.set_frame(result)
+        view = QTableView()
+        view.setModel(DataFrameModel(store, view))
+        view.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        view.resizeColumnsToContents()
+        index = self.tabs.addTab(view, title)
+        self.tabs.setCurrentIndex(index)
+         
+    def _close_tab(self, index):
+        """关闭结果标签页，数据表格页不能关闭"""
+        if index > 0:
+            widget = self.tabs.widget(index)
+            self.tabs.removeTab(index)
+            widget.deleteLater()
+         
+    def _show_memory_usage(self):
+        """显示各列类型与内存占用"""
+        if not self._check_in_memory():
+            return
+        if self.store.column_count() == 0:
+            self.status_bar.showMessage("表格中没有数据")
+            return
              
-            # 显示统计结果
-            if stats:
-                QMessageBox.information(
-                    self,
-                    "基础统计结果",
-                    "\n".join(stats)
-                )
-                self.status_bar.showMessage("已完成基础统计分析")
-            else:
-                self.status_bar.showMessage("没有找到可分析的数值数据")
-                 
-        except Exception as e:
-            self.status_bar.showMessage(f"数据分析失败: {str(e)}")
+        report = self.store.memory_report()
+        lines = [f"{name} ({dtype}): {size / 1024 / 1024:.2f} MB"
+                 for name, dtype, size in zip(report["列名"], report["类型"], report["内存(字节)"])]
+        total = report["内存(字节)"].sum() / 1024 / 1024
+        lines.append("")
+        lines.append(f"合计: {total:.2f} MB")
+        QMessageBox.information(self, "列内存占用", "\n".join(lines))
+        self.status_bar.showMessage(f"数据共占用内存 {total:.2f} MB")
+         
+    def finish_startup(self, shown_at):
+        """
+        主窗口显示后导入数据处理模块并创建后端数据
+         
+        各模块依次导入并分别计时，与窗口显示前的各阶段一起组成启动耗时报告
+         
+        参数:
+            shown_at: float - 主窗口显示完成的时刻(time.perf_counter)
+        返回值: 无
+        """
+        import importlib  # 按名称导入模块
+         
+        self.startup_times = [
+            ("导入PyQt6", (_QT_IMPORTED_AT - _STARTED_AT) * 1000),
+            ("创建并显示主窗口", (shown_at - _QT_IMPORTED_AT) * 1000),
+        ]
+        for name in BACKEND_MODULES:
+            start = time.perf_counter()
+            importlib.import_module(name)
+            self.startup_times.append((f"导入{name}", (time.perf_counter() - start) * 1000))
+         
+        start = time.perf_counter()
+        from data_store import DataStore  # 列式数据存储
+        from data_cache import FileCache  # 列式二进制缓存
+        from filter_engine import OPERATORS  # 筛选运算符
+        from undo_history import UNDO_MAX_BYTES  # 撤销历史大小上限
+        from pipeline import Pipeline  # 可重放的处理流水线
+        self.store = DataStore()
+        self.store.use_indexes = self.index_action.isChecked()
+        self.cache = FileCache()  # 重复打开同一文件时直接读取缓存
+        self.undo_max_bytes = UNDO_MAX_BYTES  # 新数据的撤销历史大小上限
+        self.pipeline = Pipeline()  # 记录当前文件上执行的排序、筛选与清洗
+        self.filter_bar_operator.addItems(OPERATORS)
+        self.filter_bar_operator.setCurrentText("包含")
+        self.model.set_store(self.store)
+        self.startup_times.append(("创建后端数据", (time.perf_counter() - start) * 1000))
+         
+        shown = (shown_at - _STARTED_AT) * 1000
+        ready = (time.perf_counter() - _STARTED_AT) * 1000
+        over = "" if shown <= STARTUP_BUDGET_MS else "，超出目标"
+        self.status_bar.showMessage(f"就绪 (主窗口 {shown:.0f} ms 显示，目标 {STARTUP_BUDGET_MS} ms{over}；"
+                                    f"{ready:.0f} ms 后可以打开文件)")
+         
+    def startup_report(self):
+        """
+        生成启动耗时报告
+         
+        返回值: str - 各阶段耗时与主窗口显示耗时
+        """
+        lines = [f"{name}: {ms:.0f} ms" for name, ms in self.startup_times]
+        shown = sum(ms for name, ms in self.startup_times[:2])
+        total = sum(ms for name, ms in self.startup_times)
+        lines.append("")
+        lines.append(f"主窗口显示: {shown:.0f} ms (目标 {STARTUP_BUDGET_MS} ms"
+                     + ("" if shown <= STARTUP_BUDGET_MS else "，超出目标") + ")")
+        lines.append(f"全部就绪: {total:.0f} ms")
+        return "\n".join(lines)
+         
+    def _show_startup_report(self):
+        """显示启动耗时报告"""
+        QMessageBox.information(self, "启动耗时", self.startup_report())
          
-    # except Exception as e:
-    #     self.status_bar.showMessage(f"数据分析失败: {str(e)}")
-     
     def _show_about(self):
         """显示关于信息"""
         self.status_bar.showMessage("关于功能待实现")
@@ -1204,9 +2323,16 @@ if __name__ == "__main__":
     """程序入口"""
     app = QApplication(sys.argv)
      
-    # 创建主窗口
+    # 创建主窗口，先画出窗口再导入数据处理模块
     window = DataAnalysisPlatform()
     window.show()
+    app.processEvents()
+    window.finish_startup(time.perf_counter())
+     
+    # --startup-report: 输出启动耗时报告后退出，用于测量冷启动
+    if "--startup-report" in sys.argv:
+        print(window.startup_report())
+        sys.exit(0)
      
     # 运行应用
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,236 @@
+"""
+概要数据结构(草图)模块
+用固定大小的内存近似统计任意多行数据：KLL草图估计分位数，HyperLogLog估计不同值个数，
+Space-Saving找出高频值；三者都按块批量更新，并且可以合并，分块或多进程统计的结果合并后误差不变
+"""
+
+import numpy as np  # 数值计算库
+import pandas as pd  # 数据处理库
+
+KLL_K = 200  # KLL草图最高层容量，分位数的排名误差约为 1.7/KLL_K
+HLL_PRECISION = 12  # HyperLogLog寄存器数为2^12，相对误差约为 1.04/sqrt(4096) ≈ 1.6%
+TOP_K = 20  # Space-Saving保留的计数器个数
+
+
+class KllSketch:
+    """
+    分位数草图(Karnin-Lang-Liberty)
+
+    第h层的每个元素代表2^h个原始值；某层超过容量时排序后随机保留奇数位或偶数位的元素，
+    升入上一层，越低的层容量越小(按2/3递减)，总元素个数约为3k
+
+    属性:
+        k: int - 最高层容量
+        count: int - 已加入的数值个数
+    """
+
+    def __init__(self, k=KLL_K, seed=None):
+        """初始化空的草图"""
+        self.k = k
+        self.count = 0
+        self._levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        """
+        加入一批数值
+
+        参数:
+            values: np.ndarray - 浮点数组，NaN被忽略
+        返回值: 无
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self.count += len(values)
+        self._compress()
+
+    def merge(self, other):
+        """合并另一个草图，合并后等价于对两部分数据一起建立的草图"""
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for level, items in enumerate(other._levels):
+            self._levels[level] = np.concatenate([self._levels[level], items])
+        self.count += other.count
+        self._compress()
+
+    def quantiles(self, qs):
+        """
+        估计分位数
+
+        参数:
+            qs: list - 0到1之间的分位点
+        返回值: np.ndarray - 各分位点的估计值，草图为空时为NaN
+        """
+        if self.count == 0:
+            return np.full(len(qs), np.nan)
+        items = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self._levels)])
+        order = np.argsort(items, kind="stable")
+        items, cumulative = items[order], np.cumsum(weights[order])
+        ranks = np.asarray(qs, dtype=float) * cumulative[-1]
+        return items[np.minimum(np.searchsorted(cumulative, ranks, side="left"), len(items) - 1)]
+
+    def nbytes(self):
+        """草图占用的字节数"""
+        return sum(items.nbytes for items in self._levels)
+
+    def _capacity(self, level):
+        """返回指定层的容量"""
+        depth = len(self._levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self):
+        """从最低层开始压缩超过容量的层"""
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if len(items) > self._capacity(level):
+                grown = level + 1 == len(self._levels)
+                if grown:
+                    self._levels.append(np.empty(0))
+                items = np.sort(items)
+                # 元素个数为奇数时留下最大的一个，其余两两保留一个
+                rest = items[len(items) - len(items) % 2:]
+                offset = int(self._rng.integers(2))
+                promoted = items[offset:len(items) - len(items) % 2:2]
+                self._levels[level] = rest
+                self._levels[level + 1] = np.concatenate([self._levels[level + 1], promoted])
+                # 增加一层后下面各层的容量变小，从头检查
+                level = 0 if grown else level + 1
+            else:
+                level += 1
+
+
+class HyperLogLog:
+    """
+    不同值个数草图
+
+    每个值的64位哈希值的前p位选择寄存器，其余位中首个1的位置决定寄存器的值；
+    寄存器按最大值合并，所以两个草图合并等价于对两部分数据一起统计
+
+    属性:
+        precision: int - 寄存器个数的以2为底的对数
+        registers: np.ndarray - 寄存器
+    """
+
+    def __init__(self, precision=HLL_PRECISION):
+        """初始化空的草图"""
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, series):
+        """
+        加入一列数据，空值被忽略
+
+        参数:
+            series: pd.Series - 数据列
+        返回值: 无
+        """
+        series = series.dropna()
+        if len(series) == 0:
+            return
+        # 数值统一按浮点数计算哈希值，分块读取时同一列可能时而为整数时而为浮点数
+        if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            series = series.astype(float)
+        self.update_hashes(pd.util.hash_pandas_object(series, index=False).to_numpy())
+
+    def update_hashes(self, hashes):
+        """
+        加入一批64位哈希值
+
+        参数:
+            hashes: np.ndarray - uint64数组
+        返回值: 无
+        """
+        bits = 64 - self.precision
+        index = (hashes >> np.uint64(bits)).astype(np.int64)
+        rest = hashes & np.uint64((1 << bits) - 1)
+        # frexp 的指数即二进制位数，剩余位全为0时位数为0
+        _, length = np.frexp(rest.astype(np.float64))
+        rank = (bits - length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        """合并另一个精度相同的草图"""
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        """
+        估计不同值个数
+
+        返回值: int - 估计值，数量较少时按空寄存器个数修正
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        empty = int((self.registers == 0).sum())
+        if estimate <= 2.5 * m and empty:
+            estimate = m * np.log(m / empty)
+        return int(round(estimate))
+
+
+class SpaceSaving:
+    """
+    高频值草图
+
+    最多保留k个值的计数；每块数据先精确计数，再与已有计数合并，只保留计数最大的k个，
+    被丢弃的计数记为下限，任何值的计数高估不超过总个数/k
+
+    属性:
+        k: int - 计数器个数
+        counts: dict - 值 -> 估计次数
+        errors: dict - 值 -> 估计次数可能的高估量
+        floor: int - 未保留的值的次数上限
+    """
+
+    def __init__(self, k=TOP_K):
+        """初始化空的草图"""
+        self.k = k
+        self.counts = {}
+        self.errors = {}
+        self.floor = 0
+
+    def update(self, series):
+        """
+        加入一列数据，空值被忽略
+
+        参数:
+            series: pd.Series - 数据列
+        返回值: 无
+        """
+        counts = series.value_counts(dropna=True, sort=True)
+        chunk = SpaceSaving(self.k)
+        top = counts.iloc[:self.k]
+        chunk.counts = dict(zip(top.index.tolist(), top.to_numpy(dtype=np.int64).tolist()))
+        chunk.errors = dict.fromkeys(chunk.counts, 0)
+        chunk.floor = int(counts.iloc[self.k]) if len(counts) > self.k else 0
+        self.merge(chunk)
+
+    def merge(self, other):
+        """合并另一个草图，两边都没有保留的值按各自的下限计"""
+        counts = {}
+        errors = {}
+        for value in self.counts.keys() | other.counts.keys():
+            counts[value] = self.counts.get(value, self.floor) + other.counts.get(value, other.floor)
+            errors[value] = self.errors.get(value, self.floor) + other.errors.get(value, other.floor)
+        ranked = sorted(counts, key=counts.get, reverse=True)
+        floor = self.floor + other.floor
+        if len(ranked) > self.k:
+            floor = max(floor, counts[ranked[self.k]])
+        self.counts = {value: counts[value] for value in ranked[:self.k]}
+        self.errors = {value: errors[value] for value in ranked[:self.k]}
+        self.floor = floor
+
+    def top(self, n):
+        """
+        返回出现次数最多的值
+
+        参数:
+            n: int - 个数
+        返回值: list - [(值, 估计次数, 可能的高估量), ...]，按估计次数从大到小
+        """
+        ranked = sorted(self.counts, key=self.counts.get, reverse=True)[:n]
+        return [(value, self.counts[value], self.errors[value]) for value in ranked]
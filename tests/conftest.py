@@ -0,0 +1,6 @@
+"""测试配置：把项目根目录加入模块搜索路径"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,79 @@
+"""命令行批处理模块测试"""
+
+import json
+
+import pandas as pd
+import pytest
+
+from batch import build_pipeline, expand_paths, main, parse_args, process_file
+from pipeline import Pipeline
+
+
+def _write(path, frame):
+    """写出测试用CSV"""
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+def test_build_pipeline_from_args(tmp_path):
+    """流水线文件中的步骤在前，命令行选项按固定顺序追加"""
+    saved = tmp_path / "steps.json"
+    Pipeline([{"op": "remove_column", "column": "c"}]).save(str(saved))
+    args = parse_args(["a.csv", "--pipeline", str(saved), "--dedupe", "--filter", "a", ">", "1",
+                       "--sort", "b:desc", "--sort", "a", "--collation", "拼音"])
+    steps = build_pipeline(args).steps
+    assert [step["op"] for step in steps] == ["remove_column", "drop_duplicates", "filter", "sort"]
+    assert steps[2]["conditions"] == [["a", ">", "1"]]
+    assert steps[3] == {"op": "sort", "keys": [["b", False], ["a", True]], "collation": "拼音"}
+
+
+def test_build_pipeline_rejects_unknown_operator():
+    """不支持的筛选运算符报错"""
+    with pytest.raises(ValueError):
+        build_pipeline(parse_args(["a.csv", "--filter", "a", "~", "1"]))
+
+
+def test_process_file_writes_output_and_stats(tmp_path):
+    """单个文件依次处理、统计并保存，返回各阶段用时"""
+    path = _write(tmp_path / "in.csv", pd.DataFrame({"a": [3, 1, 2, 2], "b": ["x", "y", "z", "z"]}))
+    pipeline = Pipeline([{"op": "drop_duplicates", "column": None},
+                         {"op": "sort", "keys": [["a", True]], "collation": None}])
+    result = process_file(path, pipeline.to_dict(), str(tmp_path), "json", "_out", True)
+    assert "error" not in result
+    assert (result["rows_in"], result["rows_out"]) == (4, 3)
+    assert set(result["timings"]) == {"加载", "处理", "统计", "保存", "合计"}
+    with open(result["output"], encoding="utf-8") as f:
+        assert [record["a"] for record in json.load(f)] == [1, 2, 3]
+    assert pd.read_csv(result["stats"], encoding="utf-8-sig").shape[0] == 1
+
+
+def test_process_file_reports_errors(tmp_path):
+    """处理出错时返回错误信息而不是抛出异常"""
+    path = _write(tmp_path / "in.csv", pd.DataFrame({"a": [1]}))
+    pipeline = Pipeline([{"op": "sort", "keys": [["缺失", True]]}])
+    result = process_file(path, pipeline.to_dict(), None, None, "_out", False)
+    assert "缺失" in result["error"]
+    assert "合计" in result["timings"]
+
+
+def test_main_processes_files_in_pool(tmp_path, capsys):
+    """多个文件在进程池中处理，有文件失败时退出码为1"""
+    for name in "ab":
+        _write(tmp_path / f"{name}.csv", pd.DataFrame({"v": [1, 2, None]}))
+    (tmp_path / "bad.csv").write_text("", encoding="utf-8")
+    code = main([str(tmp_path / "*.csv"), "--drop-empty", "--output-dir", str(tmp_path / "out"),
+                 "--workers", "2"])
+    output = capsys.readouterr().out
+    assert code == 1
+    assert "完成 2/3 个文件" in output
+    assert pd.read_csv(tmp_path / "out" / "a_processed.csv", encoding="utf-8-sig")["v"].tolist() == [1.0, 2.0]
+
+
+def test_expand_paths_and_unsupported(tmp_path, capsys):
+    """通配符展开后去重，不支持的格式直接退出"""
+    for name in ("b.csv", "a.csv"):
+        (tmp_path / name).write_text("a\n1\n", encoding="utf-8")
+    pattern = str(tmp_path / "*.csv")
+    assert expand_paths([pattern, str(tmp_path / "a.csv")]) == [str(tmp_path / "a.csv"), str(tmp_path / "b.csv")]
+    assert main([str(tmp_path / "x.txt")]) == 2
+    assert "不支持的文件格式" in capsys.readouterr().err
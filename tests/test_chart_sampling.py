@@ -0,0 +1,61 @@
+"""图表降采样模块测试"""
+
+import numpy as np
+
+from chart_sampling import bin_values, lttb_indices, minmax_indices, top_n
+
+
+def _walk(count=100000, seed=0):
+    """随机游走，带一个尖峰和一个低谷"""
+    values = np.cumsum(np.random.default_rng(seed).normal(size=count))
+    values[12345] = values.max() + 100
+    values[67890] = values.min() - 100
+    return values
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    """LTTB采样保留首尾两点和全列的最小值、最大值，点数约为阈值"""
+    values = _walk()
+    indices = lttb_indices(values, 500)
+    assert indices[0] == 0 and indices[-1] == len(values) - 1
+    assert {12345, 67890} <= set(indices.tolist())
+    assert 500 <= len(indices) <= 502
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_short_input_unchanged():
+    """点数不超过阈值时全部保留"""
+    assert lttb_indices(np.arange(10.0), 20).tolist() == list(range(10))
+
+
+def test_minmax_buckets_keep_extremes():
+    """每段保留最小值和最大值，任一段的取值范围都不丢失"""
+    values = _walk()
+    buckets = 300
+    indices = minmax_indices(values, buckets)
+    assert len(indices) <= 2 * buckets + 2
+    assert {12345, 67890} <= set(indices.tolist())
+    width = -(-len(values) // buckets)
+    sampled = values[indices]
+    for start in range(0, len(values), width):
+        segment = values[start:start + width]
+        inside = sampled[(indices >= start) & (indices < start + width)]
+        assert inside.min() == segment.min() and inside.max() == segment.max()
+
+
+def test_bin_values_summarizes_each_bin():
+    """分箱后每箱的平均值、最小值、最大值与原数据一致"""
+    values = np.arange(1000.0)
+    starts, means, lows, highs = bin_values(values, 10)
+    assert starts.tolist() == list(range(0, 1000, 100))
+    assert means.tolist() == [start + 49.5 for start in range(0, 1000, 100)]
+    assert (lows.tolist(), highs.tolist()) == (starts.tolist(), [start + 99.0 for start in starts])
+    assert len(bin_values(np.arange(5.0), 10)[0]) == 5
+
+
+def test_top_n_merges_rest():
+    """保留最大的n项并按原顺序排列，其余合并为“其他”"""
+    values, labels = top_n(np.array([5, 1, 9, 3, 7]), np.array(list("abcde")), n=2)
+    assert values.tolist() == [9, 7, 9]
+    assert labels == ["c", "e", "其他"]
+    assert top_n([1, 2, 3], ["x", "y", "z"], n=2)[1] == ["x", "y", "z"]
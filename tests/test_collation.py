@@ -0,0 +1,48 @@
+"""中文排序模块测试"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from collation import HAS_ICU, PINYIN_COLLATION, STROKE_COLLATION, collation_codes, range_mask
+
+NAMES = pd.Series(["张三", "李四", None, "王五", "阿大", "赵六", "李四"])
+
+
+def _ordered(series, collation):
+    """按排序编码排列不重复的非空值"""
+    codes, _ = collation_codes(series, collation)
+    valid = codes >= 0
+    values = series[valid].tolist()
+    order = np.argsort(codes[valid], kind="stable")
+    return list(dict.fromkeys(values[i] for i in order))
+
+
+def test_pinyin_order():
+    """拼音排序按读音排列，相同的值编码相同，空值编码为-1"""
+    codes, keys = collation_codes(NAMES, PINYIN_COLLATION)
+    assert _ordered(NAMES, PINYIN_COLLATION) == ["阿大", "李四", "王五", "张三", "赵六"]
+    assert codes[1] == codes[6]
+    assert codes[2] == -1
+    assert len(keys) == 5
+
+
+@pytest.mark.skipif(not HAS_ICU, reason="笔画排序需要PyICU")
+def test_stroke_order():
+    """笔画排序中笔画少的字在前"""
+    order = _ordered(NAMES, STROKE_COLLATION)
+    assert order[0] == "王五"
+    assert order[-1] == "赵六"
+
+
+@pytest.mark.parametrize("operator, expected", [
+    (">", ["张三", "王五", "赵六"]),
+    (">=", ["张三", "李四", "王五", "赵六", "李四"]),
+    ("<", ["阿大"]),
+    ("<=", ["李四", "阿大", "李四"]),
+])
+def test_range_mask_compares_by_pinyin(operator, expected):
+    """按拼音比较文本大小，空值不满足任何条件"""
+    codes, keys = collation_codes(NAMES, PINYIN_COLLATION)
+    mask = range_mask(codes, keys, operator, "李四", PINYIN_COLLATION)
+    assert NAMES[mask].tolist() == expected
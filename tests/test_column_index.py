@@ -0,0 +1,59 @@
+"""列索引模块测试"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from column_index import HashIndex, SortedIndex
+from data_store import DataStore
+from filter_engine import column_mask
+
+FRAME = pd.DataFrame({
+    "整数": [5, 3, 8, 3, 1, 9, 3],
+    "小数": [1.5, np.nan, -2.0, 1.5, 0.0, 7.25, np.nan],
+    "文本": pd.Series(["苹果", None, "香蕉", "苹果派", "", "apple", "苹果"], dtype="str"),
+    "混合": pd.Series([1, "a", None, "b", 2.5, "a", "ab"], dtype=object),
+    "日期": pd.to_datetime(["2024-01-02", None, "2023-12-31", "2024-01-02", "2024-06-01", "2024-01-01", None]),
+})
+
+CASES = [(col, operator, value)
+         for col, values in [(0, ["3", "4", "abc"]), (1, ["1.5", "0", "x"]), (2, ["苹果", "", "b"]),
+                             (3, ["a", "1", ""]), (4, ["2024-01-02", "2024-01-01"])]
+         for value in values
+         for operator in ("=", "!=", ">", "<", ">=", "<=", "开头为")]
+
+
+@pytest.mark.parametrize("col, operator, value", CASES)
+def test_index_mask_matches_scan(col, operator, value):
+    """同一列第二次筛选时使用索引，结果与逐行比较一致"""
+    store = DataStore(FRAME)
+    first = store.column_mask(col, operator, value)
+    indexed = store.column_mask(col, operator, value)
+    expected = column_mask(FRAME.iloc[:, col], operator, value)
+    assert first.tolist() == expected.tolist()
+    assert indexed.tolist() == expected.tolist()
+
+
+def test_hash_index_equal_rows_and_duplicates():
+    """哈希索引找出相等的行，空值按空字符串查找"""
+    index = HashIndex(FRAME["文本"])
+    assert index.equal_rows("苹果").tolist() == [0, 6]
+    assert sorted(index.equal_rows("").tolist()) == [1, 4]
+    assert HashIndex(FRAME["整数"]).equal_rows(3).tolist() == [1, 3, 6]
+
+
+def test_sorted_index_range_and_prefix():
+    """有序索引按范围与前缀查找，空值不参与比较"""
+    numbers = SortedIndex(FRAME["小数"])
+    assert sorted(numbers.range_rows(">=", 1.5).tolist()) == [0, 3, 5]
+    assert sorted(numbers.range_rows("<", 0.0).tolist()) == [2]
+    assert sorted(SortedIndex(FRAME["文本"]).prefix_rows("苹果").tolist()) == [0, 3, 6]
+
+
+def test_index_invalidated_after_edit():
+    """数据修改后索引失效，结果与修改后的数据一致"""
+    store = DataStore(FRAME)
+    store.column_mask(0, "=", "3")
+    assert store.column_mask(0, "=", "3").sum() == 3
+    store.set_value(0, 0, "3")
+    assert store.column_mask(0, "=", "3").sum() == 4
@@ -0,0 +1,99 @@
+"""列统计模块测试"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from column_stats import (APPROX_NAMES, STAT_NAMES, RunningStats, exact_stats, numeric_summary,
+                          numeric_values, streaming_summary)
+from data_store import DataStore
+
+
+def _frame(rows=5000, seed=0):
+    """包含数值、带空值的数值、数值文本与非数值列的数据"""
+    rng = np.random.default_rng(seed)
+    values = rng.normal(100, 15, rows)
+    values[::7] = np.nan
+    return pd.DataFrame({
+        "整数": rng.integers(0, 50, rows),
+        "小数": values,
+        "文本数值": pd.Series(rng.integers(0, 10, rows).astype(str), dtype="str"),
+        "名称": pd.Series(rng.choice(["甲", "乙", "丙"], rows), dtype="str"),
+    })
+
+
+def _chunks(frame, size):
+    """按行切分数据块"""
+    return (frame.iloc[start:start + size] for start in range(0, len(frame), size))
+
+
+def test_numeric_values_converts_text():
+    """文本中的数值参与统计，其他文本与空值为NaN"""
+    series = pd.Series([" 1.5", "2e3", "abc", None, "2024-01-01", "-inf"], dtype=object)
+    values = numeric_values(series)
+    assert values[:2].tolist() == [1.5, 2000.0]
+    assert np.isnan(values[2:5]).all()
+    assert values[5] == -np.inf
+
+
+def test_exact_stats_matches_numpy():
+    """统计量与numpy的计算结果一致"""
+    data = np.random.default_rng(1).normal(size=1001)
+    count, mean, std, low, q1, median, q3, high = exact_stats(data)
+    assert count == 1001
+    assert mean == pytest.approx(data.mean())
+    assert std == pytest.approx(data.std())
+    assert (low, high) == (data.min(), data.max())
+    assert [q1, median, q3] == pytest.approx(np.percentile(data, [25, 50, 75]).tolist())
+
+
+def test_streaming_matches_exact():
+    """按块累加的结果与一次计算的精确结果一致，与分块方式无关"""
+    frame = _frame()
+    exact = numeric_summary(DataStore(frame)).set_index("列名")
+    assert list(exact.index) == ["整数", "小数", "文本数值"]
+    for size in (333, 997, 5000):
+        streamed = streaming_summary(_chunks(frame, size)).set_index("列名")
+        assert list(streamed.index) == list(exact.index)
+        for name in ("数据个数", "平均值", "标准差", "最小值", "最大值"):
+            assert streamed[name].to_numpy() == pytest.approx(exact[name].to_numpy())
+        assert streamed["中位数"].isna().all()
+
+
+def test_running_stats_merge_is_order_free():
+    """两份统计合并与一起统计相同"""
+    matrix = np.random.default_rng(2).normal(size=(1000, 2))
+    matrix[::3, 0] = np.nan
+    whole = RunningStats(["a", "b"])
+    whole.update(matrix)
+    left, right = RunningStats(["a", "b"]), RunningStats(["a", "b"])
+    right.update(matrix[400:])
+    left.update(matrix[:400])
+    right.merge(left)
+    assert right.count.tolist() == whole.count.tolist()
+    assert right.mean == pytest.approx(whole.mean)
+    assert right.m2 == pytest.approx(whole.m2)
+
+
+def test_approximate_summary_estimates():
+    """近似统计的分位数与不同值个数接近精确结果，全部列都出现在结果中"""
+    frame = _frame(20000)
+    exact = numeric_summary(DataStore(frame)).set_index("列名")
+    approx = streaming_summary(_chunks(frame, 3000), approximate=True).set_index("列名")
+    assert list(approx.columns) == [*STAT_NAMES, *APPROX_NAMES]
+    assert list(approx.index) == ["整数", "小数", "文本数值", "名称"]
+    values = frame["小数"].dropna().to_numpy()
+    for name in ("25%分位数", "中位数", "75%分位数"):
+        # 排名误差约为 1.7/k，换算为数值误差
+        rank = (values < approx.loc["小数", name]).mean()
+        exact_rank = (values < exact.loc["小数", name]).mean()
+        assert abs(rank - exact_rank) < 0.02
+    assert approx.loc["整数", APPROX_NAMES[0]] == pytest.approx(50, abs=3)
+    assert approx.loc["名称", APPROX_NAMES[0]] == 3
+    assert approx.loc["名称", "数据个数"] == 0
+
+
+def test_cancelled_returns_none():
+    """取消时返回None"""
+    assert streaming_summary(_chunks(_frame(), 100), cancelled=lambda: True) is None
+    assert numeric_summary(DataStore(_frame()), cancelled=lambda: True) is None
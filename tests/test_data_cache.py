@@ -0,0 +1,75 @@
+"""数据缓存模块测试"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_cache import FileCache
+
+
+def _source(tmp_path, name="data.csv", text="a\n1\n"):
+    """写一个源数据文件"""
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    """保存后再次读取得到相同的数据，列名转为文本"""
+    cache = FileCache(str(tmp_path / "cache"))
+    path = _source(tmp_path)
+    assert cache.load(path) is None
+    df = pd.DataFrame({0: [1, 2], "b": ["x", "y"]}, index=[5, 6])
+    cache.save(path, df)
+    loaded = cache.load(path)
+    assert list(loaded.columns) == ["0", "b"]
+    assert loaded["0"].tolist() == [1, 2]
+    assert loaded.index.tolist() == [0, 1]
+
+
+def test_modified_source_invalidates_cache(tmp_path):
+    """源文件的修改时间或大小变化后旧缓存失效，并在读取时被删除"""
+    cache = FileCache(str(tmp_path / "cache"))
+    path = _source(tmp_path)
+    cache.save(path, pd.DataFrame({"a": [1]}))
+    base = cache.sidecar_base(path)
+    cache.save_sidecar(base, "idx", {"x": np.arange(3)})
+    _source(tmp_path, text="a\n1\n2\n")
+    os.utime(path, ns=(1, 1))
+    assert cache.sidecar_base(path) != base
+    assert cache.load(path) is None
+    assert os.listdir(cache.cache_dir) == []
+
+
+def test_sidecar_round_trip(tmp_path):
+    """附属文件按缓存键保存与读取，不存在或损坏时返回None"""
+    cache = FileCache(str(tmp_path / "cache"))
+    path = _source(tmp_path)
+    base = cache.sidecar_base(path)
+    assert cache.load_sidecar(base, "idx") is None
+    cache.save_sidecar(base, "idx", {"x": np.arange(3)})
+    assert cache.load_sidecar(base, "idx")["x"].tolist() == [0, 1, 2]
+    with open(f"{base}.idx.npz", "wb") as f:
+        f.write(b"broken")
+    assert cache.load_sidecar(base, "idx") is None
+    assert not os.path.exists(f"{base}.idx.npz")
+
+
+def test_evicts_least_recently_used(tmp_path):
+    """总大小超过上限时先淘汰最久未使用的缓存"""
+    cache = FileCache(str(tmp_path / "cache"))
+    paths = [_source(tmp_path, f"{name}.csv") for name in "abc"]
+    df = pd.DataFrame({"v": np.arange(20000)})
+    for i, path in enumerate(paths[:2]):
+        cache.save(path, df)
+        entry = cache._entries(cache._key(path))[0]
+        os.utime(entry, (1000 + i, 1000 + i))
+    # 读取第一个文件的缓存后，它成为最近使用的
+    assert cache.load(paths[0]) is not None
+    size = os.path.getsize(cache._entries(cache._key(paths[0]))[0])
+    cache.max_bytes = size * 2 + size // 2
+    cache.save(paths[2], df)
+    assert cache.load(paths[1]) is None
+    assert cache.load(paths[0]) is not None
+    assert cache.load(paths[2]) is not None
@@ -0,0 +1,87 @@
+"""数据读取模块测试"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from data_loader import Projection, iter_chunks
+
+
+SOURCE = ["a", "ab", "b", "金额 (元)", "and"]
+
+
+@pytest.mark.parametrize("predicate, expected", [
+    # 列名是其他列名的子串时只读取真正引用的列
+    ("ab > 1", ["a", "ab"]),
+    ("a > 1 and b == 'ab'", ["a", "b"]),
+    ("`金额 (元)` >= 100", ["a", "金额 (元)"]),
+    ("`and` == 1 or ab.isna()", ["a", "ab", "and"]),
+    ("b > @limit", ["a", "b"]),
+])
+def test_projection_reads_referenced_columns(predicate, expected):
+    """按解析后的筛选条件找出需要额外读取的列"""
+    projection = Projection(columns=["a"], predicate=predicate, source_columns=SOURCE)
+    assert projection.read_columns == expected
+
+
+def test_projection_unparsable_predicate_reads_all_columns():
+    """条件无法解析时读取全部列"""
+    projection = Projection(columns=["a"], predicate="a >", source_columns=SOURCE)
+    assert projection.read_columns is None
+
+
+def test_projection_with_backticked_column(tmp_path):
+    """反引号中的列名参与筛选但不在保留列中时，只用于筛选不出现在结果中"""
+    path = str(tmp_path / "data.csv")
+    pd.DataFrame({"a": [1, 2, 3], "ab": [9, 9, 9], "金额 (元)": [50, 150, 250]}).to_csv(path, index=False)
+    projection = Projection(columns=["a"], predicate="`金额 (元)` > 100", source_columns=["a", "ab", "金额 (元)"])
+    frame = pd.concat([chunk for chunk, _ in iter_chunks(path, projection=projection)], ignore_index=True)
+    assert list(frame.columns) == ["a"]
+    assert frame["a"].tolist() == [2, 3]
+
+
+def test_row_index_pages_match_blank_lines(tmp_path):
+    """含空行的CSV按页解析的行数与索引的行数一致，空行计为一行空值"""
+    from data_loader import CsvRowIndex
+
+    path = tmp_path / "blank.csv"
+    path.write_text("a,b\n1,x\n\n2,y\n\n\n3,z\n4,w\n", encoding="utf-8")
+    index = CsvRowIndex.build(str(path), page_rows=2)
+    try:
+        pages = [index.read_page(page) for page in range(index.page_count())]
+        assert index.row_count == 7
+        assert [len(frame) for frame in pages] == [2, 2, 2, 1]
+        frame = pd.concat(pages, ignore_index=True)
+        assert frame["a"].isna().tolist() == [False, True, False, True, True, False, False]
+        assert frame["a"].dropna().tolist() == [1, 2, 3, 4]
+    finally:
+        index.close()
+
+
+def test_row_index_saved_in_cache(tmp_path):
+    """行偏移索引保存在缓存目录而不是数据文件旁边，再次打开时不重新扫描"""
+    from data_cache import FileCache
+    from data_loader import CsvRowIndex
+
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    path = data_dir / "rows.csv"
+    path.write_text("a\n" + "".join(f"{i}\n" for i in range(10)), encoding="utf-8")
+    cache = FileCache(str(tmp_path / "cache"))
+    CsvRowIndex.build(str(path), page_rows=3, cache=cache).close()
+    assert sorted(p.name for p in data_dir.iterdir()) == ["rows.csv"]
+    assert any(name.endswith(".rowidx.npz") for name in os.listdir(cache.cache_dir))
+
+    scanned = []
+    index = CsvRowIndex.build(str(path), page_rows=3, progress=scanned.append, cache=cache)
+    try:
+        assert scanned == []
+        assert index.row_count == 10
+        assert index.read_page(3)["a"].tolist() == [9]
+    finally:
+        index.close()
+    # 每页行数不同时重新扫描
+    index = CsvRowIndex.build(str(path), page_rows=4, progress=scanned.append, cache=cache)
+    index.close()
+    assert scanned and index.page_count() == 3
@@ -0,0 +1,82 @@
+"""数据存储模块测试"""
+
+import numpy as np
+import pandas as pd
+
+from data_store import DataStore
+
+
+def _frame():
+    """包含各种原生类型列的数据"""
+    return pd.DataFrame({
+        "整数": np.array([3, 1, 2], dtype=np.int64),
+        "小数": [1.5, 2.5, 3.5],
+        "文本": pd.Series(["甲", "乙", "丙"], dtype="str"),
+        "日期": pd.to_datetime(["2024-01-03", "2024-01-01", "2024-01-02"]),
+        "分类": pd.Categorical(["x", "y", "x"]),
+        "布尔": [True, False, True],
+    })
+
+
+def test_insert_row_keeps_dtypes():
+    """插入空行后能存放空值的列类型不变，整数和布尔列改为对应的可空类型"""
+    store = DataStore(_frame())
+    before = store.df.dtypes
+    store.insert_row(1)
+    after = store.df.dtypes
+    for name in ["小数", "文本", "日期", "分类"]:
+        assert after[name] == before[name]
+    assert after["整数"] == "Int64"
+    assert after["布尔"] == "boolean"
+    assert store.row_count() == 4
+    assert [store.display(1, col) for col in range(store.column_count())] == [""] * 6
+    assert store.df["整数"].dropna().tolist() == [3, 1, 2]
+
+
+def test_insert_row_in_sorted_view_keeps_dtypes():
+    """排序视图中插入空行同样保持列类型，撤销后恢复原来的类型"""
+    frame = _frame().drop(columns=["整数", "布尔"])
+    store = DataStore(frame)
+    before = store.df.dtypes
+    store.sort([(0, True)])
+    store.insert_row(0)
+    assert store.df.dtypes.equals(before)
+    assert store.display(0, 0) == ""
+    store.undo()
+    assert store.row_count() == 3
+    assert store.df.dtypes.equals(before)
+
+
+def test_insert_row_undo_restores_integer_dtype():
+    """撤销插入空行后整数和布尔列恢复原来的类型"""
+    store = DataStore(_frame())
+    before = store.df.dtypes
+    store.insert_row(0)
+    store.set_value(0, 0, "7")
+    assert store.df["整数"].dtype == "Int64"
+    store.undo()
+    store.undo()
+    assert store.df.dtypes.equals(before)
+
+
+def test_set_value_writes_in_place():
+    """编辑单元格直接写入原列，不因写时复制复制整列"""
+    store = DataStore(_frame())
+    values = store.df["小数"].to_numpy()
+    store.set_value(1, 1, "9")
+    assert np.shares_memory(values, store.df["小数"].to_numpy())
+    assert store.df["小数"].tolist() == [1.5, 9.0, 3.5]
+
+
+def test_set_value_undo_restores_converted_column():
+    """写入值使列类型变化时，撤销后恢复原列"""
+    store = DataStore(_frame())
+    before = store.df.dtypes
+    store.set_value(0, 0, "1.5")
+    store.set_value(0, 4, "z")
+    assert store.df["整数"].dtype == np.float64
+    assert list(store.df["分类"].cat.categories) == ["x", "y", "z"]
+    store.undo()
+    store.undo()
+    assert store.df.dtypes.equals(before)
+    assert store.df["整数"].tolist() == [3, 1, 2]
@@ -0,0 +1,66 @@
+"""数据写出模块测试"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_writer
+from data_writer import write_frames
+
+
+def _frames(count=3, rows=4):
+    """产出若干块相同结构的数据"""
+    for start in range(0, count * rows, rows):
+        yield pd.DataFrame({"a": np.arange(start, start + rows), "b": [f"文{i}" for i in range(rows)]})
+
+
+def test_csv_chunks_written_with_one_header(tmp_path):
+    """分块写出CSV时只写一次表头，读回与原数据一致"""
+    path = str(tmp_path / "out.csv")
+    rows, cancelled = write_frames(_frames(), path, "csv")
+    assert (rows, cancelled) == (12, False)
+    assert pd.read_csv(path, encoding="utf-8-sig")["a"].tolist() == list(range(12))
+    assert not os.path.exists(path + ".part")
+
+
+def test_json_is_one_record_array(tmp_path):
+    """分块写出的JSON是一个完整的记录数组，空块不产生多余的逗号"""
+    path = str(tmp_path / "out.json")
+    frames = [pd.DataFrame({"a": [1]}), pd.DataFrame({"a": []}), pd.DataFrame({"a": [2]})]
+    write_frames(frames, path, "json")
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == [{"a": 1}, {"a": 2}]
+
+
+def test_cancel_keeps_existing_target(tmp_path):
+    """取消时删除临时文件，不覆盖已有的目标文件"""
+    path = tmp_path / "out.csv"
+    path.write_text("old", encoding="utf-8")
+    written = []
+    rows, cancelled = write_frames(_frames(), str(path), "csv", progress=written.append,
+                                   cancelled=lambda: len(written) >= 1)
+    assert cancelled and rows == 4
+    assert path.read_text(encoding="utf-8") == "old"
+    assert not os.path.exists(str(path) + ".part")
+
+
+def test_xlsx_row_limit(tmp_path, monkeypatch):
+    """超过Excel最大行数时报错，目标文件与临时文件都不保留"""
+    monkeypatch.setattr(data_writer, "EXCEL_MAX_ROWS", 10)
+    path = str(tmp_path / "out.xlsx")
+    with pytest.raises(ValueError):
+        write_frames(_frames(), path, "xlsx")
+    assert os.listdir(tmp_path) == []
+
+
+def test_xlsx_round_trip(tmp_path):
+    """Excel写出后可以读回，空值为空单元格"""
+    path = str(tmp_path / "out.xlsx")
+    frame = pd.DataFrame({"a": [1.5, np.nan], "b": ["x", "y"]})
+    write_frames([frame], path, "xlsx")
+    loaded = pd.read_excel(path)
+    assert loaded["a"].tolist()[0] == 1.5
+    assert loaded.isna().to_numpy().tolist() == [[False, False], [True, False]]
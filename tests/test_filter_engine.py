@@ -0,0 +1,98 @@
+"""筛选表达式模块测试"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_store import DataStore
+from filter_engine import BoolOp, Condition, column_mask, compile_filter
+
+TEXT = ["北京", "上海", None, "北京市", "", "广州"]
+
+
+@pytest.mark.parametrize("operator, value", [
+    ("=", "北京"), ("!=", "北京"), ("包含", "北京"), ("不包含", "京"), ("开头为", "北"),
+    ("结尾为", "市"), ("为空", ""), ("不为空", ""), (">", "北京"),
+])
+def test_categorical_mask_matches_text_mask(operator, value):
+    """分类列按类别计算后映射到每行，结果与同样内容的文本列一致"""
+    text = pd.Series(TEXT, dtype=object)
+    expected = column_mask(text, operator, value)
+    assert column_mask(text.astype("category"), operator, value).tolist() == expected.tolist()
+
+
+def test_text_mask_treats_missing_as_empty():
+    """空值按空字符串参与文本比较"""
+    text = pd.Series(TEXT, dtype="str")
+    assert column_mask(text, "为空", "").tolist() == [False, False, True, False, True, False]
+    assert column_mask(text, "不包含", "北").tolist() == [False, True, True, False, True, True]
+
+
+def test_datetime_mask_compares_dates():
+    """日期列按日期比较，空值只满足不等于"""
+    dates = pd.Series(pd.to_datetime(["2024-01-01", None, "2024-03-01"]))
+    assert column_mask(dates, ">=", "2024-02-01").tolist() == [False, False, True]
+    assert column_mask(dates, "=", "2024-01-01").tolist() == [True, False, False]
+    assert column_mask(dates, "!=", "2024-01-01").tolist() == [False, True, True]
+
+
+def test_numeric_mask_falls_back_to_text():
+    """比较值无法转换为数值时按文本比较"""
+    numbers = pd.Series([1.5, np.nan, 10.0])
+    assert column_mask(numbers, ">", "2").tolist() == [False, False, True]
+    assert column_mask(numbers, "=", "abc").tolist() == [False, False, False]
+
+
+def test_compile_and_evaluate_tree():
+    """条件列表编译为表达式树，AND/OR按行组合"""
+    store = DataStore(pd.DataFrame({"a": [1, 2, 3, 4], "b": ["x", "y", "x", "y"]}))
+    assert compile_filter([]) is None
+    assert isinstance(compile_filter([(0, ">", "1")]), Condition)
+    both = compile_filter([(0, ">", "1"), (1, "=", "x")], "AND")
+    either = compile_filter([(0, ">", "3"), (1, "=", "x")], "OR")
+    assert both.evaluate(store).tolist() == [False, False, True, False]
+    assert either.evaluate(store).tolist() == [True, False, True, True]
+    nested = BoolOp("AND", [either, Condition(0, "<", "4")])
+    assert nested.evaluate(store, np.array([3, 2, 0])).tolist() == [False, True, True]
+    assert [leaf.key() for leaf in nested.conditions()] == [
+        ("条件", 0, ">", "3"), ("条件", 1, "=", "x"), ("条件", 0, "<", "4")]
+
+
+def test_filter_view_keeps_data():
+    """筛选只改变视图，不删除数据"""
+    store = DataStore(pd.DataFrame({"a": [3, 1, 2]}))
+    store.set_filter(compile_filter([(0, ">=", "2")]))
+    assert store.row_count() == 2
+    assert [store.display(row, 0) for row in range(2)] == ["3", "2"]
+    assert len(store.df) == 3
+    store.clear_filter()
+    assert store.row_count() == 3
+
+
+@pytest.mark.parametrize("new, old, expected", [
+    (Condition(0, "包含", "ab"), Condition(0, "包含", "a"), True),
+    (Condition(0, "包含", "a"), Condition(0, "包含", "ab"), False),
+    (Condition(0, "不包含", "a"), Condition(0, "不包含", "ab"), True),
+    (Condition(0, "开头为", "abc"), Condition(0, "开头为", "ab"), True),
+    (Condition(0, "结尾为", "abc"), Condition(0, "结尾为", "bc"), True),
+    (Condition(1, "包含", "ab"), Condition(0, "包含", "a"), False),
+    (Condition(0, ">", "5"), Condition(0, ">", "3"), False),
+    (Condition(0, "包含", "ab"), BoolOp("AND", [Condition(0, "包含", "a"), Condition(0, "包含", "b")]), True),
+    (Condition(0, "包含", "ab"), BoolOp("OR", [Condition(0, "包含", "a"), Condition(1, "=", "x")]), True),
+    (BoolOp("AND", [Condition(0, "包含", "ab"), Condition(1, "=", "x")]), Condition(0, "包含", "a"), True),
+    (BoolOp("OR", [Condition(0, "包含", "ab"), Condition(1, "=", "x")]), Condition(0, "包含", "a"), False),
+])
+def test_narrows(new, old, expected):
+    """新条件更严格时才能只在之前保留的行中重新计算"""
+    assert new.narrows(old) is expected
+
+
+def test_refined_filter_matches_full_evaluation():
+    """在上一次结果上细化的筛选与重新计算的结果一致"""
+    frame = pd.DataFrame({"a": ["abc", "ab", "a", "xabx", None, "b"]})
+    refined = DataStore(frame)
+    refined.set_filter(compile_filter([(0, "包含", "a")]))
+    refined.set_filter(compile_filter([(0, "包含", "ab")]))
+    full = DataStore(frame)
+    full.set_filter(compile_filter([(0, "包含", "ab")]))
+    assert refined.filter_mask().tolist() == full.filter_mask().tolist() == [True, True, False, True, False, False]
@@ -0,0 +1,63 @@
+"""分组汇总模块测试"""
+
+import numpy as np
+import pandas as pd
+
+from group_aggregate import aggregate_frames
+
+
+def _frames(count, rows=100):
+    """产出若干块相同结构的数据"""
+    for start in range(0, count * rows, rows):
+        yield pd.DataFrame({"k": np.arange(start, start + rows) % 3, "v": np.ones(rows)})
+
+
+def test_cancel_mid_run_returns_none(monkeypatch):
+    """汇总进行中取消时返回None，取消仍在线程池中的块，不抛出异常"""
+    import time
+    import group_aggregate
+
+    partial = group_aggregate.GroupAggregator.partial
+
+    def slow_partial(self, frame):
+        time.sleep(0.2)
+        return partial(self, frame)
+
+    monkeypatch.setattr(group_aggregate.GroupAggregator, "partial", slow_partial)
+    produced = []
+
+    def frames():
+        for frame in _frames(10):
+            produced.append(frame)
+            yield frame
+
+    # 第3块产出时前两块仍在计算中
+    result = aggregate_frames(frames(), ["k"], ["v"], ["求和"], workers=4,
+                              cancelled=lambda: len(produced) >= 3)
+    assert result is None
+    assert len(produced) == 3
+
+
+def test_chunked_result_matches_groupby():
+    """分块汇总与一次分组的结果相同"""
+    frame = pd.concat(list(_frames(5)), ignore_index=True)
+    result = aggregate_frames(_frames(5), ["k"], ["v"], ["求和", "计数"], workers=2)
+    expected = frame.groupby("k").v.agg(["sum", "count"]).reset_index()
+    assert result["v(求和)"].tolist() == expected["sum"].tolist()
+    assert result["v(计数)"].tolist() == expected["count"].tolist()
+
+
+def test_distinct_count_with_mixed_int_float_keys():
+    """分组列在不同块中分别为整数和浮点数时，不同值个数仍按合并后的组统计"""
+    frames = [pd.DataFrame({"k": [1, 2], "v": [1, 2]}), pd.DataFrame({"k": [1.0, np.nan], "v": [3, 4]})]
+    result = aggregate_frames(frames, ["k"], ["v"], ["不同值个数", "计数"], workers=1)
+    assert result["k"].tolist()[:2] == [1.0, 2.0]
+    assert result["v(不同值个数)"].tolist() == [2, 1, 1]
+    assert result["v(计数)"].tolist() == [2, 1, 1]
+
+
+def test_distinct_count_with_mixed_int_float_values():
+    """汇总列在不同块中分别为整数和浮点数时，相等的值只计一次"""
+    frames = [pd.DataFrame({"k": ["a", "a"], "v": [1, 2]}), pd.DataFrame({"k": ["a"], "v": [1.0]})]
+    result = aggregate_frames(frames, ["k"], ["v"], ["不同值个数"], workers=1)
+    assert result["v(不同值个数)"].tolist() == [2]
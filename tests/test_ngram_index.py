@@ -0,0 +1,62 @@
+"""N元组倒排索引模块测试"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from data_cache import FileCache
+from data_store import DataStore
+from filter_engine import column_mask
+from ngram_index import NgramIndex
+
+TEXTS = pd.Series(["北京市朝阳区", "上海市浦东新区", None, "北京大学", "abcdef", "xabcx", "", "朝阳",
+                   "京北", "ABC"] * 3, dtype="str")
+
+
+@pytest.mark.parametrize("value", ["北京", "朝阳区", "京", "市", "abc", "bcd", "不存在", "区x", "ABC"])
+def test_contains_mask_matches_scan(value):
+    """索引的包含结果与逐行查找一致"""
+    mask = NgramIndex.build(TEXTS).contains_mask(value)
+    assert mask.tolist() == column_mask(TEXTS, "包含", value).tolist()
+
+
+def test_short_text_not_indexed():
+    """不足三个字符的非汉字文本无法用索引缩小范围"""
+    assert NgramIndex.build(TEXTS).contains_mask("cx") is None
+
+
+@pytest.mark.parametrize("operator", ["包含", "不包含"])
+def test_store_ngram_path_matches_scan(operator):
+    """同一列再次筛选时经N元组索引计算，结果与逐行查找一致"""
+    store = DataStore(pd.DataFrame({"t": TEXTS}))
+    for value in ["北京", "abc", "新区"]:
+        store.column_mask(0, operator, value)
+        assert store.column_mask(0, operator, value).tolist() == column_mask(TEXTS, operator, value).tolist()
+
+
+def test_size_limit_skips_index():
+    """预计超过大小上限时不建立索引"""
+    assert NgramIndex.build(TEXTS, max_bytes=10) is None
+
+
+def test_arrays_round_trip_and_mismatch():
+    """保存的数组可以恢复索引，与数据不一致时返回None"""
+    index = NgramIndex.build(TEXTS)
+    restored = NgramIndex.from_arrays(TEXTS, index.to_arrays())
+    assert restored.contains_mask("北京").tolist() == index.contains_mask("北京").tolist()
+    assert NgramIndex.from_arrays(TEXTS.iloc[:3], index.to_arrays()) is None
+
+
+def test_index_persisted_in_cache(tmp_path):
+    """数据未修改时索引保存在缓存目录，下次直接读取"""
+    path = tmp_path / "data.csv"
+    path.write_text("t\n", encoding="utf-8")
+    cache = FileCache(str(tmp_path / "cache"))
+    store = DataStore(pd.DataFrame({"t": TEXTS}))
+    store.attach_cache(cache, cache.sidecar_base(str(path)))
+    assert store.ngram_index(0) is not None
+    assert len([name for name in os.listdir(cache.cache_dir) if ".ngram-" in name]) == 1
+    again = DataStore(pd.DataFrame({"t": TEXTS}))
+    again.attach_cache(cache, cache.sidecar_base(str(path)))
+    assert again.ngram_index(0).contains_mask("北京").tolist() == column_mask(TEXTS, "包含", "北京").tolist()
@@ -0,0 +1,67 @@
+"""数据处理流水线模块测试"""
+
+import pandas as pd
+import pytest
+
+from pipeline import Pipeline
+
+
+def _rows(store):
+    """按视图顺序返回全部单元格文本"""
+    return [[store.display(row, col) for col in range(store.column_count())] for row in range(store.row_count())]
+
+
+def _replay(path, steps, optimized):
+    """按优化后或未优化的执行计划重放流水线"""
+    pipeline = Pipeline(steps)
+    if optimized:
+        return pipeline.execute(path)
+    store, _ = Pipeline().load_data(path)
+    pipeline.apply(store)
+    return store
+
+
+@pytest.mark.parametrize("steps", [
+    # 删除列会清除之前的排序，之后的筛选按原始顺序显示
+    [{"op": "sort", "keys": [["a", False]]},
+     {"op": "remove_column", "column": "c"},
+     {"op": "filter", "conditions": [["a", ">", "1"]], "logic": "AND"}],
+    [{"op": "filter", "conditions": [["a", "<", "5"]], "logic": "AND"},
+     {"op": "remove_column", "column": "c"},
+     {"op": "sort", "keys": [["b", True]]}],
+    # 被替换的排序修改的文本排序方式仍影响之后的文本比较
+    [{"op": "sort", "keys": [["n", True]], "collation": "拼音"},
+     {"op": "sort", "keys": [["a", True]], "collation": None},
+     {"op": "filter", "conditions": [["n", ">", "李四"]], "logic": "AND"}],
+    # 之前没有排序或筛选时，删除未使用的列可以不读取
+    [{"op": "remove_column", "column": "c"},
+     {"op": "sort", "keys": [["a", False]]},
+     {"op": "filter", "conditions": [["a", ">", "1"]], "logic": "AND"}],
+])
+def test_optimized_replay_matches_full_replay(tmp_path, steps):
+    """优化后的执行计划与逐步重放的结果一致"""
+    path = str(tmp_path / "data.csv")
+    pd.DataFrame({"a": [3, 1, 4, 1, 5, 9, 2, 6], "b": list("hgfedcba"), "c": range(8),
+                  "n": ["张三", "李四", "王五", "阿大", "赵六", "钱七", "孙八", "周九"]}).to_csv(path, index=False)
+    optimized = _replay(path, steps, True)
+    full = _replay(path, steps, False)
+    assert optimized.column_names() == full.column_names()
+    assert optimized.sort_conditions == full.sort_conditions
+    assert optimized.collation == full.collation
+    assert _rows(optimized) == _rows(full)
+
+
+def test_unused_column_not_loaded_without_view_steps():
+    """之前没有排序或筛选时，被删除且未使用的列不读取"""
+    steps = [{"op": "remove_column", "column": "c"}, {"op": "sort", "keys": [["a", True]]}]
+    projection, planned = Pipeline(steps).optimize(["a", "b", "c"])
+    assert [str(name) for name in projection.columns] == ["a", "b"]
+    assert planned == steps[1:]
+
+
+def test_remove_column_after_sort_is_kept():
+    """删除列之前有排序时保留删除列步骤，保证排序条件被同样清除"""
+    steps = [{"op": "sort", "keys": [["a", True]]}, {"op": "remove_column", "column": "c"}]
+    projection, planned = Pipeline(steps).optimize(["a", "b", "c"])
+    assert projection.columns is None
+    assert planned == steps
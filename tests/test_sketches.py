@@ -0,0 +1,96 @@
+"""概要数据结构(草图)模块测试"""
+
+import numpy as np
+import pandas as pd
+
+from sketches import HLL_PRECISION, KLL_K, TOP_K, HyperLogLog, KllSketch, SpaceSaving
+
+
+def test_hyperloglog_merges_int_and_float_pages():
+    """同一列在不同页中分别读取为整数和浮点数时，相等的值合并后只计一次"""
+    ints = HyperLogLog()
+    ints.update(pd.Series(np.arange(100, dtype=np.int64)))
+    floats = HyperLogLog()
+    floats.update(pd.Series(np.append(np.arange(100, dtype=float), np.nan)))
+    ints.merge(floats)
+    assert ints.estimate() == floats.estimate()
+    assert abs(ints.estimate() - 100) <= 3
+
+
+def _rank_error(sketch, data, qs=(0.1, 0.25, 0.5, 0.75, 0.9)):
+    """草图估计的分位数在数据中的排名与目标分位点的最大差"""
+    data = np.sort(data)
+    estimates = sketch.quantiles(qs)
+    return max(abs(np.searchsorted(data, value) / len(data) - q) for value, q in zip(estimates, qs))
+
+
+def test_kll_rank_error_bound():
+    """KLL分位数的排名误差在 1.7/k 左右，内存与数据量无关"""
+    data = np.random.default_rng(0).lognormal(size=200000)
+    sketch = KllSketch(seed=1)
+    for start in range(0, len(data), 10000):
+        sketch.update(data[start:start + 10000])
+    assert sketch.count == len(data)
+    assert _rank_error(sketch, data) < 2 * 1.7 / KLL_K
+    assert sketch.nbytes() < 4 * KLL_K * 8
+
+
+def test_kll_merge_matches_single_sketch():
+    """分别建立的草图合并后误差仍在范围内，空值被忽略"""
+    rng = np.random.default_rng(1)
+    data = rng.normal(size=100000)
+    parts = [KllSketch(seed=i) for i in range(4)]
+    for i, part in enumerate(parts):
+        chunk = data[i::4].copy()
+        chunk[::10] = np.nan
+        part.update(chunk)
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+    kept = np.concatenate([np.delete(data[i::4], np.s_[::10]) for i in range(4)])
+    assert merged.count == len(kept)
+    assert _rank_error(merged, kept) < 2 * 1.7 / KLL_K
+    assert np.isnan(KllSketch().quantiles([0.5])).all()
+
+
+def test_hyperloglog_error_bound_and_merge():
+    """不同值个数的相对误差约为 1.04/sqrt(寄存器数)，合并等价于一起统计"""
+    values = pd.Series(np.arange(100000).astype(str))
+    whole = HyperLogLog()
+    whole.update(values)
+    left, right = HyperLogLog(), HyperLogLog()
+    left.update(values[:60000])
+    right.update(values[40000:])
+    left.merge(right)
+    bound = 3 * 1.04 / np.sqrt(1 << HLL_PRECISION)
+    assert abs(whole.estimate() / 100000 - 1) < bound
+    assert left.estimate() == whole.estimate()
+    small = HyperLogLog()
+    small.update(pd.Series(["a", "b", "a", None]))
+    assert small.estimate() == 2
+
+
+def test_space_saving_finds_heavy_hitters():
+    """高频值的计数高估不超过 总个数/k，出现次数最多的值排在前面"""
+    rng = np.random.default_rng(2)
+    values = np.concatenate([np.repeat(["甲", "乙", "丙"], [5000, 3000, 2000]), rng.integers(0, 5000, 20000).astype(str)])
+    rng.shuffle(values)
+    series = pd.Series(values)
+    sketch = SpaceSaving(k=TOP_K)
+    for start in range(0, len(series), 3000):
+        sketch.update(series[start:start + 3000])
+    top = sketch.top(3)
+    assert [value for value, _, _ in top] == ["甲", "乙", "丙"]
+    exact = series.value_counts()
+    for value, count, error in top:
+        assert count - error <= exact[value] <= count
+        assert count - exact[value] <= len(series) / TOP_K
+
+
+def test_space_saving_merge():
+    """两个草图合并后的高频值与一起统计一致"""
+    left, right = SpaceSaving(k=3), SpaceSaving(k=3)
+    left.update(pd.Series(["a"] * 5 + ["b"] * 3 + ["c", "d"]))
+    right.update(pd.Series(["b"] * 4 + ["a"] + ["e", "f", None]))
+    left.merge(right)
+    assert [(value, count) for value, count, _ in left.top(2)] == [("b", 7), ("a", 6)]
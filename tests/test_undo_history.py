@@ -0,0 +1,93 @@
+"""撤销/重做模块测试"""
+
+import numpy as np
+import pandas as pd
+
+from data_store import DataStore
+from undo_history import UndoHistory, UndoStep
+
+
+class _Edit:
+    """只有大小的修改"""
+
+    def __init__(self, nbytes):
+        self.nbytes = nbytes
+
+
+def _step(label, nbytes):
+    """由一个指定大小的修改组成的操作"""
+    step = UndoStep(label)
+    step.edits.append(_Edit(nbytes))
+    return step
+
+
+def test_evicts_oldest_steps_over_budget():
+    """总大小超过上限时从最早的操作开始丢弃"""
+    history = UndoHistory(max_bytes=100)
+    for i in range(4):
+        history.record(_step(f"第{i}步", 40))
+    assert history.nbytes() == 80
+    assert history.pop_undo().label == "第3步"
+    assert history.pop_undo().label == "第2步"
+    assert history.pop_undo() is None
+
+
+def test_record_clears_redo():
+    """记录新操作后不能再重做"""
+    history = UndoHistory()
+    history.record(_step("a", 1))
+    history.pop_undo()
+    assert history.redo_label() == "a"
+    history.record(_step("b", 1))
+    assert history.redo_label() is None
+    assert history.undo_label() == "b"
+
+
+def test_oversized_step_not_kept():
+    """单步超过上限时不保留"""
+    history = UndoHistory(max_bytes=10)
+    history.record(_step("大", 11))
+    assert history.undo_label() is None
+
+
+def test_store_undo_redo_round_trip():
+    """单元格、整列与删除行的修改都可以撤销和重做"""
+    frame = pd.DataFrame({"a": [1, 2, 3, 4], "b": ["x", None, "y", None]})
+    store = DataStore(frame.copy())
+    store.set_value(0, 0, "10")
+    store.fill_empty(1, "空")
+    store.delete_row(2)
+    store.keep_rows(np.array([True, False, True]))
+    changed = store.df.copy()
+    for _ in range(4):
+        assert store.undo() is not None
+    assert store.undo() is None
+    pd.testing.assert_frame_equal(store.df, frame)
+    for _ in range(4):
+        store.redo()
+    pd.testing.assert_frame_equal(store.df, changed)
+
+
+def test_transaction_is_one_step():
+    """合并操作中的修改作为一步撤销"""
+    store = DataStore(pd.DataFrame({"a": [1, 2]}))
+    with store.transaction("粘贴"):
+        store.set_value(0, 0, "5")
+        store.set_value(1, 0, "6")
+    assert store.history.undo_label() == "粘贴"
+    store.undo()
+    assert store.df["a"].tolist() == [1, 2]
+    assert store.history.undo_label() is None
+
+
+def test_store_history_budget():
+    """整列修改按保存的原列大小计入撤销历史，超过上限时丢弃最早的操作"""
+    store = DataStore(pd.DataFrame({"a": np.arange(100000, dtype=float)}))
+    store.history.max_bytes = store.df["a"].nbytes * 3
+    for target in ["整数", "浮点数", "整数", "浮点数"]:
+        store.convert_column(0, target)
+    assert store.history.nbytes() <= store.history.max_bytes
+    undone = 0
+    while store.undo() is not None:
+        undone += 1
+    assert 0 < undone < 4
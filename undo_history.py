@@ -0,0 +1,292 @@
+"""
+撤销/重做模块
+数据存储的每次修改记录为逆操作：单元格只保存原值，整列修改只保存原列的引用(新列是另建的，原列不复制)，
+删除行只保存被删除的行；历史总大小超过上限时从最早的一步开始丢弃
+"""
+
+from collections import deque  # 撤销栈，从最早的一端淘汰
+
+import numpy as np  # 数值计算库
+import pandas as pd  # 数据处理库
+
+UNDO_MAX_BYTES = 256 * 1024 * 1024  # 默认撤销历史大小上限
+
+
+class UndoStep:
+    """
+    一步可撤销的操作，由一个或多个修改组成
+
+    属性:
+        label: str - 操作名称，显示在状态栏
+        edits: list - 按执行顺序排列的修改
+        tag: 调用方附加的信息，如该操作对应的流水线步骤
+    """
+
+    def __init__(self, label):
+        """初始化空的操作"""
+        self.label = label
+        self.edits = []
+        self.tag = None
+
+    def nbytes(self):
+        """操作保存的数据占用的字节数"""
+        return sum(edit.nbytes for edit in self.edits)
+
+    def undo(self, store):
+        """按相反顺序撤销全部修改"""
+        for edit in reversed(self.edits):
+            edit.undo(store)
+
+    def redo(self, store):
+        """按原顺序重新执行全部修改"""
+        for edit in self.edits:
+            edit.redo(store)
+
+
+class UndoHistory:
+    """
+    撤销/重做历史
+
+    属性:
+        max_bytes: int - 撤销与重做历史的总大小上限，超过时丢弃最早的操作
+    """
+
+    def __init__(self, max_bytes=UNDO_MAX_BYTES):
+        """初始化空的历史"""
+        self.max_bytes = max_bytes
+        self._undo = deque()
+        self._redo = []
+
+    def record(self, step):
+        """记录新的操作，清空重做历史"""
+        self._undo.append(step)
+        self._redo.clear()
+        self.evict()
+
+    def evict(self):
+        """
+        从最早的操作开始丢弃，直到总大小不超过上限
+
+        返回值: int - 丢弃的操作数
+        """
+        evicted = 0
+        total = self.nbytes()
+        while self._undo and total > self.max_bytes:
+            total -= self._undo.popleft().nbytes()
+            evicted += 1
+        return evicted
+
+    def nbytes(self):
+        """撤销与重做历史占用的字节数"""
+        return sum(step.nbytes() for step in self._undo) + sum(step.nbytes() for step in self._redo)
+
+    def undo_label(self):
+        """下一步可撤销的操作名称，没有时返回None"""
+        return self._undo[-1].label if self._undo else None
+
+    def redo_label(self):
+        """下一步可重做的操作名称，没有时返回None"""
+        return self._redo[-1].label if self._redo else None
+
+    def pop_undo(self):
+        """取出要撤销的操作并移入重做历史，没有时返回None"""
+        if not self._undo:
+            return None
+        step = self._undo.pop()
+        self._redo.append(step)
+        return step
+
+    def pop_redo(self):
+        """取出要重做的操作并移回撤销历史，没有时返回None"""
+        if not self._redo:
+            return None
+        step = self._redo.pop()
+        self._undo.append(step)
+        return step
+
+    def clear(self):
+        """清空历史，用于替换全部数据"""
+        self._undo.clear()
+        self._redo.clear()
+
+
+class CellEdit:
+    """
+    修改单个单元格
+
+    写入时列类型发生变化(如整数列写入文本)的，还保存变化前的整列
+    """
+
+    def __init__(self, position, col, before, after, before_column=None):
+        """
+        参数:
+            position: int - 后端行号
+            col: int - 列号
+            before: 原值
+            after: 新值
+            before_column: pd.Series - 类型变化前的整列，类型未变化时为None
+        """
+        self.position = position
+        self.col = col
+        self.before = before
+        self.after = after
+        self.before_column = before_column
+        self.nbytes = 64 if before_column is None else series_bytes(before_column)
+
+    def undo(self, store):
+        """恢复原值或原列"""
+        if self.before_column is not None:
+            store.df.isetitem(self.col, self.before_column)
+        else:
+            store.df.iat[self.position, self.col] = self.before
+
+    def redo(self, store):
+        """重新写入新值"""
+        store._prepare_column(store.df.columns[self.col], self.after)
+        store.df.iat[self.position, self.col] = self.after
+
+
+class ColumnEdit:
+    """
+    替换、添加、删除或重命名一列
+
+    修改前后的列都是 (列名, pd.Series)，添加列时修改前为None，删除列时修改后为None；
+    替换列时新列另行创建，原列对象直接保存，不复制数据
+    """
+
+    def __init__(self, col, before, after):
+        """
+        参数:
+            col: int - 列号
+            before: tuple - 修改前的 (列名, 数据列)，或None
+            after: tuple - 修改后的 (列名, 数据列)，或None
+        """
+        self.col = col
+        self.before = before
+        self.after = after
+        # 不在数据中的一侧占用额外内存；重命名时两侧是同一列
+        if before is not None and after is not None and before[1] is after[1]:
+            self.nbytes = 0
+        else:
+            self.nbytes = series_bytes((before or after)[1])
+
+    def undo(self, store):
+        """恢复修改前的列"""
+        self._apply(store, self.before)
+
+    def redo(self, store):
+        """恢复修改后的列"""
+        self._apply(store, self.after)
+
+    def _apply(self, store, state):
+        """把指定位置的列设为给定状态"""
+        if state is None:
+            store.df = store.df.drop(columns=store.df.columns[self.col])
+        elif self.before is None or self.after is None:
+            # 添加或删除列的另一侧，该列当前不存在
+            store.df.insert(self.col, state[0], state[1])
+        else:
+            store.df.isetitem(self.col, state[1])
+            columns = list(store.df.columns)
+            columns[self.col] = state[0]
+            store.df.columns = columns
+
+
+class RowsEdit:
+    """
+    删除或插入若干行
+
+    只保存这些行本身和修改前后的视图，不保存其余数据
+    """
+
+    def __init__(self, positions, rows, view_before, view_after, removed=True, dtypes=None):
+        """
+        参数:
+            positions: np.ndarray - 这些行在行数较多一侧的后端数据中的行号，从小到大
+            rows: pd.DataFrame - 这些行的数据
+            view_before: np.ndarray - 修改前的视图，None表示按原始顺序
+            view_after: np.ndarray - 修改后的视图
+            removed: bool - True表示删除行，False表示插入行
+            dtypes: pd.Series - 插入行之前的列类型，插入空行使整数或布尔列变为可空类型时，删除该行后恢复
+        """
+        self.positions = np.asarray(positions, dtype=np.int64)
+        self.rows = rows.reset_index(drop=True)
+        self.view_before = view_before
+        self.view_after = view_after
+        self.removed = removed
+        self.dtypes = dtypes
+        self.nbytes = (int(self.rows.memory_usage(index=False, deep=True).sum()) + self.positions.nbytes
+                       + sum(view.nbytes for view in (view_before, view_after) if view is not None))
+
+    def undo(self, store):
+        """撤销删除时插回这些行，撤销插入时删除这些行"""
+        if self.removed:
+            self._insert(store)
+        else:
+            self._remove(store)
+        store._view = self.view_before
+
+    def redo(self, store):
+        """重新删除或插入这些行"""
+        if self.removed:
+            self._remove(store)
+        else:
+            self._insert(store)
+        store._view = self.view_after
+
+    def _remove(self, store):
+        """删除这些行"""
+        keep = np.ones(len(store.df), dtype=bool)
+        keep[self.positions] = False
+        store.df = store.df[keep].reset_index(drop=True)
+        if self.dtypes is not None:
+            changed = {name: dtype for name, dtype in self.dtypes.items() if store.df[name].dtype != dtype}
+            if changed:
+                store.df = store.df.astype(changed)
+
+    def _insert(self, store):
+        """把这些行插回原来的位置"""
+        count = len(store.df)
+        total = count + len(self.positions)
+        kept = np.ones(total, dtype=bool)
+        kept[self.positions] = False
+        # 先把这些行接在末尾，再按原位置重新排列
+        order = np.empty(total, dtype=np.int64)
+        order[kept] = np.arange(count)
+        order[self.positions] = np.arange(count, total)
+        merged = pd.concat([store.df, self.rows], ignore_index=True)
+        store.df = merged.take(order).reset_index(drop=True)
+
+
+class ViewEdit:
+    """修改排序、筛选条件或文本排序方式，保存修改前后的条件与视图"""
+
+    def __init__(self, before, after):
+        """
+        参数:
+            before: tuple - 修改前的 (排序条件, 筛选表达式树, 文本排序方式, 视图)
+            after: tuple - 修改后的 (排序条件, 筛选表达式树, 文本排序方式, 视图)
+        """
+        self.before = before
+        self.after = after
+        # 修改后的视图正在使用，只有修改前的视图占用额外内存
+        self.nbytes = before[3].nbytes if before[3] is not None else 0
+
+    def undo(self, store):
+        """恢复修改前的条件与视图"""
+        self._apply(store, self.before)
+
+    def redo(self, store):
+        """恢复修改后的条件与视图"""
+        self._apply(store, self.after)
+
+    @staticmethod
+    def _apply(store, state):
+        """设置条件与视图"""
+        store.sort_conditions, store.filter, store.collation, store._view = state
+        store.sort_conditions = list(store.sort_conditions)
+
+
+def series_bytes(series):
+    """数据列占用的字节数"""
+    return int(series.memory_usage(index=False, deep=True))